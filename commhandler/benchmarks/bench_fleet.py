@@ -0,0 +1,518 @@
+"""
+Load tests the commhandler with a virtual fleet: thousands of simulated
+Modbus TCP and REST devices in one process, built from EIDs through
+DeviceBuilder and polled with a configurable pattern.
+
+Modbus devices are served by lightweight asyncio endpoints answering any
+unit id with zeroed registers, like gateways with up to 247 devices each.
+REST devices are served by aiohttp endpoints, answering the read requests
+of the EID with JSON built from its JMESPath response queries.
+
+Reports throughput, poll latency and lateness percentiles, event loop lag,
+scheduler fairness, memory and socket counts as JSON.
+
+Usage:
+    python benchmarks/bench_fleet.py [--modbus N] [--rest N]
+        [--devices-per-endpoint N] [--pattern uniform|burst]
+        [--interval S] [--duration S] [--latency S] [--output FILE]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import resource
+import sys
+import time
+from collections import Counter
+from typing import Any, Optional
+
+BENCHMARK_PATH = os.path.dirname(os.path.realpath(__file__))
+sys.path.insert(0, os.path.join(BENCHMARK_PATH, '..', 'src'))
+
+from aiohttp import web  # noqa: E402
+from sgr_specification.v0.product.product import DeviceFrame  # noqa: E402
+
+from sgr_commhandler.api import SGrBaseInterface  # noqa: E402
+from sgr_commhandler.cli import percentiles  # noqa: E402
+from sgr_commhandler.device_builder import DeviceBuilder  # noqa: E402
+from sgr_commhandler.device_pool import DevicePool  # noqa: E402
+
+EID_PATH = os.path.join(BENCHMARK_PATH, '..', 'tests', 'test_devices', 'eids')
+MODBUS_EID = os.path.join(
+    EID_PATH, 'SGr_00_0016_dddd_ABB_B23_ModbusTCP_V0.3.xml'
+)
+REST_EID = os.path.join(
+    EID_PATH, 'SGr_01_mmmm_dddd_Shelly_1PM_RestAPILocal_V0.1.xml'
+)
+# the largest Modbus unit id
+MAX_UNITS = 247
+# interval of the event loop lag and resource monitor
+MONITOR_INTERVAL = 0.01
+QUERY_TOKEN = re.compile(r'([A-Za-z_][A-Za-z0-9_]*)|\[(\d+)\]|(\.)')
+
+
+class ModbusEndpoint(asyncio.Protocol):
+    """
+    Answers Modbus TCP reads of any unit id with zeroed registers and coils,
+    and acknowledges writes, after the given latency.
+    """
+
+    def __init__(self, latency: float):
+        self._latency = latency
+        self._buffer = bytearray()
+        self._transport: Optional[asyncio.Transport] = None
+
+    def connection_made(self, transport):
+        self._transport = transport
+
+    def data_received(self, data: bytes):
+        self._buffer += data
+        while len(self._buffer) >= 8:
+            end = 6 + int.from_bytes(self._buffer[4:6], 'big')
+            if len(self._buffer) < end:
+                return
+            frame = bytes(self._buffer[:end])
+            del self._buffer[:end]
+            self._respond(frame)
+
+    def _respond(self, frame: bytes):
+        pdu = frame[7:]
+        function = pdu[0]
+        count = int.from_bytes(pdu[3:5], 'big')
+        if function in (3, 4):
+            body = bytes((function, 2 * count)) + bytes(2 * count)
+        elif function in (1, 2):
+            size = (count + 7) // 8
+            body = bytes((function, size)) + bytes(size)
+        elif function in (5, 6, 15, 16):
+            body = pdu[:5]
+        else:
+            # illegal function
+            body = bytes((function | 0x80, 1))
+        response = (
+            frame[:4]
+            + (len(body) + 1).to_bytes(2, 'big')
+            + frame[6:7]
+            + body
+        )
+        if self._latency > 0:
+            asyncio.get_running_loop().call_later(
+                self._latency, self._write, response
+            )
+        else:
+            self._write(response)
+
+    def _write(self, response: bytes):
+        if self._transport is not None and not self._transport.is_closing():
+            self._transport.write(response)
+
+
+def sample_value(data_point: Any) -> Any:
+    """
+    Returns a valid value for a data point specification.
+    """
+    data_type = data_point.data_type
+    minimum = data_point.minimum_value
+    if data_type is None:
+        return 1
+    if data_type.boolean is not None:
+        return True
+    if data_type.string is not None:
+        return 'simulated'
+    if data_type.float32 is not None or data_type.float64 is not None:
+        return float(minimum) if minimum is not None else 1.0
+    return int(minimum) if minimum is not None else 1
+
+
+def set_query(document: dict, query: str, value: Any) -> bool:
+    """
+    Stores a value in a JSON document where a JMESPath query of fields and
+    indices finds it.
+    :returns: False if the query is not supported
+    """
+    steps: list[Any] = []
+    position = 0
+    for match in QUERY_TOKEN.finditer(query):
+        if match.start() != position:
+            return False
+        position = match.end()
+        if match.group(1):
+            steps.append(match.group(1))
+        elif match.group(2):
+            steps.append(int(match.group(2)))
+    if position != len(query) or not steps:
+        return False
+
+    node: Any = document
+    for step, following in zip(steps, steps[1:] + [None]):
+        empty: Any = [] if isinstance(following, int) else {}
+        if isinstance(step, int):
+            if not isinstance(node, list):
+                return False
+            while len(node) <= step:
+                node.append({} if following is not None else None)
+            if following is None:
+                node[step] = value
+            elif not isinstance(node[step], (dict, list)):
+                node[step] = empty
+            node = node[step]
+        else:
+            if not isinstance(node, dict):
+                return False
+            if following is None:
+                node[step] = value
+            else:
+                node = node.setdefault(step, empty)
+    return True
+
+
+def rest_responses(frame: DeviceFrame) -> dict[str, dict]:
+    """
+    Builds the response of each read request path of a REST EID.
+    """
+    responses: dict[str, dict] = {}
+    interface = frame.interface_list.rest_api_interface
+    profiles = interface.functional_profile_list
+    for fp in profiles.functional_profile_list_element if profiles else []:
+        data_points = fp.data_point_list
+        for dp in data_points.data_point_list_element if data_points else []:
+            config = dp.rest_api_data_point_configuration
+            if config is None or dp.data_point is None:
+                continue
+            call = (
+                config.rest_api_read_service_call[0]
+                if config.rest_api_read_service_call
+                else config.rest_api_service_call
+            )
+            if call is None or call.response_query is None:
+                continue
+            set_query(
+                responses.setdefault(call.request_path or '', {}),
+                call.response_query.query or '',
+                sample_value(dp.data_point),
+            )
+    return responses
+
+
+async def start_rest_endpoint(
+    responses: dict[str, dict], latency: float
+) -> tuple[web.AppRunner, int]:
+    """
+    Serves the responses below a path prefix per device.
+    """
+
+    async def handle(request: web.Request) -> web.Response:
+        if latency > 0:
+            await asyncio.sleep(latency)
+        response = responses.get('/' + request.match_info['tail'])
+        if response is None:
+            raise web.HTTPNotFound()
+        return web.json_response(response)
+
+    app = web.Application()
+    app.router.add_get('/{device}/{tail:.*}', handle)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    return runner, site._server.sockets[0].getsockname()[1]
+
+
+def rss_bytes() -> int:
+    try:
+        with open('/proc/self/statm') as file:
+            return int(file.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except OSError:
+        # peak instead of current RSS, in kilobytes on Linux
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def socket_count() -> Optional[int]:
+    try:
+        fds = os.listdir('/proc/self/fd')
+    except OSError:
+        return None
+    count = 0
+    for fd in fds:
+        try:
+            if os.readlink(f'/proc/self/fd/{fd}').startswith('socket:'):
+                count += 1
+        except OSError:
+            pass
+    return count
+
+
+def raise_file_limit():
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft != hard:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+
+
+class Statistics:
+    def __init__(self, devices: int):
+        self.latencies: list[float] = []
+        self.lateness: list[float] = []
+        self.polls = [0] * devices
+        self.statuses: Counter[str] = Counter()
+        self.overruns = 0
+        self.loop_lag: list[float] = []
+        self.peak_rss = 0
+        self.peak_sockets = 0
+
+
+async def monitor(stats: Statistics, stop: asyncio.Event):
+    """
+    Measures how late the event loop wakes up a sleeping task, and samples
+    memory and sockets.
+    """
+    loop = asyncio.get_running_loop()
+    samples = 0
+    while not stop.is_set():
+        start = loop.time()
+        await asyncio.sleep(MONITOR_INTERVAL)
+        stats.loop_lag.append(loop.time() - start - MONITOR_INTERVAL)
+        samples += 1
+        if samples % 100 == 0:
+            stats.peak_rss = max(stats.peak_rss, rss_bytes())
+            stats.peak_sockets = max(stats.peak_sockets, socket_count() or 0)
+
+
+async def poll_device(
+    index: int,
+    device: SGrBaseInterface,
+    offset: float,
+    interval: float,
+    deadline: float,
+    timeout: Optional[float],
+    stats: Statistics,
+):
+    loop = asyncio.get_running_loop()
+    next_poll = loop.time() + offset
+    while True:
+        delay = next_poll - loop.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        start = loop.time()
+        if start >= deadline:
+            return
+        stats.lateness.append(start - next_poll)
+        try:
+            results = await device.read_values_async(timeout)
+            stats.statuses.update(r.status.value for r in results.values())
+        except Exception:
+            stats.statuses['DEVICE_ERROR'] += 1
+        stats.latencies.append(loop.time() - start)
+        stats.polls[index] += 1
+        next_poll += interval
+        if next_poll < loop.time():
+            stats.overruns += 1
+            next_poll = loop.time()
+
+
+def jain_index(counts: list[int]) -> Optional[float]:
+    """
+    Jain's fairness index of the polls per device, 1.0 if all devices were
+    polled equally often.
+    """
+    squares = sum(count * count for count in counts)
+    if not squares:
+        return None
+    return sum(counts) ** 2 / (len(counts) * squares)
+
+
+def disable_caches(devices: list[SGrBaseInterface]):
+    # measure the endpoints, not the value caches
+    for device in devices:
+        for name in device.get_data_points():
+            device.value_cache.set_ttl(name, 0)
+
+
+async def run(args: argparse.Namespace) -> dict:
+    if args.devices_per_endpoint > MAX_UNITS:
+        raise Exception(f'at most {MAX_UNITS} devices per endpoint')
+    loop = asyncio.get_running_loop()
+    per_endpoint = args.devices_per_endpoint
+    servers = []
+    runners = []
+
+    modbus_ports = []
+    for _ in range(-(-args.modbus // per_endpoint)):
+        server = await loop.create_server(
+            lambda: ModbusEndpoint(args.latency), '127.0.0.1', 0
+        )
+        servers.append(server)
+        modbus_ports.append(server.sockets[0].getsockname()[1])
+
+    rest_ports = []
+    if args.rest:
+        frame, _ = (
+            DeviceBuilder()
+            .eid_path(args.rest_eid)
+            .properties(dict(baseUri='http://127.0.0.1'))
+            ._load_frame()
+        )
+        responses = rest_responses(frame)
+        for _ in range(-(-args.rest // per_endpoint)):
+            runner, port = await start_rest_endpoint(responses, args.latency)
+            runners.append(runner)
+            rest_ports.append(port)
+
+    rss_before = rss_bytes()
+    start = time.perf_counter()
+    devices = DeviceBuilder().eid_path(args.modbus_eid).build_fleet(
+        dict(
+            slave_id=str(i % per_endpoint + 1),
+            tcp_address='127.0.0.1',
+            tcp_port=str(modbus_ports[i // per_endpoint]),
+        )
+        for i in range(args.modbus)
+    )
+    if args.rest:
+        devices += DeviceBuilder().eid_path(args.rest_eid).build_fleet(
+            dict(
+                baseUri=f'http://127.0.0.1:{rest_ports[i // per_endpoint]}'
+                f'/d{i}'
+            )
+            for i in range(args.rest)
+        )
+    build_s = time.perf_counter() - start
+    rss_built = rss_bytes()
+    if not args.cache:
+        disable_caches(devices)
+
+    pool = DevicePool(max_connecting=args.max_connecting)
+    pool.add_all(devices)
+    start = time.perf_counter()
+    connect_errors = await pool.connect_async()
+    connect_s = time.perf_counter() - start
+    sockets_connected = socket_count()
+
+    stats = Statistics(len(devices))
+    stop = asyncio.Event()
+    monitor_task = asyncio.create_task(monitor(stats, stop))
+    phases = random.Random(args.seed)
+    deadline = loop.time() + args.duration
+    start = loop.time()
+    await asyncio.gather(
+        *(
+            poll_device(
+                index,
+                device,
+                phases.uniform(0, args.interval)
+                if args.pattern == 'uniform'
+                else 0.0,
+                args.interval,
+                deadline,
+                args.timeout,
+                stats,
+            )
+            for index, device in enumerate(devices)
+        )
+    )
+    elapsed = loop.time() - start
+    stop.set()
+    await monitor_task
+    stats.peak_rss = max(stats.peak_rss, rss_bytes())
+
+    await pool.disconnect_async()
+    for runner in runners:
+        await runner.cleanup()
+    for server in servers:
+        server.close()
+        await server.wait_closed()
+
+    polls = sum(stats.polls)
+    reads = sum(stats.statuses.values())
+    return dict(
+        devices=dict(
+            modbus=args.modbus,
+            rest=args.rest,
+            modbus_endpoints=len(modbus_ports),
+            rest_endpoints=len(rest_ports),
+        ),
+        pattern=args.pattern,
+        interval_s=args.interval,
+        duration_s=elapsed,
+        latency_s=args.latency,
+        build_s=build_s,
+        connect_s=connect_s,
+        connect_errors=len(connect_errors),
+        polls=polls,
+        poll_rate=polls / elapsed if elapsed else 0.0,
+        overruns=stats.overruns,
+        reads=reads,
+        read_rate=reads / elapsed if elapsed else 0.0,
+        statuses=dict(stats.statuses),
+        poll_latency_s=percentiles(stats.latencies),
+        poll_lateness_s=percentiles(stats.lateness),
+        loop_lag_s=percentiles(stats.loop_lag),
+        fairness=dict(
+            min_polls=min(stats.polls, default=0),
+            max_polls=max(stats.polls, default=0),
+            jain_index=jain_index(stats.polls),
+        ),
+        memory=dict(
+            rss_before_build_mb=rss_before / 2**20,
+            rss_after_build_mb=rss_built / 2**20,
+            peak_rss_mb=stats.peak_rss / 2**20,
+            bytes_per_device=(rss_built - rss_before) / len(devices)
+            if devices
+            else 0.0,
+        ),
+        sockets=dict(
+            after_connect=sockets_connected, peak=stats.peak_sockets
+        ),
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--modbus', type=int, default=1000)
+    parser.add_argument('--rest', type=int, default=200)
+    parser.add_argument('--modbus-eid', default=MODBUS_EID)
+    parser.add_argument('--rest-eid', default=REST_EID)
+    parser.add_argument(
+        '--devices-per-endpoint',
+        type=int,
+        default=50,
+        help='simulated devices served by one listening socket',
+    )
+    parser.add_argument(
+        '--pattern',
+        choices=('uniform', 'burst'),
+        default='uniform',
+        help='uniform spreads the polls over the interval, burst polls all '
+        'devices at once',
+    )
+    parser.add_argument('--interval', type=float, default=5.0)
+    parser.add_argument('--duration', type=float, default=30.0)
+    parser.add_argument(
+        '--latency', type=float, default=0.0, help='endpoint response time'
+    )
+    parser.add_argument(
+        '--timeout', type=float, help='deadline of a device poll in seconds'
+    )
+    parser.add_argument('--max-connecting', type=int, default=100)
+    parser.add_argument(
+        '--cache',
+        action='store_true',
+        help='serve reads from the value cache within the TTLs of the EIDs',
+    )
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='also write the report to a file')
+    args = parser.parse_args()
+
+    raise_file_limit()
+    report = asyncio.run(run(args))
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as file:
+            file.write(text + '\n')
+    print(text)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+"""
+Measures the import time of the commhandler in fresh interpreters, and which
+optional driver dependencies get imported along the way.
+
+Usage:
+    python benchmarks/bench_import.py [--runs N] [--module NAME]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+SRC_PATH = os.path.join(
+    os.path.dirname(os.path.realpath(__file__)), '..', 'src'
+)
+DRIVER_DEPENDENCIES = ('aiohttp', 'pymodbus', 'jmespath')
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+loaded = [m for m in {dependencies!r} if m in sys.modules]
+print(json.dumps([elapsed, loaded]))
+"""
+
+
+def measure(module: str) -> tuple[float, list[str]]:
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(
+        p for p in (SRC_PATH, env.get('PYTHONPATH')) if p
+    )
+    output = subprocess.run(
+        [
+            sys.executable,
+            '-c',
+            PROBE.format(module=module, dependencies=DRIVER_DEPENDENCIES),
+        ],
+        env=env,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    elapsed, loaded = json.loads(output.strip().splitlines()[-1])
+    return elapsed, loaded
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument(
+        '--module',
+        action='append',
+        help='module to import, can be repeated',
+    )
+    args = parser.parse_args()
+    modules = args.module or [
+        'sgr_commhandler.api',
+        'sgr_commhandler.device_builder',
+        'sgr_commhandler.driver.modbus',
+        'sgr_commhandler.driver.rest',
+    ]
+
+    results = []
+    for module in modules:
+        timings = []
+        loaded: list[str] = []
+        for _ in range(args.runs):
+            elapsed, loaded = measure(module)
+            timings.append(elapsed * 1000.0)
+        results.append(
+            dict(
+                module=module,
+                runs=args.runs,
+                median_ms=statistics.median(timings),
+                min_ms=min(timings),
+                max_ms=max(timings),
+                driver_dependencies=loaded,
+            )
+        )
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
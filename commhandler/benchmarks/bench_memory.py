@@ -0,0 +1,199 @@
+"""
+Measures the memory used per data point by built devices, for separately
+built devices and for fleets sharing one parsed EID.
+
+With --baseline or --baseline-revision, the bytes per data point are
+compared to a previous run, or to the code of an earlier git revision.
+
+Usage:
+    python benchmarks/bench_memory.py [--devices N] [--eid PATH]
+        [--output FILE] [--baseline FILE | --baseline-revision REV]
+"""
+
+import argparse
+import gc
+import json
+import os
+import subprocess
+import sys
+import tarfile
+import tempfile
+import tracemalloc
+
+BENCHMARK_PATH = os.path.dirname(os.path.realpath(__file__))
+
+
+def source_path() -> str:
+    # the hidden --src option measures the sources of another revision
+    if '--src' in sys.argv:
+        return sys.argv[sys.argv.index('--src') + 1]
+    return os.path.join(BENCHMARK_PATH, '..', 'src')
+
+
+sys.path.insert(0, source_path())
+
+from sgr_commhandler.device_builder import DeviceBuilder  # noqa: E402
+from sgr_commhandler.eid_cache import EidCache  # noqa: E402
+
+DEFAULT_EID_PATH = os.path.join(
+    BENCHMARK_PATH,
+    '..',
+    'tests',
+    'test_devices',
+    'eids',
+    'SGr_00_0016_dddd_ABB_B23_ModbusTCP_V0.3.xml',
+)
+
+
+def device_properties(i: int) -> dict:
+    return dict(
+        slave_id=str(i % 247 + 1),
+        tcp_address=f'10.0.{i // 250}.{i % 250}',
+        tcp_port='502',
+    )
+
+
+def build_separately(eid_path: str, count: int) -> list:
+    # no cache, so every device holds its own frame
+    return [
+        DeviceBuilder()
+        .eid_path(eid_path)
+        .properties(device_properties(i))
+        .cache(None)
+        .build()
+        for i in range(count)
+    ]
+
+
+def build_fleet(eid_path: str, count: int) -> list:
+    return (
+        DeviceBuilder()
+        .eid_path(eid_path)
+        .cache(EidCache())
+        .build_fleet(device_properties(i) for i in range(count))
+    )
+
+
+def measure(build, eid_path: str, count: int) -> dict:
+    gc.collect()
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    devices = build(eid_path, count)
+    # materialise everything, like an application reading all values would
+    data_points = sum(len(device.get_data_points()) for device in devices)
+    gc.collect()
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    used = after - before
+    return dict(
+        devices=count,
+        data_points=data_points,
+        bytes_total=used,
+        bytes_per_device=used / count,
+        bytes_per_data_point=used / data_points if data_points else 0.0,
+    )
+
+
+def measure_revision(revision: str, eid_path: str, count: int) -> dict:
+    """
+    Measures the sources of a git revision in a child process.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        archive = os.path.join(directory, 'src.tar')
+        with open(archive, 'wb') as file:
+            subprocess.run(
+                ['git', 'archive', revision, 'src'],
+                cwd=os.path.join(BENCHMARK_PATH, '..'),
+                stdout=file,
+                check=True,
+            )
+        with tarfile.open(archive) as tar:
+            tar.extractall(directory)
+        output = subprocess.run(
+            [
+                sys.executable,
+                os.path.realpath(__file__),
+                '--src',
+                os.path.join(directory, 'src'),
+                '--devices',
+                str(count),
+                '--eid',
+                eid_path,
+            ],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+    return json.loads(output.stdout)
+
+
+def compare(results: dict, baseline: dict) -> dict:
+    """
+    Compares the bytes per data point to a baseline.
+    :returns: Per build mode the baseline, the current value and the
+        relative change
+    """
+    comparison = {}
+    for mode, entry in results.items():
+        before = baseline.get(mode)
+        if not isinstance(before, dict) or not before.get(
+            'bytes_per_data_point'
+        ):
+            continue
+        comparison[mode] = dict(
+            baseline_bytes_per_data_point=before['bytes_per_data_point'],
+            bytes_per_data_point=entry['bytes_per_data_point'],
+            change=entry['bytes_per_data_point']
+            / before['bytes_per_data_point']
+            - 1.0,
+        )
+    return comparison
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--devices', type=int, default=50)
+    parser.add_argument('--eid', default=DEFAULT_EID_PATH)
+    parser.add_argument('--output', help='also write the results to a file')
+    baseline = parser.add_mutually_exclusive_group()
+    baseline.add_argument('--baseline', help='results of a previous run')
+    baseline.add_argument(
+        '--baseline-revision',
+        help='git revision whose sources are measured as the baseline',
+    )
+    parser.add_argument('--src', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    results = dict(
+        separate=measure(build_separately, args.eid, args.devices),
+        fleet=measure(build_fleet, args.eid, args.devices),
+    )
+    text = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, 'w') as file:
+            file.write(text + '\n')
+
+    previous = None
+    if args.baseline:
+        with open(args.baseline) as file:
+            previous = json.load(file)
+    elif args.baseline_revision:
+        previous = measure_revision(
+            args.baseline_revision, args.eid, args.devices
+        )
+    if previous is not None:
+        comparison = compare(results, previous)
+        results['comparison'] = comparison
+        text = json.dumps(results, indent=2)
+        for mode, entry in comparison.items():
+            print(
+                f'{mode}: {entry["baseline_bytes_per_data_point"]:.0f} -> '
+                f'{entry["bytes_per_data_point"]:.0f} B/data point '
+                f'({entry["change"]:+.1%})',
+                file=sys.stderr,
+            )
+    print(text)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,263 @@
+"""
+Measures the startup cost of devices: the import time of the commhandler,
+and per EID the latency of substitution, parsing and driver construction,
+the peak RSS and the memory retained per built device.
+
+The bundled test EIDs are measured, and synthetic Modbus EIDs with the
+given numbers of data points. Every EID is measured in a fresh interpreter,
+so peak RSS is not inflated by earlier EIDs. With --history, the results
+are appended to a JSON lines file to track them over time.
+
+Usage:
+    python benchmarks/bench_startup.py [--sizes 10,100,1000,10000]
+        [--runs N] [--devices N] [--history FILE]
+"""
+
+import argparse
+import configparser
+import datetime
+import gc
+import json
+import os
+import re
+import resource
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+
+BENCHMARK_PATH = os.path.dirname(os.path.realpath(__file__))
+sys.path.insert(0, os.path.join(BENCHMARK_PATH, '..', 'src'))
+
+from bench_import import measure as measure_import  # noqa: E402
+
+EID_PATH = os.path.join(BENCHMARK_PATH, '..', 'tests', 'test_devices', 'eids')
+TEMPLATE_EID = os.path.join(
+    EID_PATH, 'SGr_00_0016_dddd_ABB_B23_ModbusTCP_V0.3.xml'
+)
+DEFAULT_SIZES = (10, 100, 1000, 10000)
+IMPORTED_MODULES = ('sgr_commhandler', 'sgr_commhandler.device_builder')
+# data points per functional profile of synthetic EIDs
+PROFILE_SIZE = 50
+PROPERTIES = dict(
+    slave_id='1',
+    tcp_address='127.0.0.1',
+    tcp_port='502',
+    baseUri='http://127.0.0.1',
+)
+
+PROFILE_LIST = re.compile(
+    r'<functionalProfileList>.*</functionalProfileList>', re.DOTALL
+)
+PROFILE = re.compile(
+    r'<functionalProfileListElement>.*?</functionalProfileListElement>',
+    re.DOTALL,
+)
+DATA_POINT_LIST = re.compile(r'<dataPointList>.*</dataPointList>', re.DOTALL)
+DATA_POINT = re.compile(
+    r'<dataPointListElement>.*?</dataPointListElement>', re.DOTALL
+)
+
+
+def synthetic_eid(data_points: int) -> str:
+    """
+    Generates a Modbus EID from the ABB test EID, repeating its first data
+    point with distinct names and addresses.
+    :param data_points: The number of data points
+    :returns: The EID
+    """
+    with open(TEMPLATE_EID) as file:
+        eid = file.read()
+    profile = PROFILE.search(eid).group(0)
+    data_point = DATA_POINT.search(profile).group(0)
+
+    profiles = []
+    for first in range(0, data_points, PROFILE_SIZE):
+        count = min(PROFILE_SIZE, data_points - first)
+        elements = ''.join(
+            re.sub(
+                r'<address>\d+</address>',
+                f'<address>{2 * (first + i)}</address>',
+                re.sub(
+                    r'<dataPointName>[^<]*</dataPointName>',
+                    f'<dataPointName>DP{first + i}</dataPointName>',
+                    data_point,
+                ),
+            )
+            for i in range(count)
+        )
+        profiles.append(
+            re.sub(
+                r'<functionalProfileName>[^<]*</functionalProfileName>',
+                f'<functionalProfileName>FP{first}</functionalProfileName>',
+                DATA_POINT_LIST.sub(
+                    lambda _: f'<dataPointList>{elements}</dataPointList>',
+                    profile,
+                ),
+            )
+        )
+    return PROFILE_LIST.sub(
+        lambda _: '<functionalProfileList>'
+        + ''.join(profiles)
+        + '</functionalProfileList>',
+        eid,
+    )
+
+
+def eid_sources(sizes: list[int]) -> list[tuple[str, str]]:
+    sources = [
+        (name, os.path.join(EID_PATH, name))
+        for name in sorted(os.listdir(EID_PATH))
+        if name.endswith('.xml')
+    ]
+    sources.extend((f'synthetic-{size}', str(size)) for size in sizes)
+    return sources
+
+
+def measure_eid(source: str, runs: int, devices: int) -> dict:
+    """
+    Measures one EID in this interpreter.
+    :param source: The EID path, or the size of a synthetic EID
+    :param runs: The number of timed builds
+    :param devices: The number of devices built to measure retained memory
+    :returns: The measurements
+    """
+    from sgr_commhandler.device_builder import DeviceBuilder
+
+    if source.isdigit():
+        content = synthetic_eid(int(source))
+    else:
+        with open(source) as file:
+            content = file.read()
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    def builder():
+        return DeviceBuilder().eid(content).properties(PROPERTIES).cache(None)
+
+    phases: dict[str, list[float]] = dict(
+        substitute_ms=[], parse_ms=[], construct_ms=[], build_ms=[]
+    )
+    data_points = 0
+    for _ in range(runs):
+        b = builder()
+        start = time.perf_counter()
+        config: configparser.ConfigParser = b._load_properties()
+        xml = b._replace_variables(content, config)
+        substituted = time.perf_counter()
+        frame = b._string_loader(xml)
+        parsed = time.perf_counter()
+        device = b._create_device(frame, config)
+        end = time.perf_counter()
+        phases['substitute_ms'].append((substituted - start) * 1000.0)
+        phases['parse_ms'].append((parsed - substituted) * 1000.0)
+        phases['construct_ms'].append((end - parsed) * 1000.0)
+        phases['build_ms'].append((end - start) * 1000.0)
+        data_points = len(device.get_data_points())
+        del device, frame
+
+    gc.collect()
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    built = [builder().build() for _ in range(devices)]
+    gc.collect()
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del built
+
+    result = dict(
+        eid_bytes=len(content.encode('utf-8')), data_points=data_points
+    )
+    result.update(
+        {name: statistics.median(values) for name, values in phases.items()}
+    )
+    result.update(
+        retained_bytes_per_device=(after - before) / devices,
+        # ru_maxrss is in kilobytes on Linux
+        rss_before_build_kb=rss_before,
+        peak_rss_kb=resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    )
+    return result
+
+
+def run_isolated(source: str, runs: int, devices: int) -> dict:
+    output = subprocess.run(
+        [
+            sys.executable,
+            os.path.realpath(__file__),
+            '--child',
+            source,
+            '--runs',
+            str(runs),
+            '--devices',
+            str(devices),
+        ],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def git_revision() -> str | None:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=BENCHMARK_PATH,
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        '--sizes',
+        default=','.join(str(size) for size in DEFAULT_SIZES),
+        help='data points of the synthetic EIDs, comma separated',
+    )
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--devices', type=int, default=3)
+    parser.add_argument('--import-runs', type=int, default=5)
+    parser.add_argument('--history', help='JSON lines file to append to')
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child is not None:
+        print(json.dumps(measure_eid(args.child, args.runs, args.devices)))
+        return
+
+    sizes = [int(size) for size in args.sizes.split(',') if size]
+    import_ms = {
+        module: statistics.median(
+            measure_import(module)[0] * 1000.0
+            for _ in range(args.import_runs)
+        )
+        for module in IMPORTED_MODULES
+    }
+    eids = {}
+    for name, source in eid_sources(sizes):
+        try:
+            eids[name] = run_isolated(source, args.runs, args.devices)
+        except subprocess.CalledProcessError as e:
+            eids[name] = dict(error=e.stderr.strip().splitlines()[-1])
+        print(f'{name}: done', file=sys.stderr)
+
+    report = dict(
+        timestamp=datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        revision=git_revision(),
+        python=sys.version.split()[0],
+        import_ms=import_ms,
+        eids=eids,
+    )
+    if args.history:
+        with open(args.history, 'a') as file:
+            file.write(json.dumps(report) + '\n')
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,448 @@
+"""
+Benchmarks the hot paths of the commhandler: payload decoding and encoding,
+validators, Modbus TCP/RTU and REST polling against local simulators, and
+get_values_async for single devices and fleets.
+
+Results are printed as JSON. With --baseline, the medians are compared to a
+previous result file, and the exit code is 1 if a case got slower than the
+threshold allows.
+
+Usage:
+    python benchmarks/bench_suite.py [--filter TEXT] [--quick]
+        [--output FILE] [--baseline FILE] [--threshold FRACTION]
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import socket
+import statistics
+import sys
+import time
+from collections.abc import Callable
+
+BENCHMARK_PATH = os.path.dirname(os.path.realpath(__file__))
+sys.path.insert(0, os.path.join(BENCHMARK_PATH, '..', 'src'))
+
+from pymodbus.constants import Endian  # noqa: E402
+from sgr_specification.v0.generic import (  # noqa: E402
+    DataTypeProduct,
+    EmptyType,
+)
+from sgr_specification.v0.product import ModbusRtu  # noqa: E402
+from sgr_specification.v0.product.modbus_types import (  # noqa: E402
+    ModbusDataType,
+)
+
+from sgr_commhandler.device_builder import DeviceBuilder  # noqa: E402
+from sgr_commhandler.driver.modbus.payload_decoder import (  # noqa: E402
+    PayloadBuilder,
+    PayloadDecoder,
+)
+from sgr_commhandler.validators import build_validator  # noqa: E402
+
+EID_PATH = os.path.join(BENCHMARK_PATH, '..', 'tests', 'test_devices', 'eids')
+MODBUS_EID = os.path.join(
+    EID_PATH, 'SGr_00_0016_dddd_ABB_B23_ModbusTCP_V0.3.xml'
+)
+REST_EID = os.path.join(
+    EID_PATH, 'SGr_01_mmmm_dddd_Shelly_1PM_RestAPILocal_V0.1.xml'
+)
+FLEET_SIZE = 20
+
+
+class Skip(Exception):
+    pass
+
+
+# benchmark cases by name, each returning the duration of its iterations
+CASES: dict[str, Callable[['Settings'], list[float]]] = {}
+
+
+def case(name: str):
+    def register(fn):
+        CASES[name] = fn
+        return fn
+
+    return register
+
+
+class Settings:
+    def __init__(self, quick: bool):
+        # operations per sample of microbenchmarks
+        self.number = 2000 if quick else 20000
+        self.samples = 5 if quick else 15
+        # polls per polling benchmark
+        self.polls = 10 if quick else 50
+
+
+def time_sync(fn: Callable[[], object], settings: Settings) -> list[float]:
+    """
+    Times a function, returning the mean duration per call of each sample.
+    """
+    fn()
+    durations = []
+    for _ in range(settings.samples):
+        start = time.perf_counter()
+        for _ in range(settings.number):
+            fn()
+        durations.append((time.perf_counter() - start) / settings.number)
+    return durations
+
+
+async def time_async(fn, settings: Settings) -> list[float]:
+    """
+    Times an async function, returning the duration of each call.
+    """
+    await fn()
+    durations = []
+    for _ in range(settings.polls):
+        start = time.perf_counter()
+        await fn()
+        durations.append(time.perf_counter() - start)
+    return durations
+
+
+def modbus_type(name: str) -> ModbusDataType:
+    return ModbusDataType(**{name: EmptyType()})
+
+
+def decode_case(type_name: str, registers: list[int]):
+    data_type = modbus_type(type_name)
+
+    def run(settings: Settings) -> list[float]:
+        def decode():
+            return PayloadDecoder.fromRegisters(
+                registers, byteorder=Endian.BIG, wordorder=Endian.BIG
+            ).decode(data_type, 0)
+
+        return time_sync(decode, settings)
+
+    return run
+
+
+def encode_case(type_name: str, value: object):
+    data_type = modbus_type(type_name)
+
+    def run(settings: Settings) -> list[float]:
+        def encode():
+            builder = PayloadBuilder(
+                byteorder=Endian.BIG, wordorder=Endian.BIG
+            )
+            builder.sgr_encode(value, data_type)
+            return builder.to_registers()
+
+        return time_sync(encode, settings)
+
+    return run
+
+
+case('decode.int16')(decode_case('int16', [1234]))
+case('decode.int32_u')(decode_case('int32_u', [1, 2]))
+case('decode.float32')(decode_case('float32', [16968, 0]))
+case('decode.float64')(decode_case('float64', [16457, 8192, 0, 0]))
+case('encode.int32')(encode_case('int32', 123456))
+case('encode.float32')(encode_case('float32', 230.5))
+
+
+def validate_case(
+    data_type: DataTypeProduct, values: list, bounds=(None, None)
+):
+    validator = build_validator(data_type, *bounds)
+
+    def run(settings: Settings) -> list[float]:
+        def validate():
+            for value in values:
+                validator.validate(value)
+
+        return [t / len(values) for t in time_sync(validate, settings)]
+
+    return run
+
+
+def validate_many_case(data_type: DataTypeProduct, values: list, bounds):
+    validator = build_validator(data_type, *bounds)
+
+    def run(settings: Settings) -> list[float]:
+        def validate():
+            validator.validate_many(values)
+
+        durations = time_sync(validate, settings)
+        return [t / len(values) for t in durations]
+
+    return run
+
+
+VALUES = [float(i % 300) for i in range(100)]
+case('validate.int32')(
+    validate_case(DataTypeProduct(int32=EmptyType()), list(range(100)))
+)
+case('validate.float64')(
+    validate_case(DataTypeProduct(float64=EmptyType()), VALUES)
+)
+case('validate.float64_range')(
+    validate_case(DataTypeProduct(float64=EmptyType()), VALUES, (0, 250))
+)
+case('validate_many.float64_range')(
+    validate_many_case(DataTypeProduct(float64=EmptyType()), VALUES, (0, 250))
+)
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+@contextlib.asynccontextmanager
+async def modbus_server(framer=None):
+    from pymodbus.datastore import (
+        ModbusSequentialDataBlock,
+        ModbusServerContext,
+        ModbusSlaveContext,
+    )
+    from pymodbus.server import ModbusTcpServer
+
+    block = ModbusSequentialDataBlock(0, [0] * 65536)
+    context = ModbusServerContext(
+        slaves=ModbusSlaveContext(hr=block, ir=block), single=True
+    )
+    port = free_port()
+    options = dict(framer=framer) if framer is not None else {}
+    server = ModbusTcpServer(context, address=('127.0.0.1', port), **options)
+    task = asyncio.create_task(server.serve_forever())
+    await asyncio.sleep(0.1)
+    try:
+        yield port
+    finally:
+        await server.shutdown()
+        task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
+
+
+def modbus_device(port: int, slave_id: int = 1):
+    return (
+        DeviceBuilder()
+        .eid_path(MODBUS_EID)
+        .properties(
+            dict(
+                slave_id=str(slave_id),
+                tcp_address='127.0.0.1',
+                tcp_port=str(port),
+            )
+        )
+        .build()
+    )
+
+
+async def poll(devices, settings: Settings) -> list[float]:
+    for device in devices:
+        await device.connect_async()
+    try:
+        return await time_async(
+            lambda: asyncio.gather(
+                *(device.get_values_async() for device in devices)
+            ),
+            settings,
+        )
+    finally:
+        for device in devices:
+            await device.disconnect_async()
+
+
+@case('poll.modbus_tcp')
+def poll_modbus_tcp(settings: Settings) -> list[float]:
+    async def run():
+        async with modbus_server() as port:
+            return await poll([modbus_device(port)], settings)
+
+    return asyncio.run(run())
+
+
+@case('poll.modbus_tcp_fleet')
+def poll_modbus_tcp_fleet(settings: Settings) -> list[float]:
+    async def run():
+        async with modbus_server() as port:
+            devices = [modbus_device(port, i + 1) for i in range(FLEET_SIZE)]
+            return await poll(devices, settings)
+
+    return asyncio.run(run())
+
+
+@case('poll.modbus_rtu')
+def poll_modbus_rtu(settings: Settings) -> list[float]:
+    # RTU frames are sent over a socket, which needs pyserial on the client
+    try:
+        import serial  # noqa: F401
+    except ImportError:
+        raise Skip('pyserial is not installed')
+    from pymodbus import FramerType
+    from sgr_commhandler.driver.modbus.modbus_interface_async import (
+        SGrModbusInterface,
+    )
+
+    async def run():
+        async with modbus_server(FramerType.RTU) as port:
+            builder = (
+                DeviceBuilder()
+                .eid_path(MODBUS_EID)
+                .properties(
+                    dict(slave_id='1', tcp_address='127.0.0.1', tcp_port='0')
+                )
+            )
+            frame, config = builder._load_frame()
+            interface = frame.interface_list.modbus_interface
+            description = interface.modbus_interface_description
+            description.modbus_rtu = ModbusRtu(
+                slave_addr=1,
+                port_name=f'socket://127.0.0.1:{port}',
+                baud_rate_selected=19200,
+            )
+            try:
+                device = SGrModbusInterface(frame, config)
+                return await poll([device], settings)
+            except Exception as e:
+                raise Skip(f'RTU client unavailable: {e}')
+
+    return asyncio.run(run())
+
+
+@contextlib.asynccontextmanager
+async def rest_server():
+    from aiohttp import web
+
+    async def status(request):
+        return web.json_response(dict(meters=[dict(power=12.5, total=42)]))
+
+    async def relay(request):
+        return web.json_response(dict(ison=True))
+
+    app = web.Application()
+    app.router.add_get('/status', status)
+    app.router.add_get('/relay/0', relay)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    port = free_port()
+    await web.TCPSite(runner, '127.0.0.1', port).start()
+    try:
+        yield f'http://127.0.0.1:{port}'
+    finally:
+        await runner.cleanup()
+
+
+@case('poll.rest')
+def poll_rest(settings: Settings) -> list[float]:
+    from sgr_commhandler.driver.rest.restapi_interface_async import (
+        SGrRestInterface,
+    )
+
+    async def run():
+        async with rest_server() as base_uri:
+            builder = (
+                DeviceBuilder()
+                .eid_path(REST_EID)
+                .properties(dict(baseUri=base_uri))
+            )
+            frame, config = builder._load_frame()
+            # measure the requests, not the value cache
+            device = SGrRestInterface(frame, config, cache_ttl=0)
+            return await poll([device], settings)
+
+    return asyncio.run(run())
+
+
+def summarize(name: str, durations: list[float]) -> dict:
+    ordered = sorted(durations)
+    median = statistics.median(ordered)
+    return dict(
+        name=name,
+        samples=len(ordered),
+        median_s=median,
+        p95_s=ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+        min_s=ordered[0],
+        ops_per_s=1.0 / median if median > 0 else None,
+    )
+
+
+def compare(results: list[dict], baseline: list[dict], threshold: float):
+    """
+    Compares the medians to a baseline.
+    :returns: Per case in both runs the relative change of the median, and
+        whether it exceeds the threshold
+    """
+    previous = {
+        entry['name']: entry for entry in baseline if 'median_s' in entry
+    }
+    comparison = []
+    for entry in results:
+        before = previous.get(entry['name'])
+        if before is None or 'median_s' not in entry:
+            continue
+        change = entry['median_s'] / before['median_s'] - 1.0
+        comparison.append(
+            dict(
+                name=entry['name'],
+                baseline_median_s=before['median_s'],
+                median_s=entry['median_s'],
+                change=change,
+                regression=change > threshold,
+            )
+        )
+    return comparison
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        '--filter', help='only run cases whose name contains this text'
+    )
+    parser.add_argument(
+        '--quick', action='store_true', help='fewer samples, e.g. for CI'
+    )
+    parser.add_argument('--output', help='also write the results to a file')
+    parser.add_argument('--baseline', help='results of a previous run')
+    parser.add_argument(
+        '--threshold',
+        type=float,
+        default=0.2,
+        help='relative slowdown of the median counted as regression',
+    )
+    args = parser.parse_args()
+    settings = Settings(args.quick)
+
+    results = []
+    for name, run in CASES.items():
+        if args.filter and args.filter not in name:
+            continue
+        try:
+            results.append(summarize(name, run(settings)))
+        except Skip as e:
+            results.append(dict(name=name, skipped=str(e)))
+        print(f'{name}: done', file=sys.stderr)
+
+    report: dict = dict(results=results)
+    regressions = []
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+        report['comparison'] = compare(
+            results, baseline.get('results', []), args.threshold
+        )
+        regressions = [c for c in report['comparison'] if c['regression']]
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as file:
+            file.write(text + '\n')
+    print(text)
+    if regressions:
+        names = ', '.join(c['name'] for c in regressions)
+        print(f'regressions: {names}', file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,5 @@
+import sys
+
+from sgr_commhandler.cli import main
+
+sys.exit(main())
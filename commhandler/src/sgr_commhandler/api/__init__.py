@@ -6,6 +6,29 @@ __all__ = [
     "DataPointValidator",
     "DeviceInformation",
     "ConfigurationParameter",
+    "OverflowPolicy",
+    "SubscriptionChannel",
+    "LazyMapping",
+    "ReadResult",
+    "ReadStatus",
+    "ColumnarSnapshot",
+    "SnapshotSchema",
+    "CachedValue",
+    "ValueCache",
+    "ValueCacheStatistics",
+    "ValueSource",
+    "Interceptor",
+    "InterceptorChain",
+    "Invocation",
+    "Operation",
+    "SamplingInterceptor",
+    "SpanInterceptor",
+    "TimingInterceptor",
+    "Exchange",
+    "Recording",
+    "RecordingInterceptor",
+    "ReplayInterceptor",
+    "replay_recording",
 ]
 
 from sgr_commhandler.api.configuration_parameter import ConfigurationParameter
@@ -16,3 +39,32 @@ from sgr_commhandler.api.data_point_api import (
 )
 from sgr_commhandler.api.device_api import DeviceInformation, SGrBaseInterface
 from sgr_commhandler.api.functional_profile_api import FunctionalProfile
+from sgr_commhandler.api.interceptor import (
+    Interceptor,
+    InterceptorChain,
+    Invocation,
+    Operation,
+    SamplingInterceptor,
+    SpanInterceptor,
+    TimingInterceptor,
+)
+from sgr_commhandler.api.lazy import LazyMapping
+from sgr_commhandler.api.read_result import ReadResult, ReadStatus
+from sgr_commhandler.api.recording import (
+    Exchange,
+    Recording,
+    RecordingInterceptor,
+    ReplayInterceptor,
+    replay_recording,
+)
+from sgr_commhandler.api.snapshot import ColumnarSnapshot, SnapshotSchema
+from sgr_commhandler.api.subscription_channel import (
+    OverflowPolicy,
+    SubscriptionChannel,
+)
+from sgr_commhandler.api.value_cache import (
+    CachedValue,
+    ValueCache,
+    ValueCacheStatistics,
+    ValueSource,
+)
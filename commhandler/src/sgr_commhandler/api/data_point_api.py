@@ -1,17 +1,76 @@
-from asyncio import run
-from collections.abc import Callable
-from typing import Any, Generic, Protocol, TypeVar
+import sys
+import threading
+from asyncio import gather
+from collections.abc import Awaitable, Callable, Sequence
+from typing import Any, Generic, Optional, Protocol, TypeVar
 
+from cachetools import LRUCache
 from sgr_specification.v0.generic import DataDirectionProduct
 
 from sgr_commhandler.api.data_types import DataTypes
+from sgr_commhandler.api.interceptor import (
+    InterceptorChain,
+    Invocation,
+    Operation,
+    global_interceptors,
+    intercept,
+)
+from sgr_commhandler.api.read_result import ReadResult, ReadStatus
+from sgr_commhandler.api.subscription_channel import (
+    OverflowPolicy,
+    SubscriptionChannel,
+)
+from sgr_commhandler.api.value_cache import CachedValue, ValueCache, ValueSource
+from sgr_commhandler.metrics import (
+    DATA_POINT_ERRORS,
+    DATA_POINT_READ_SECONDS,
+    DATA_POINT_WRITE_SECONDS,
+    default_registry,
+)
+from sgr_commhandler.utils.sync_runner import run_sync
 
 T = TypeVar('T')
 
+# name tuples shared by data points with the same name, bounded since
+# applications may build many device types over time. Data points built
+# after a name is evicted get a new shared tuple.
+_names: LRUCache = LRUCache(maxsize=4096)
+_names_lock = threading.Lock()
+
+
+def intern_name(fp_name: str, dp_name: str) -> tuple[str, str]:
+    """
+    Returns a shared (profile, data point) name tuple with interned strings.
+    """
+    name = (fp_name, dp_name)
+    with _names_lock:
+        shared = _names.get(name)
+        if shared is None:
+            shared = (sys.intern(fp_name), sys.intern(dp_name))
+            _names[shared] = shared
+    return shared
+
 
 class DataPointValidator(Protocol):
+    __slots__ = ()
+
     def validate(self, value: Any) -> bool: ...
 
+    def validate_many(self, values: Sequence[Any]) -> list[bool]:
+        """
+        Validates many values at once, e.g. a column of a snapshot.
+        :param values: A sequence, array or numpy array of values
+        :returns: The validation result of each value
+        """
+        return [self.validate(value) for value in values]
+
+    def trusts(self, value_type: type) -> bool:
+        """
+        Returns True if every value of the given Python type is valid, so that
+        values decoded to this type need no validation.
+        """
+        return False
+
     def data_type(self) -> DataTypes: ...
 
     def options(self) -> list[Any] | None:
@@ -19,6 +78,8 @@ class DataPointValidator(Protocol):
 
 
 class DataPointProtocol(Protocol):
+    __slots__ = ()
+
     async def set_val(self, value: Any): ...
 
     async def get_val(self, skip_cache: bool = False) -> Any: ...
@@ -27,10 +88,21 @@ class DataPointProtocol(Protocol):
 
     def direction(self) -> DataDirectionProduct: ...
 
+    def decoded_type(self) -> Optional[type]:
+        """
+        Returns the Python type that get_val always returns, if the protocol
+        decodes values to a fixed type.
+        """
+        return None
+
     def can_subscribe(self) -> bool:
         return False
 
-    def subscribe(self, fn: Callable[[Any], None]):
+    def subscribe(self, fn: Callable[[Any], Optional[Awaitable[None]]]):
+        """
+        Registers the function called with each pushed value. If it returns
+        an awaitable, the protocol awaits it before delivering the next value.
+        """
         raise Exception('Unsupported operatioin')
 
     def unsubscribe(self):
@@ -38,39 +110,234 @@ class DataPointProtocol(Protocol):
 
 
 class DataPoint(Generic[T]):
+    __slots__ = (
+        '_protocol',
+        '_validator',
+        '_listeners',
+        '_channels',
+        '_subscribed',
+        '_trusted_type',
+        '_cache',
+        '_interceptors',
+    )
+
     def __init__(
-        self, protocol: DataPointProtocol, validator: DataPointValidator
+        self,
+        protocol: DataPointProtocol,
+        validator: DataPointValidator,
+        cache: Optional[ValueCache] = None,
+        interceptors: Optional[InterceptorChain] = None,
     ):
         self._protocol = protocol
         self._validator = validator
+        self._cache = cache
+        self._interceptors = interceptors
+        # replaced on change, so that most data points share the empty tuple
+        self._listeners: tuple[Callable[[Any], None], ...] = ()
+        self._channels: tuple[SubscriptionChannel, ...] = ()
+        self._subscribed = False
+        # values of this type from the decoder of the protocol are valid
+        decoded_type = protocol.decoded_type()
+        self._trusted_type = (
+            decoded_type
+            if decoded_type is not None and validator.trusts(decoded_type)
+            else None
+        )
 
     def name(self) -> tuple[str, str]:
         return self._protocol.name()
 
-    async def get_value_async(self) -> T:
-        value = await self._protocol.get_val()
-        if self._validator.validate(value):
+    async def get_value_async(self, max_age: Optional[float] = None) -> T:
+        """
+        Returns the cached value if it is fresh enough, otherwise reads the
+        value from the device.
+        :param max_age: The maximum age of the cached value in seconds, 0
+            always reads the device, defaults to the TTL of the data point
+        """
+        skip_cache = max_age is not None and max_age <= 0
+        if self._cache is None:
+            return await self._read(skip_cache)
+        return await self._cache.read_through(
+            self.name(), lambda: self._read(skip_cache), max_age
+        )
+
+    async def _read(self, skip_cache: bool) -> T:
+        start = default_registry.clock()
+        if start is None:
+            return await self._read_value(skip_cache)
+        try:
+            return await self._read_value(skip_cache)
+        except Exception:
+            default_registry.increment(
+                DATA_POINT_ERRORS, (*self.name(), 'read')
+            )
+            raise
+        finally:
+            default_registry.observe_since(
+                DATA_POINT_READ_SECONDS, self.name(), start
+            )
+
+    async def _read_value(self, skip_cache: bool) -> T:
+        chain = self._interceptors
+        if global_interceptors.interceptors or (
+            chain is not None and chain.interceptors
+        ):
+            value = await intercept(
+                chain,
+                Invocation(
+                    Operation.READ,
+                    self.name(),
+                    attributes=dict(skip_cache=skip_cache),
+                ),
+                lambda invocation: self._protocol.get_val(skip_cache),
+            )
+        else:
+            value = await self._protocol.get_val(skip_cache)
+        if type(value) is self._trusted_type or self._validator.validate(value):
+            if self._channels and not self._subscribed:
+                # protocols without push support feed channels from reads
+                result = self._on_value(value)
+                if result is not None:
+                    await result
             return value
         raise Exception(
             f'invalid value read from device, {value}, validator: {self._validator.data_type()}'
         )
 
-    def get_value(self) -> T:
-        return run(self.get_value_async())
+    async def read_async(self) -> ReadResult:
+        """
+        Reads the value like get_value_async, but reports failures in the
+        result instead of raising.
+        """
+        try:
+            return ReadResult(ReadStatus.OK, await self.get_value_async())
+        except Exception as e:
+            return ReadResult(ReadStatus.ERROR, error=e)
+
+    def get_value(self, max_age: Optional[float] = None) -> T:
+        return run_sync(self.get_value_async(max_age))
+
+    def cached_value(self) -> Optional[CachedValue]:
+        """
+        Returns the last value read or pushed, regardless of its age.
+        """
+        if self._cache is None:
+            return None
+        return self._cache.peek(self.name())
 
     async def set_value_async(self, value: T):
-        if self._validator.validate(value):
-            return await self._protocol.set_val(value)
-        raise Exception('invalid data to write to device')
+        start = default_registry.clock()
+        try:
+            if self._validator.validate(value):
+                try:
+                    return await self._write_value(value)
+                finally:
+                    if self._cache is not None:
+                        self._cache.invalidate(self.name())
+            raise Exception('invalid data to write to device')
+        except Exception:
+            if start is not None:
+                default_registry.increment(
+                    DATA_POINT_ERRORS, (*self.name(), 'write')
+                )
+            raise
+        finally:
+            default_registry.observe_since(
+                DATA_POINT_WRITE_SECONDS, self.name(), start
+            )
+
+    async def _write_value(self, value: T):
+        chain = self._interceptors
+        if global_interceptors.interceptors or (
+            chain is not None and chain.interceptors
+        ):
+            return await intercept(
+                chain,
+                Invocation(Operation.WRITE, self.name(), value),
+                lambda invocation: self._protocol.set_val(invocation.value),
+            )
+        return await self._protocol.set_val(value)
 
     def set_value(self, value: T):
-        return run(self.set_value_async(value))
+        return run_sync(self.set_value_async(value))
 
     def subscribe(self, fn: Callable[[Any], None]):
-        self._protocol.subscribe(fn)
+        self._ensure_subscribed()
+        self._listeners = self._listeners + (fn,)
 
     def unsubscribe(self):
-        self._protocol.unsubscribe()
+        self._listeners = ()
+        if not self._channels:
+            self._release_subscription()
+
+    def subscribe_channel(
+        self,
+        maxsize: int = 100,
+        policy: OverflowPolicy = OverflowPolicy.KEEP_LATEST,
+    ) -> SubscriptionChannel:
+        """
+        Creates a channel receiving the updates of this data point.
+        Updates are pushed by protocols that support subscriptions, and
+        taken from successful reads otherwise.
+        :param maxsize: The maximum number of pending updates
+        :param policy: What to do when the consumer falls behind
+        """
+        channel = SubscriptionChannel(maxsize, policy)
+        self.attach_channel(channel)
+        return channel
+
+    def attach_channel(self, channel: SubscriptionChannel):
+        """
+        Feeds the updates of this data point into an existing channel,
+        e.g. to consume several data points in one loop.
+        """
+        if self._protocol.can_subscribe():
+            self._ensure_subscribed()
+        self._channels = self._channels + (channel,)
+
+    def detach_channel(self, channel: SubscriptionChannel):
+        self._channels = tuple(c for c in self._channels if c is not channel)
+        if not self._channels and not self._listeners:
+            self._release_subscription()
+
+    def _ensure_subscribed(self):
+        if not self._subscribed:
+            self._protocol.subscribe(self._on_push)
+            self._subscribed = True
+
+    def _release_subscription(self):
+        if self._subscribed:
+            self._protocol.unsubscribe()
+            self._subscribed = False
+
+    def _on_push(self, value: Any) -> Optional[Awaitable[None]]:
+        if self._cache is not None and (
+            type(value) is self._trusted_type or self._validator.validate(value)
+        ):
+            self._cache.put(self.name(), value, ValueSource.PUSH)
+        return self._on_value(value)
+
+    def _on_value(self, value: Any) -> Optional[Awaitable[None]]:
+        for fn in self._listeners:
+            fn(value)
+        blocked = None
+        if self._channels:
+            name = self.name()
+            for channel in self._channels:
+                if not channel.offer(name, value) and not channel.closed():
+                    blocked = (blocked or []) + [channel]
+        if blocked:
+            return self._put_blocked(blocked, value)
+        return None
+
+    async def _put_blocked(
+        self, channels: list[SubscriptionChannel], value: Any
+    ):
+        name = self.name()
+        await gather(
+            *(channel.put(name, value) for channel in channels),
+            return_exceptions=True,
+        )
 
     def direction(self) -> DataDirectionProduct:
         return self._protocol.direction()
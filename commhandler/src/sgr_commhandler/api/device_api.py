@@ -1,8 +1,9 @@
 import configparser
-from asyncio import run
+import time
+from asyncio import gather
 from collections.abc import Mapping
 from dataclasses import dataclass
-from typing import Any, Protocol
+from typing import Any, Optional, Protocol
 
 from sgr_specification.v0.generic import DataDirectionProduct, DeviceCategory
 from sgr_specification.v0.product.product import DeviceFrame
@@ -14,6 +15,15 @@ from sgr_commhandler.api.configuration_parameter import (
 )
 from sgr_commhandler.api.data_types import DataTypes
 from sgr_commhandler.api.functional_profile_api import FunctionalProfile
+from sgr_commhandler.api.interceptor import InterceptorChain
+from sgr_commhandler.api.read_result import (
+    ReadResult,
+    read_data_point_list,
+    read_data_points,
+)
+from sgr_commhandler.api.snapshot import ColumnarSnapshot, SnapshotSchema
+from sgr_commhandler.api.value_cache import ValueCache
+from sgr_commhandler.utils.sync_runner import run_sync
 
 
 @dataclass
@@ -31,11 +41,21 @@ class SGrBaseInterface(Protocol):
     configurations_params: list[ConfigurationParameter]
     device_information: DeviceInformation
     function_profiles: Mapping[str, FunctionalProfile]
+    value_cache: ValueCache
+    interceptors: InterceptorChain
 
     def _inititalize_device(
-        self, frame: DeviceFrame, configuration: configparser.ConfigParser
+        self,
+        frame: DeviceFrame,
+        configuration: configparser.ConfigParser,
+        value_cache: Optional[ValueCache] = None,
     ):
         self.frame = frame
+        self.value_cache = (
+            value_cache if value_cache is not None else ValueCache()
+        )
+        # applied after the global interceptors
+        self.interceptors = InterceptorChain()
         self.configurations_params = build_configurations_parameters(
             frame.configuration_list
         )
@@ -63,17 +83,24 @@ class SGrBaseInterface(Protocol):
         )
 
     def connect(self):
-        run(self.connect_async())
+        run_sync(self.connect_async())
 
     async def connect_async(self): ...
 
     def disconnect(self):
-        run(self.disconnect_async())
+        run_sync(self.disconnect_async())
 
     async def disconnect_async(self): ...
 
     def is_connected(self) -> bool: ...
 
+    def transport_key(self) -> str:
+        """
+        Identifies the transport the device is reached through. Devices with
+        the same key share a bottleneck, e.g. a serial bus or a gateway.
+        """
+        return f'device:{id(self)}'
+
     def get_function_profile(
         self, function_profile_name: str
     ) -> FunctionalProfile:
@@ -89,19 +116,61 @@ class SGrBaseInterface(Protocol):
         return data_points
 
     def get_values(self) -> dict[tuple[str, str], Any]:
-        return run(self.get_values_async())
+        return run_sync(self.get_values_async())
 
     async def get_values_async(self) -> dict[tuple[str, str], Any]:
+        fps = list(self.function_profiles.values())
+        results = await gather(*(fp.get_value_async() for fp in fps))
         data = {}
-        for fp in self.function_profiles.values():
+        for fp, values in zip(fps, results):
             data.update(
-                {
-                    (fp.name(), key): value
-                    for key, value in (await fp.get_value_async()).items()
-                }
+                {(fp.name(), key): value for key, value in values.items()}
             )
         return data
 
+    async def read_values_async(
+        self, timeout: Optional[float] = None
+    ) -> dict[tuple[str, str], ReadResult]:
+        """
+        Reads all data points, a failing data point does not affect the
+        others.
+        :param timeout: The time after which outstanding reads are cancelled
+            and reported as timed out, in seconds
+        :returns: The result of each data point
+        """
+        return await read_data_points(self.get_data_points(), timeout)
+
+    def read_values(
+        self, timeout: Optional[float] = None
+    ) -> dict[tuple[str, str], ReadResult]:
+        return run_sync(self.read_values_async(timeout))
+
+    async def read_snapshot_async(
+        self,
+        timeout: Optional[float] = None,
+        snapshot: Optional[ColumnarSnapshot] = None,
+        label: str = '',
+    ) -> ColumnarSnapshot:
+        """
+        Reads all data points into a row of a columnar snapshot.
+        :param timeout: The time after which outstanding reads are cancelled
+            and reported as timed out, in seconds
+        :param snapshot: The snapshot to append to, of this device's schema
+        :param label: Identifies the row, e.g. the device name
+        :returns: The snapshot
+        """
+        schema = SnapshotSchema.of(self)
+        if snapshot is None:
+            snapshot = ColumnarSnapshot(schema)
+        elif snapshot.schema != schema:
+            raise Exception('snapshot schema does not match the device')
+        timestamp = time.time()
+        results = await read_data_point_list(
+            [self.get_data_point(key) for key in schema.keys], timeout
+        )
+        snapshot.append(results, timestamp, label)
+        return snapshot
+
     def describe(
         self,
     ) -> tuple[
@@ -1,10 +1,14 @@
-from asyncio import run
+from asyncio import gather
 from asyncio.protocols import Protocol
+from typing import Optional
 
 from sgr_specification.v0.generic import DataDirectionProduct
 
 from sgr_commhandler.api.data_point_api import DataPoint
 from sgr_commhandler.api.data_types import DataTypes
+from sgr_commhandler.api.lazy import LazyMapping
+from sgr_commhandler.api.read_result import ReadResult, read_data_points
+from sgr_commhandler.utils.sync_runner import run_sync
 
 
 class FunctionalProfile(Protocol):
@@ -16,16 +20,41 @@ class FunctionalProfile(Protocol):
         return self.get_data_points()[(self.name(), dp_name)]
 
     async def get_value_async(self) -> dict[str, DataPoint]:
-        return {
-            key[1]: await dp.get_value_async()
-            for key, dp in self.get_data_points().items()
-        }
+        # data points are read concurrently, transports limit the number of
+        # requests in flight
+        data_points = self.get_data_points()
+        keys = list(data_points.keys())
+        values = await gather(
+            *(data_points[key].get_value_async() for key in keys)
+        )
+        return {key[1]: value for key, value in zip(keys, values)}
+
+    async def read_values_async(
+        self, timeout: Optional[float] = None
+    ) -> dict[str, ReadResult]:
+        """
+        Reads all data points, a failing data point does not affect the
+        others.
+        :param timeout: The time after which outstanding reads are reported
+            as timed out, in seconds
+        """
+        results = await read_data_points(self.get_data_points(), timeout)
+        return {key[1]: result for key, result in results.items()}
 
     def get_value(self) -> dict[str, DataPoint]:
-        return run(self.get_value_async())
+        return run_sync(self.get_value_async())
 
     def describe(
         self,
     ) -> tuple[str, dict[str, tuple[DataDirectionProduct, DataTypes]]]:
-        infos = map(lambda dp: dp.describe(), self.get_data_points().values())
+        data_points = self.get_data_points()
+        if isinstance(data_points, LazyMapping):
+            # served from the specification, without building data points
+            # unless it is incomplete
+            return self.name(), {
+                key[1]: data_points.metadata(key)
+                or data_points[key].describe()[1:]
+                for key in data_points
+            }
+        infos = map(lambda dp: dp.describe(), data_points.values())
         return self.name(), {dp[0][1]: (dp[1], dp[2]) for dp in infos}
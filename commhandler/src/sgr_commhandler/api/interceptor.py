@@ -0,0 +1,248 @@
+import contextvars
+import random
+import time
+from collections import deque
+from collections.abc import Awaitable, Callable, Iterable
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Any, Optional, Protocol
+
+
+class Operation(Enum):
+    READ = 'READ'
+    WRITE = 'WRITE'
+    REQUEST = 'REQUEST'
+    # an inbound message of a messaging device
+    MESSAGE = 'MESSAGE'
+
+
+@dataclass
+class Invocation:
+    """
+    A data point read or write, a transport request or an inbound message.
+    Interceptors may change the value of writes before passing the
+    invocation on.
+    """
+
+    operation: Operation
+    # the data point, empty for transport requests and messages
+    name: tuple[str, str] = ('', '')
+    value: Any = None
+    transport: str = ''
+    # e.g. the register address or URL of a request
+    attributes: dict[str, Any] = field(default_factory=dict)
+
+    def is_data_point(self) -> bool:
+        return self.operation in (Operation.READ, Operation.WRITE)
+
+    def span_name(self) -> str:
+        if not self.is_data_point():
+            return f'{self.operation.value} {self.transport}'
+        return f'{self.operation.value} {self.name[0]}/{self.name[1]}'
+
+
+Call = Callable[[Invocation], Awaitable[Any]]
+
+
+class Interceptor(Protocol):
+    async def intercept(self, invocation: Invocation, call_next: Call) -> Any:
+        """
+        Handles an invocation, usually by awaiting call_next with it.
+        :param invocation: The invocation
+        :param call_next: Calls the next interceptor or the driver
+        :returns: The result of the invocation
+        """
+        ...
+
+
+class InterceptorChain:
+    """
+    Interceptors called in order around driver calls. The chain is replaced
+    on change, so that it can be modified while invocations run.
+    """
+
+    def __init__(self, interceptors: Iterable[Interceptor] = ()):
+        self.interceptors: tuple[Interceptor, ...] = tuple(interceptors)
+
+    def add(self, interceptor: Interceptor) -> 'InterceptorChain':
+        self.interceptors = self.interceptors + (interceptor,)
+        return self
+
+    def remove(self, interceptor: Interceptor):
+        self.interceptors = tuple(
+            i for i in self.interceptors if i is not interceptor
+        )
+
+    def clear(self):
+        self.interceptors = ()
+
+    def __len__(self) -> int:
+        return len(self.interceptors)
+
+
+# applied to every device, before the interceptors of the device
+global_interceptors = InterceptorChain()
+
+
+def has_interceptors(chain: Optional[InterceptorChain]) -> bool:
+    return bool(global_interceptors.interceptors) or (
+        chain is not None and bool(chain.interceptors)
+    )
+
+
+async def intercept(
+    chain: Optional[InterceptorChain], invocation: Invocation, call: Call
+) -> Any:
+    """
+    Runs an invocation through the global interceptors and a device chain.
+    :param chain: The interceptors of the device
+    :param invocation: The invocation
+    :param call: Performs the invocation in the driver
+    :returns: The result of the invocation
+    """
+    interceptors = global_interceptors.interceptors
+    if chain is not None:
+        interceptors = interceptors + chain.interceptors
+
+    def bind(index: int) -> Call:
+        if index == len(interceptors):
+            return call
+        interceptor = interceptors[index]
+        call_next = bind(index + 1)
+        return lambda inv: interceptor.intercept(inv, call_next)
+
+    return await bind(0)(invocation)
+
+
+@dataclass
+class Timing:
+    invocation: Invocation
+    duration: float
+    error: Optional[BaseException] = None
+
+
+class TimingInterceptor:
+    """
+    Measures the duration of invocations, keeping the most recent timings
+    unless a callback is given.
+    """
+
+    def __init__(
+        self,
+        callback: Optional[Callable[[Timing], None]] = None,
+        maxlen: int = 1000,
+    ):
+        self._callback = callback
+        self.timings: deque[Timing] = deque(maxlen=maxlen)
+
+    async def intercept(self, invocation: Invocation, call_next: Call) -> Any:
+        error: Optional[BaseException] = None
+        start = time.perf_counter()
+        try:
+            return await call_next(invocation)
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            timing = Timing(invocation, time.perf_counter() - start, error)
+            if self._callback is not None:
+                self._callback(timing)
+            else:
+                self.timings.append(timing)
+
+
+@dataclass
+class Span:
+    name: str
+    attributes: dict[str, Any]
+    start: float
+    end: Optional[float] = None
+    parent: Optional['Span'] = None
+    error: Optional[BaseException] = None
+
+    def duration(self) -> Optional[float]:
+        return None if self.end is None else self.end - self.start
+
+
+_current_span: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar(
+    'sgr_current_span', default=None
+)
+
+
+class SpanInterceptor:
+    """
+    Records a span per invocation, nested like the invocations, e.g. the
+    transport requests of a data point read.
+
+    With an OpenTelemetry tracer, spans are started on the tracer instead.
+    Otherwise finished spans are passed to the exporter, or kept in the
+    most recent spans.
+    """
+
+    def __init__(
+        self,
+        tracer: Any = None,
+        exporter: Optional[Callable[[Span], None]] = None,
+        maxlen: int = 1000,
+    ):
+        self._tracer = tracer
+        self._exporter = exporter
+        self.spans: deque[Span] = deque(maxlen=maxlen)
+
+    async def intercept(self, invocation: Invocation, call_next: Call) -> Any:
+        attributes = dict(invocation.attributes)
+        attributes['sgr.operation'] = invocation.operation.value
+        if invocation.is_data_point():
+            attributes['sgr.profile'] = invocation.name[0]
+            attributes['sgr.data_point'] = invocation.name[1]
+        if invocation.transport:
+            attributes['sgr.transport'] = invocation.transport
+        if self._tracer is not None:
+            with self._tracer.start_as_current_span(
+                invocation.span_name(), attributes=attributes
+            ):
+                return await call_next(invocation)
+
+        span = Span(
+            invocation.span_name(),
+            attributes,
+            time.time(),
+            parent=_current_span.get(),
+        )
+        token = _current_span.set(span)
+        try:
+            return await call_next(invocation)
+        except BaseException as e:
+            span.error = e
+            raise
+        finally:
+            _current_span.reset(token)
+            span.end = time.time()
+            if self._exporter is not None:
+                self._exporter(span)
+            else:
+                self.spans.append(span)
+
+
+class SamplingInterceptor:
+    """
+    Applies an interceptor to a random share of the invocations, e.g. to
+    trace a busy fleet at low overhead.
+    """
+
+    def __init__(
+        self,
+        interceptor: Interceptor,
+        rate: float,
+        random_fn: Callable[[], float] = random.random,
+    ):
+        if not 0.0 <= rate <= 1.0:
+            raise Exception('sampling rate must be between 0 and 1')
+        self._interceptor = interceptor
+        self._rate = rate
+        self._random = random_fn
+
+    async def intercept(self, invocation: Invocation, call_next: Call) -> Any:
+        if self._random() < self._rate:
+            return await self._interceptor.intercept(invocation, call_next)
+        return await call_next(invocation)
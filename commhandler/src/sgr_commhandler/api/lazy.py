@@ -0,0 +1,121 @@
+from collections.abc import Callable, Iterable, Iterator, Mapping
+from functools import partial
+from typing import Any, Optional, TypeVar
+
+from sgr_specification.v0.generic import DataDirectionProduct
+
+from sgr_commhandler.api.data_point_api import DataPoint
+from sgr_commhandler.api.data_types import DataTypes
+from sgr_commhandler.validators.resolver import build_validator
+
+K = TypeVar('K')
+V = TypeVar('V')
+S = TypeVar('S')
+
+
+class LazyMapping(Mapping[K, V]):
+    """
+    Mapping whose values are built on first access.
+
+    Iterating keys does not build values, optional metadata per key can be
+    used to describe values that have not been built yet.
+    """
+
+    __slots__ = ('_factories', '_values', '_metadata')
+
+    def __init__(
+        self,
+        factories: dict[K, Callable[[], V]],
+        metadata: Optional[dict[K, Any]] = None,
+    ):
+        self._factories = factories
+        self._values: dict[K, V] = {}
+        self._metadata = metadata if metadata is not None else {}
+
+    def __getitem__(self, key: K) -> V:
+        value = self._values.get(key)
+        if value is None:
+            value = self._factories[key]()
+            self._values[key] = value
+        return value
+
+    def __iter__(self) -> Iterator[K]:
+        return iter(self._factories)
+
+    def __len__(self) -> int:
+        return len(self._factories)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._factories
+
+    def metadata(self, key: K) -> Any:
+        return self._metadata.get(key)
+
+    def materialized(self) -> int:
+        """
+        Returns the number of values built so far.
+        """
+        return len(self._values)
+
+
+def _functional_profile_name(fp_spec: Any) -> str:
+    if (
+        fp_spec.functional_profile
+        and fp_spec.functional_profile.functional_profile_name
+    ):
+        return fp_spec.functional_profile.functional_profile_name
+    return ''
+
+
+def build_functional_profiles(
+    fp_specs: Iterable[S], build: Callable[[S], V], lazy: bool = False
+) -> Mapping[str, V]:
+    """
+    Builds the functional profiles of a device, keyed by name.
+    :param fp_specs: The functional profile specifications
+    :param build: Builds a functional profile from its specification
+    :param lazy: Build each profile on first access
+    """
+    if not lazy:
+        fps = [build(fp_spec) for fp_spec in fp_specs]
+        return {fp.name(): fp for fp in fps}
+    return LazyMapping(
+        {
+            _functional_profile_name(fp_spec): partial(build, fp_spec)
+            for fp_spec in fp_specs
+        }
+    )
+
+
+def build_data_points(
+    fp_name: str,
+    dp_specs: Iterable[S],
+    build: Callable[[S], DataPoint],
+    lazy: bool = False,
+) -> Mapping[tuple[str, str], DataPoint]:
+    """
+    Builds the data points of a functional profile, keyed by profile and
+    data point name. Lazy data points with a data direction are described
+    from their specification until they are built, the others are built
+    when described, so that they are described like eager data points.
+    :param fp_name: The name of the functional profile
+    :param dp_specs: The data point specifications
+    :param build: Builds a data point from its specification
+    :param lazy: Build each data point on first access
+    """
+    if not lazy:
+        dps = [build(dp_spec) for dp_spec in dp_specs]
+        return {dp.name(): dp for dp in dps}
+    factories: dict[tuple[str, str], Callable[[], DataPoint]] = {}
+    metadata: dict[tuple[str, str], tuple[DataDirectionProduct, DataTypes]] = {}
+    for dp_spec in dp_specs:
+        dp = dp_spec.data_point
+        key = (fp_name, dp.data_point_name if dp and dp.data_point_name else '')
+        factories[key] = partial(build, dp_spec)
+        if dp is not None and dp.data_direction is not None:
+            # the validator is shared with the data point once it is built
+            validator = build_validator(
+                dp.data_type, dp.minimum_value, dp.maximum_value
+            )
+            metadata[key] = (dp.data_direction, validator.data_type())
+    return LazyMapping(factories, metadata)
@@ -0,0 +1,77 @@
+import asyncio
+from collections.abc import Mapping, Sequence
+from dataclasses import dataclass
+from enum import Enum
+from typing import TYPE_CHECKING, Any, Optional, TypeVar
+
+from sgr_commhandler.metrics import DATA_POINT_TIMEOUTS, default_registry
+
+if TYPE_CHECKING:
+    from sgr_commhandler.api.data_point_api import DataPoint
+
+K = TypeVar('K')
+
+
+class ReadStatus(Enum):
+    OK = 'OK'
+    ERROR = 'ERROR'
+    TIMEOUT = 'TIMEOUT'
+
+
+@dataclass
+class ReadResult:
+    status: ReadStatus
+    value: Any = None
+    error: Optional[Exception] = None
+
+    def ok(self) -> bool:
+        return self.status is ReadStatus.OK
+
+
+async def read_data_points(
+    data_points: Mapping[K, 'DataPoint'], timeout: Optional[float] = None
+) -> dict[K, ReadResult]:
+    """
+    Reads data points concurrently, isolating their failures.
+    :param data_points: The data points to read
+    :param timeout: The time after which outstanding reads are cancelled
+        and reported as timed out, in seconds
+    :returns: The result of each data point
+    """
+    keys = list(data_points.keys())
+    results = await read_data_point_list(
+        [data_points[key] for key in keys], timeout
+    )
+    return dict(zip(keys, results))
+
+
+async def read_data_point_list(
+    data_points: Sequence['DataPoint'], timeout: Optional[float] = None
+) -> list[ReadResult]:
+    """
+    Like read_data_points, for data points in a fixed order.
+    """
+    if not data_points:
+        return []
+    tasks = [asyncio.ensure_future(dp.read_async()) for dp in data_points]
+    pending: set[asyncio.Future] = set(tasks)
+    try:
+        _, pending = await asyncio.wait(tasks, timeout=timeout)
+        for dp, task in zip(data_points, tasks):
+            if task in pending:
+                default_registry.increment(DATA_POINT_TIMEOUTS, dp.name())
+    finally:
+        # also when the caller is cancelled, no read outlives the call
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+    return [
+        ReadResult(
+            ReadStatus.TIMEOUT,
+            error=asyncio.TimeoutError(f'read of {dp.name()} timed out'),
+        )
+        if task in pending
+        else task.result()
+        for dp, task in zip(data_points, tasks)
+    ]
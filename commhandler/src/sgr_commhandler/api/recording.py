@@ -0,0 +1,309 @@
+import asyncio
+import json
+import time
+from collections import defaultdict
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Optional
+
+from sgr_commhandler.api.interceptor import Call, Invocation, Operation
+
+if TYPE_CHECKING:
+    from sgr_commhandler.api.device_api import SGrBaseInterface
+
+
+def _encode(value: Any) -> Any:
+    """
+    Converts a value to JSON, tagging values JSON has no type for.
+    """
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, bytes):
+        return dict(bytes=value.hex())
+    if isinstance(value, (list, tuple)):
+        return dict(list=[_encode(item) for item in value])
+    if isinstance(value, dict):
+        return dict(dict={str(k): _encode(v) for k, v in value.items()})
+    # only recorded if the REST driver is in use
+    from sgr_commhandler.driver.rest.restapi_interface_async import (
+        RestResponse,
+    )
+
+    if isinstance(value, RestResponse):
+        headers = value.headers.header if value.headers else []
+        return dict(
+            rest=dict(
+                headers=[[h.header_name, h.value] for h in headers],
+                body=value.body,
+            )
+        )
+    raise Exception(f'cannot record values of type {type(value).__name__}')
+
+
+def _decode(value: Any) -> Any:
+    if not isinstance(value, dict):
+        return value
+    if 'bytes' in value:
+        return bytes.fromhex(value['bytes'])
+    if 'list' in value:
+        return [_decode(item) for item in value['list']]
+    if 'dict' in value:
+        return {k: _decode(v) for k, v in value['dict'].items()}
+    if 'rest' in value:
+        from sgr_specification.v0.product import HeaderEntry, HeaderList
+
+        from sgr_commhandler.driver.rest.restapi_interface_async import (
+            RestResponse,
+        )
+
+        headers = HeaderList(
+            header=[
+                HeaderEntry(header_name=name, value=text)
+                for name, text in value['rest']['headers']
+            ]
+        )
+        return RestResponse(headers=headers, body=value['rest']['body'])
+    raise Exception(f'unknown recorded value {value}')
+
+
+def _request_key(
+    operation: Operation,
+    transport: str,
+    attributes: dict[str, Any],
+    value: Any,
+) -> str:
+    return json.dumps(
+        [operation.value, transport, attributes, value],
+        sort_keys=True,
+        default=str,
+    )
+
+
+@dataclass
+class Exchange:
+    """
+    A recorded invocation and its outcome. Values and results are stored in
+    their JSON encoding.
+    """
+
+    operation: Operation
+    # seconds since the recording started
+    start: float
+    duration: float
+    name: tuple[str, str] = ('', '')
+    transport: str = ''
+    attributes: dict[str, Any] = field(default_factory=dict)
+    value: Any = None
+    result: Any = None
+    error: Optional[str] = None
+
+    def request_key(self) -> str:
+        return _request_key(
+            self.operation, self.transport, self.attributes, self.value
+        )
+
+    def to_json(self) -> dict[str, Any]:
+        return dict(
+            operation=self.operation.value,
+            start=self.start,
+            duration=self.duration,
+            name=list(self.name),
+            transport=self.transport,
+            attributes=self.attributes,
+            value=self.value,
+            result=self.result,
+            error=self.error,
+        )
+
+    @staticmethod
+    def from_json(data: dict[str, Any]) -> 'Exchange':
+        name = data.get('name') or ('', '')
+        return Exchange(
+            operation=Operation(data['operation']),
+            start=data['start'],
+            duration=data['duration'],
+            name=(name[0], name[1]),
+            transport=data.get('transport', ''),
+            attributes=data.get('attributes') or {},
+            value=data.get('value'),
+            result=data.get('result'),
+            error=data.get('error'),
+        )
+
+
+class Recording:
+    """
+    Recorded exchanges, stored as JSON lines.
+    """
+
+    def __init__(self, exchanges: Iterable[Exchange] = ()):
+        self.exchanges: list[Exchange] = list(exchanges)
+
+    def save(self, path: str):
+        with open(path, 'w') as file:
+            for exchange in sorted(self.exchanges, key=lambda e: e.start):
+                file.write(json.dumps(exchange.to_json()) + '\n')
+
+    @staticmethod
+    def load(path: str) -> 'Recording':
+        with open(path) as file:
+            return Recording(
+                Exchange.from_json(json.loads(line))
+                for line in file
+                if line.strip()
+            )
+
+    def __len__(self) -> int:
+        return len(self.exchanges)
+
+
+class RecordingInterceptor:
+    """
+    Records invocations with their results and timing, e.g. the traffic of
+    a real device to replay it later without the device.
+    """
+
+    def __init__(
+        self,
+        recording: Optional[Recording] = None,
+        operations: Iterable[Operation] = tuple(Operation),
+    ):
+        self.recording = recording if recording is not None else Recording()
+        self._operations = frozenset(operations)
+        self._origin = time.monotonic()
+
+    async def intercept(self, invocation: Invocation, call_next: Call) -> Any:
+        if invocation.operation not in self._operations:
+            return await call_next(invocation)
+        exchange = Exchange(
+            invocation.operation,
+            time.monotonic() - self._origin,
+            0.0,
+            invocation.name,
+            invocation.transport,
+            dict(invocation.attributes),
+            _encode(invocation.value),
+        )
+        try:
+            result = await call_next(invocation)
+            exchange.result = _encode(result)
+            return result
+        except Exception as e:
+            exchange.error = str(e)
+            raise
+        finally:
+            exchange.duration = (
+                time.monotonic() - self._origin - exchange.start
+            )
+            self.recording.exchanges.append(exchange)
+
+
+class ReplayInterceptor:
+    """
+    Answers transport requests from a recording instead of the device. Each
+    request is answered with the responses recorded for the same request,
+    in order, starting over when they are used up if cycle is set.
+
+    With speed 0 responses are served at once, otherwise they take the
+    recorded duration divided by speed.
+    """
+
+    def __init__(
+        self, recording: Recording, speed: float = 0.0, cycle: bool = True
+    ):
+        self._speed = speed
+        self._cycle = cycle
+        self._responses: dict[str, list[Exchange]] = defaultdict(list)
+        for exchange in sorted(recording.exchanges, key=lambda e: e.start):
+            if exchange.operation is Operation.REQUEST:
+                self._responses[exchange.request_key()].append(exchange)
+        self._next: dict[str, int] = defaultdict(int)
+
+    async def intercept(self, invocation: Invocation, call_next: Call) -> Any:
+        if invocation.operation is not Operation.REQUEST:
+            return await call_next(invocation)
+        key = _request_key(
+            invocation.operation,
+            invocation.transport,
+            invocation.attributes,
+            _encode(invocation.value),
+        )
+        exchanges = self._responses.get(key)
+        if not exchanges:
+            raise Exception(
+                f'no recorded response to {invocation.span_name()} '
+                f'{invocation.attributes}'
+            )
+        index = self._next[key]
+        if index == len(exchanges):
+            if not self._cycle:
+                raise Exception(
+                    f'recorded responses to {invocation.span_name()} '
+                    f'{invocation.attributes} used up'
+                )
+            index = 0
+        self._next[key] = index + 1
+        exchange = exchanges[index]
+        # yields at least once like I/O, so that concurrent requests for the
+        # same resource are shared as when recorded
+        await asyncio.sleep(
+            exchange.duration / self._speed if self._speed > 0 else 0
+        )
+        if exchange.error is not None:
+            raise Exception(exchange.error)
+        return _decode(exchange.result)
+
+
+async def _repeat(device: 'SGrBaseInterface', exchange: Exchange) -> Any:
+    if exchange.operation is Operation.READ:
+        # the recorded read went to the device, so does this one
+        return await device.get_data_point(exchange.name).get_value_async(
+            max_age=0
+        )
+    if exchange.operation is Operation.WRITE:
+        return await device.get_data_point(exchange.name).set_value_async(
+            _decode(exchange.value)
+        )
+    handle_message = getattr(device, 'handle_message', None)
+    if handle_message is None:
+        raise Exception('device does not receive messages')
+    return await handle_message(
+        exchange.attributes['topic'], _decode(exchange.value)
+    )
+
+
+async def replay_recording(
+    device: 'SGrBaseInterface', recording: Recording, speed: float = 0.0
+) -> list[Any]:
+    """
+    Repeats the recorded data point reads and writes and inbound messages
+    on a device. Together with a ReplayInterceptor on the device, this
+    reproduces a recorded polling pattern without the device.
+    :param device: The device
+    :param recording: The recording
+    :param speed: Divides the recorded times, 0 starts the invocations
+        back to back
+    :returns: The results of the invocations, or their exceptions
+    """
+    exchanges = sorted(
+        (
+            e
+            for e in recording.exchanges
+            if e.operation is not Operation.REQUEST
+        ),
+        key=lambda e: e.start,
+    )
+    if not exchanges:
+        return []
+    loop = asyncio.get_running_loop()
+    origin = loop.time() - exchanges[0].start / speed if speed > 0 else 0.0
+    tasks = []
+    for exchange in exchanges:
+        if speed > 0:
+            delay = origin + exchange.start / speed - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+        tasks.append(asyncio.ensure_future(_repeat(device, exchange)))
+        # starts the invocation before the next one, like when recorded
+        await asyncio.sleep(0)
+    return await asyncio.gather(*tasks, return_exceptions=True)
@@ -0,0 +1,249 @@
+import dataclasses
+import weakref
+from array import array
+from collections.abc import Mapping, Sequence
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Optional, Union
+
+from sgr_specification.v0.product import DeviceFrame
+
+from sgr_commhandler.api.data_types import DataTypes
+from sgr_commhandler.api.read_result import ReadResult, ReadStatus
+
+if TYPE_CHECKING:
+    from sgr_commhandler.api.device_api import SGrBaseInterface
+
+# typecodes of the value arrays, other types are stored in lists. A column
+# becomes a list when a value does not fit its array, e.g. a uint64 beyond
+# int64 or a string returned for an integer data point.
+_TYPECODES: dict[DataTypes, str] = {
+    DataTypes.INT: 'q',
+    DataTypes.FLOAT: 'd',
+    DataTypes.BOOLEAN: 'b',
+}
+_STATUS_CODES: dict[ReadStatus, int] = {
+    ReadStatus.OK: 0,
+    ReadStatus.ERROR: 1,
+    ReadStatus.TIMEOUT: 2,
+}
+STATUS_MISSING = 3
+
+Column = Union[array, list]
+
+
+@dataclass(frozen=True)
+class SnapshotSchema:
+    """
+    The data points of a device type, in column order.
+    """
+
+    keys: tuple[tuple[str, str], ...]
+    data_types: tuple[DataTypes, ...]
+    units: tuple[str, ...]
+    _index: dict[tuple[str, str], int] = field(
+        init=False, repr=False, compare=False, hash=False
+    )
+
+    def __post_init__(self):
+        object.__setattr__(
+            self, '_index', {key: i for i, key in enumerate(self.keys)}
+        )
+
+    def index(self, key: tuple[str, str]) -> int:
+        return self._index[key]
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    @classmethod
+    def of(cls, device: 'SGrBaseInterface') -> 'SnapshotSchema':
+        """
+        Returns the schema of a device, cached per device. It is described
+        from the specification, so lazy data points are not built.
+        """
+        schema = _schemas.get(device)
+        if schema is None:
+            units = _data_point_units(getattr(device, 'frame', None))
+            keys = []
+            data_types = []
+            for fp_name, dps in device.describe()[1].items():
+                for dp_name, (_, data_type) in dps.items():
+                    keys.append((fp_name, dp_name))
+                    data_types.append(data_type)
+            schema = cls(
+                tuple(keys),
+                tuple(data_types),
+                tuple(units.get(key, '') for key in keys),
+            )
+            _schemas[device] = schema
+        return schema
+
+
+_schemas: 'weakref.WeakKeyDictionary[Any, SnapshotSchema]' = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _data_point_units(
+    frame: Optional[DeviceFrame],
+) -> dict[tuple[str, str], str]:
+    units: dict[tuple[str, str], str] = {}
+    if frame is None or frame.interface_list is None:
+        return units
+    for interface_field in dataclasses.fields(frame.interface_list):
+        interface = getattr(frame.interface_list, interface_field.name)
+        fp_list = getattr(interface, 'functional_profile_list', None)
+        if fp_list is None:
+            continue
+        for fp in fp_list.functional_profile_list_element:
+            fp_name = (
+                fp.functional_profile.functional_profile_name
+                if fp.functional_profile
+                else None
+            ) or ''
+            if fp.data_point_list is None:
+                continue
+            for dp in fp.data_point_list.data_point_list_element:
+                if dp.data_point is None or dp.data_point.unit is None:
+                    continue
+                unit = dp.data_point.unit
+                units[(fp_name, dp.data_point.data_point_name or '')] = str(
+                    getattr(unit, 'value', unit)
+                )
+    return units
+
+
+class ColumnarSnapshot:
+    """
+    Values of many reads of one device type, stored per data point in typed
+    arrays. Each read is a row, with a timestamp, a label, e.g. the device
+    name, and a status per value. Values of failed reads are stored as
+    zero, or None in list columns.
+    """
+
+    def __init__(self, schema: SnapshotSchema):
+        self.schema = schema
+        self.timestamps: array = array('d')
+        self.labels: list[str] = []
+        self._values: list[Column] = [
+            array(_TYPECODES[data_type]) if data_type in _TYPECODES else []
+            for data_type in schema.data_types
+        ]
+        self._status: list[array] = [array('b') for _ in schema.keys]
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    def append(
+        self, results: Sequence[ReadResult], timestamp: float, label: str = ''
+    ):
+        """
+        Appends a row.
+        :param results: The read results, in schema order
+        :param timestamp: The time of the read
+        :param label: Identifies the row, e.g. the device name
+        """
+        if len(results) != len(self.schema):
+            raise Exception('read results do not match the snapshot schema')
+        for index, (column, status, result) in enumerate(
+            zip(self._values, self._status, results)
+        ):
+            code = _STATUS_CODES[result.status]
+            if result.status is ReadStatus.OK:
+                try:
+                    column.append(result.value)
+                except (OverflowError, TypeError):
+                    # e.g. a string or scaled value of an integer data point
+                    column = self._values[index] = list(column)
+                    column.append(result.value)
+            else:
+                column.append(_empty(column))
+            status.append(code)
+        self.timestamps.append(timestamp)
+        self.labels.append(label)
+
+    def append_mapping(
+        self,
+        results: Mapping[tuple[str, str], ReadResult],
+        timestamp: float,
+        label: str = '',
+    ):
+        """
+        Appends a row of results keyed by data point, missing data points
+        are marked with STATUS_MISSING.
+        """
+        missing = ReadResult(ReadStatus.ERROR)
+        self.append(
+            [results.get(key, missing) for key in self.schema.keys],
+            timestamp,
+            label,
+        )
+        for key in self.schema.keys:
+            if key not in results:
+                self._status[self.schema.index(key)][-1] = STATUS_MISSING
+
+    def extend(self, other: 'ColumnarSnapshot'):
+        """
+        Appends the rows of a snapshot with the same schema, e.g. to keep a
+        history.
+        """
+        if other.schema != self.schema:
+            raise Exception('cannot extend snapshots with different schemas')
+        for index, other_column in enumerate(other._values):
+            column = self._values[index]
+            if isinstance(column, array) and isinstance(other_column, list):
+                column = self._values[index] = list(column)
+            column.extend(other_column)
+        for status, other_status in zip(self._status, other._status):
+            status.extend(other_status)
+        self.timestamps.extend(other.timestamps)
+        self.labels.extend(other.labels)
+
+    def column(self, key: tuple[str, str]) -> Column:
+        return self._values[self.schema.index(key)]
+
+    def status(self, key: tuple[str, str]) -> array:
+        """
+        Returns the status codes of a column, 0 for OK, 1 for errors, 2 for
+        timeouts and 3 for missing values.
+        """
+        return self._status[self.schema.index(key)]
+
+    def row(self, index: int) -> dict[tuple[str, str], Any]:
+        """
+        Returns the valid values of a row.
+        """
+        return {
+            key: column[index]
+            for key, column, status in zip(
+                self.schema.keys, self._values, self._status
+            )
+            if status[index] == 0
+        }
+
+    def to_numpy(self) -> dict[str, Any]:
+        """
+        Returns copies of the columns as NumPy arrays, keyed by
+        'profile.data_point'. Requires numpy to be installed.
+        """
+        try:
+            import numpy
+        except ImportError:
+            raise Exception('numpy is required for NumPy export')
+        data: dict[str, Any] = {
+            'timestamp': numpy.array(self.timestamps, dtype=numpy.float64)
+        }
+        for (fp_name, dp_name), column, status in zip(
+            self.schema.keys, self._values, self._status
+        ):
+            name = f'{fp_name}.{dp_name}'
+            if isinstance(column, array):
+                data[name] = numpy.array(column, dtype=column.typecode)
+            else:
+                data[name] = numpy.array(column, dtype=object)
+            data[f'{name}.status'] = numpy.array(status, dtype=numpy.int8)
+        return data
+
+
+def _empty(column: Column) -> Any:
+    return 0 if isinstance(column, array) else None
@@ -0,0 +1,179 @@
+import asyncio
+from collections import OrderedDict, deque
+from dataclasses import dataclass, replace
+from enum import Enum
+from typing import Any, Optional
+
+
+class OverflowPolicy(Enum):
+    KEEP_LATEST = 'keep_latest'
+    DROP_OLDEST = 'drop_oldest'
+    BLOCK = 'block'
+
+
+@dataclass
+class ChannelMetrics:
+    received: int = 0
+    delivered: int = 0
+    dropped: int = 0
+    coalesced: int = 0
+    blocked: int = 0
+    max_depth: int = 0
+
+
+class ChannelClosed(Exception):
+    pass
+
+
+class SubscriptionChannel:
+    """
+    Bounded queue of data point updates, consumed as an async iterator of
+    (data point name, value) tuples.
+
+    The overflow policy decides what happens when the consumer falls behind:
+    - KEEP_LATEST keeps one pending value per data point, replacing older ones
+    - DROP_OLDEST discards the oldest pending update
+    - BLOCK makes the producer wait until there is space
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 100,
+        policy: OverflowPolicy = OverflowPolicy.KEEP_LATEST,
+    ):
+        if maxsize < 1:
+            raise Exception('channel size must be at least 1')
+        self.maxsize = maxsize
+        self.policy = policy
+        self._metrics = ChannelMetrics()
+        self._latest: OrderedDict[tuple[str, str], Any] = OrderedDict()
+        self._queue: deque[tuple[tuple[str, str], Any]] = deque()
+        self._getters: deque[asyncio.Future] = deque()
+        self._putters: deque[asyncio.Future] = deque()
+        self._closed = False
+
+    def qsize(self) -> int:
+        if self.policy == OverflowPolicy.KEEP_LATEST:
+            return len(self._latest)
+        return len(self._queue)
+
+    def full(self) -> bool:
+        return self.qsize() >= self.maxsize
+
+    def closed(self) -> bool:
+        return self._closed
+
+    def metrics(self) -> ChannelMetrics:
+        return replace(self._metrics)
+
+    def offer(self, name: tuple[str, str], value: Any) -> bool:
+        """
+        Adds an update without waiting.
+        :returns: False if the channel is closed, or full with policy BLOCK
+        """
+        if self._closed:
+            return False
+        if self.policy == OverflowPolicy.KEEP_LATEST:
+            self._metrics.received += 1
+            if name in self._latest:
+                self._latest[name] = value
+                self._metrics.coalesced += 1
+            else:
+                if len(self._latest) >= self.maxsize:
+                    self._latest.popitem(last=False)
+                    self._metrics.dropped += 1
+                self._latest[name] = value
+        elif self.policy == OverflowPolicy.DROP_OLDEST:
+            self._metrics.received += 1
+            if len(self._queue) >= self.maxsize:
+                self._queue.popleft()
+                self._metrics.dropped += 1
+            self._queue.append((name, value))
+        else:
+            if len(self._queue) >= self.maxsize:
+                return False
+            self._metrics.received += 1
+            self._queue.append((name, value))
+        self._metrics.max_depth = max(self._metrics.max_depth, self.qsize())
+        self._wakeup(self._getters)
+        return True
+
+    async def put(self, name: tuple[str, str], value: Any):
+        """
+        Adds an update, waiting for space if the policy is BLOCK.
+        """
+        if self.offer(name, value):
+            return
+        self._metrics.blocked += 1
+        while not self._closed:
+            waiter = asyncio.get_running_loop().create_future()
+            self._putters.append(waiter)
+            try:
+                await waiter
+            finally:
+                if waiter in self._putters:
+                    self._putters.remove(waiter)
+            if self.offer(name, value):
+                return
+        raise ChannelClosed()
+
+    def get_nowait(self) -> tuple[tuple[str, str], Any]:
+        if self.policy == OverflowPolicy.KEEP_LATEST:
+            if not self._latest:
+                raise asyncio.QueueEmpty()
+            item = self._latest.popitem(last=False)
+        else:
+            if not self._queue:
+                raise asyncio.QueueEmpty()
+            item = self._queue.popleft()
+        self._metrics.delivered += 1
+        self._wakeup(self._putters)
+        return item
+
+    async def get(self) -> tuple[tuple[str, str], Any]:
+        """
+        Waits for the next update.
+        :raises ChannelClosed: if the channel was closed and is drained
+        """
+        while True:
+            try:
+                return self.get_nowait()
+            except asyncio.QueueEmpty:
+                pass
+            if self._closed:
+                raise ChannelClosed()
+            waiter = asyncio.get_running_loop().create_future()
+            self._getters.append(waiter)
+            try:
+                await waiter
+            finally:
+                if waiter in self._getters:
+                    self._getters.remove(waiter)
+
+    def close(self):
+        """
+        Stops accepting updates. Pending updates can still be consumed.
+        """
+        self._closed = True
+        for waiters in (self._getters, self._putters):
+            while waiters:
+                waiter = waiters.popleft()
+                if not waiter.done():
+                    waiter.set_result(None)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> tuple[tuple[str, str], Any]:
+        try:
+            return await self.get()
+        except ChannelClosed:
+            raise StopAsyncIteration
+
+    @staticmethod
+    def _wakeup(waiters: deque[asyncio.Future]):
+        while waiters:
+            waiter: Optional[asyncio.Future] = waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                break
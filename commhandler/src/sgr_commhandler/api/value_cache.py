@@ -0,0 +1,205 @@
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Mapping
+from dataclasses import dataclass, replace
+from enum import Enum
+from typing import Any, NamedTuple, Optional
+
+from sgr_commhandler.metrics import DATA_POINT_CACHE_HITS, default_registry
+
+# maximum number of cached values per device
+DEFAULT_MAXSIZE = 1024
+
+Name = tuple[str, str]
+
+
+class ValueSource(Enum):
+    READ = 'READ'
+    PUSH = 'PUSH'
+
+
+class CachedValue(NamedTuple):
+    value: Any
+    # time.monotonic() when the value was received
+    timestamp: float
+    source: ValueSource
+
+    def age(self) -> float:
+        return time.monotonic() - self.timestamp
+
+
+@dataclass
+class ValueCacheStatistics:
+    hits: int = 0
+    shared: int = 0
+    misses: int = 0
+    evictions: int = 0
+    invalidations: int = 0
+
+    def hit_ratio(self) -> float:
+        """
+        Returns the share of reads that did not read the device themselves.
+        """
+        total = self.hits + self.shared + self.misses
+        return (self.hits + self.shared) / total if total else 0.0
+
+
+class ValueCache:
+    """
+    Last values of the data points of a device, with the time and source of
+    each value.
+
+    A read is served from the cache while the value is younger than the
+    max_age of the read, which defaults to the TTL of the data point.
+    Concurrent reads of the same data point share one device read. Values
+    are evicted least recently used beyond maxsize.
+    """
+
+    def __init__(
+        self,
+        default_ttl: float = 0.0,
+        ttls: Optional[Mapping[Name, float]] = None,
+        maxsize: int = DEFAULT_MAXSIZE,
+    ):
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[Name, CachedValue] = OrderedDict()
+        self._in_flight: dict[Name, asyncio.Future] = {}
+        self._default_ttl = default_ttl
+        self._ttls: dict[Name, float] = dict(ttls or {})
+        self._maxsize = maxsize
+        self._stats = ValueCacheStatistics()
+
+    def ttl(self, name: Name) -> float:
+        return self._ttls.get(name, self._default_ttl)
+
+    def set_ttl(self, name: Name, ttl: Optional[float]):
+        """
+        Sets the TTL of a data point.
+        :param name: The data point name
+        :param ttl: The TTL in seconds, None restores the default TTL
+        """
+        if ttl is None:
+            self._ttls.pop(name, None)
+        else:
+            self._ttls[name] = ttl
+
+    def get(
+        self, name: Name, max_age: Optional[float] = None
+    ) -> Optional[CachedValue]:
+        """
+        Returns the cached value, if it is fresh enough.
+        :param name: The data point name
+        :param max_age: The maximum age in seconds, defaults to the TTL
+        :returns: The cached value or None
+        """
+        if max_age is None:
+            max_age = self.ttl(name)
+        if max_age <= 0:
+            return None
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is None or entry.age() > max_age:
+                return None
+            self._entries.move_to_end(name)
+            return entry
+
+    def peek(self, name: Name) -> Optional[CachedValue]:
+        """
+        Returns the last value regardless of its age.
+        """
+        with self._lock:
+            return self._entries.get(name)
+
+    def put(
+        self,
+        name: Name,
+        value: Any,
+        source: ValueSource = ValueSource.READ,
+    ):
+        with self._lock:
+            self._entries[name] = CachedValue(value, time.monotonic(), source)
+            self._entries.move_to_end(name)
+            while len(self._entries) > self._maxsize:
+                self._entries.popitem(last=False)
+                self._stats.evictions += 1
+
+    def invalidate(self, name: Optional[Name] = None):
+        """
+        Drops the value of a data point, or of all data points. Reads in
+        flight are not shared with later reads anymore.
+        """
+        with self._lock:
+            if name is None:
+                self._entries.clear()
+                self._in_flight.clear()
+            else:
+                self._entries.pop(name, None)
+                self._in_flight.pop(name, None)
+            self._stats.invalidations += 1
+
+    def statistics(self) -> ValueCacheStatistics:
+        with self._lock:
+            return replace(self._stats)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def read_through(
+        self,
+        name: Name,
+        read: Callable[[], Awaitable[Any]],
+        max_age: Optional[float] = None,
+    ) -> Any:
+        """
+        Returns the cached value if it is fresh enough, otherwise reads and
+        caches the value. Joins a read of the same data point in flight,
+        which is started again if the reader that started it is cancelled.
+        :param name: The data point name
+        :param read: Reads the value from the device
+        :param max_age: The maximum age in seconds, defaults to the TTL
+        :returns: The value
+        """
+        entry = self.get(name, max_age)
+        if entry is not None:
+            with self._lock:
+                self._stats.hits += 1
+            default_registry.increment(DATA_POINT_CACHE_HITS, name)
+            return entry.value
+
+        loop = asyncio.get_running_loop()
+        pending = self._in_flight.get(name)
+        while pending is not None and pending.get_loop() is loop:
+            with self._lock:
+                self._stats.shared += 1
+            try:
+                return await asyncio.shield(pending)
+            except asyncio.CancelledError:
+                if not pending.cancelled():
+                    raise
+            # the reader which started the read was cancelled, the first
+            # remaining reader starts it again
+            pending = self._in_flight.get(name)
+
+        with self._lock:
+            self._stats.misses += 1
+        pending = loop.create_future()
+        self._in_flight[name] = pending
+        try:
+            value = await read()
+            if self._in_flight.get(name) is pending:
+                self.put(name, value)
+            pending.set_result(value)
+            return value
+        except asyncio.CancelledError:
+            pending.cancel()
+            raise
+        except Exception as e:
+            pending.set_exception(e)
+            # retrieved, even if nobody else waits
+            pending.exception()
+            raise
+        finally:
+            if self._in_flight.get(name) is pending:
+                del self._in_flight[name]
@@ -0,0 +1,389 @@
+"""
+Command line tool to inspect, read and load test a device, optionally
+under a profiler.
+
+Usage:
+    python -m sgr_commhandler describe EID [-p KEY=VALUE ...]
+    python -m sgr_commhandler read EID [-p KEY=VALUE ...] [--timeout S]
+    python -m sgr_commhandler poll EID [-p KEY=VALUE ...] [--rate HZ]
+        [--duration S] [--timeout S]
+
+Each command prints a JSON report. With --profile, the command runs under
+cProfile or a sampling profiler and the statistics are written to
+--profile-output.
+"""
+
+import argparse
+import asyncio
+import cProfile
+import contextlib
+import json
+import logging
+import math
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from collections.abc import Iterator, Sequence
+from typing import Any, Optional
+
+from sgr_commhandler.api import (
+    Operation,
+    ReadStatus,
+    SGrBaseInterface,
+    TimingInterceptor,
+)
+from sgr_commhandler.api.interceptor import Timing
+from sgr_commhandler.device_builder import DeviceBuilder
+
+logger = logging.getLogger(__name__)
+
+# interval of the sampling profiler in seconds
+DEFAULT_SAMPLE_INTERVAL = 0.005
+
+
+def percentiles(values: Sequence[float]) -> dict[str, Optional[float]]:
+    """
+    Returns the p50, p90, p99 and max of values, by nearest rank.
+    """
+    if not values:
+        return dict(p50=None, p90=None, p99=None, max=None)
+    ordered = sorted(values)
+
+    def rank(p: float) -> float:
+        return ordered[max(0, math.ceil(p * len(ordered)) - 1)]
+
+    return dict(
+        p50=rank(0.5), p90=rank(0.9), p99=rank(0.99), max=ordered[-1]
+    )
+
+
+def parse_properties(values: Sequence[str]) -> dict[str, str]:
+    properties = {}
+    for value in values:
+        key, separator, text = value.partition('=')
+        if not separator:
+            raise Exception(f'property {value} is not KEY=VALUE')
+        properties[key] = text
+    return properties
+
+
+def build_device(args: argparse.Namespace) -> SGrBaseInterface:
+    builder = DeviceBuilder().eid_path(args.eid)
+    if args.properties_path:
+        builder.properties_path(args.properties_path)
+    else:
+        builder.properties(parse_properties(args.property))
+    device = builder.build()
+    if not args.cache:
+        # measure the device, not the value cache
+        for name in device.get_data_points():
+            device.value_cache.set_ttl(name, 0)
+    return device
+
+
+def describe(device: SGrBaseInterface) -> dict:
+    name, profiles = device.describe()
+    info = device.device_information
+    return dict(
+        name=name,
+        manufacturer=info.manufacturer,
+        software_revision=info.software_revision,
+        hardware_revision=info.hardware_revision,
+        transport=device.transport_key(),
+        functional_profiles={
+            fp: {
+                dp: dict(direction=direction.value, type=data_type.value)
+                for dp, (direction, data_type) in dps.items()
+            }
+            for fp, dps in profiles.items()
+        },
+    )
+
+
+def _json_value(value: Any) -> Any:
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    return str(value)
+
+
+async def read_once(
+    device: SGrBaseInterface, timeout: Optional[float] = None
+) -> dict:
+    """
+    Reads all data points once.
+    :param device: The connected device
+    :param timeout: The time after which outstanding reads are cancelled
+    :returns: The value, status and read duration of each data point
+    """
+    durations: dict[tuple[str, str], float] = {}
+
+    def record(timing: Timing):
+        if timing.invocation.operation is Operation.READ:
+            durations[timing.invocation.name] = timing.duration
+
+    timing = TimingInterceptor(record)
+    device.interceptors.add(timing)
+    try:
+        start = time.perf_counter()
+        results = await device.read_values_async(timeout)
+        elapsed = time.perf_counter() - start
+    finally:
+        device.interceptors.remove(timing)
+
+    data_points = []
+    for (fp, dp), result in results.items():
+        data_points.append(
+            dict(
+                functional_profile=fp,
+                data_point=dp,
+                status=result.status.value,
+                value=_json_value(result.value),
+                error=None if result.error is None else str(result.error),
+                duration_s=durations.get((fp, dp)),
+            )
+        )
+    return dict(duration_s=elapsed, data_points=data_points)
+
+
+async def poll(
+    device: SGrBaseInterface,
+    rate: float,
+    duration: float,
+    timeout: Optional[float] = None,
+) -> dict:
+    """
+    Reads all data points repeatedly, starting a cycle at the given rate.
+    A cycle which takes longer than the period delays the next cycle.
+    :param device: The connected device
+    :param rate: Cycles per second, 0 polls as fast as possible
+    :param duration: The duration of the run in seconds
+    :param timeout: The time after which outstanding reads of a cycle are
+        cancelled
+    :returns: The throughput, latency percentiles and read statuses
+    """
+    read_durations: list[float] = []
+
+    def record(timing: Timing):
+        if timing.invocation.operation is Operation.READ:
+            read_durations.append(timing.duration)
+
+    timing = TimingInterceptor(record)
+    device.interceptors.add(timing)
+    loop = asyncio.get_running_loop()
+    period = 1.0 / rate if rate > 0 else 0.0
+    cycle_durations: list[float] = []
+    statuses: Counter[str] = Counter()
+    overruns = 0
+    start = loop.time()
+    next_cycle = start
+    try:
+        while loop.time() - start < duration:
+            cycle_start = loop.time()
+            results = await device.read_values_async(timeout)
+            cycle_durations.append(loop.time() - cycle_start)
+            statuses.update(result.status.value for result in results.values())
+            next_cycle += period
+            delay = next_cycle - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            else:
+                if period > 0:
+                    overruns += 1
+                next_cycle = loop.time()
+    finally:
+        device.interceptors.remove(timing)
+    elapsed = loop.time() - start
+
+    reads = sum(statuses.values())
+    return dict(
+        duration_s=elapsed,
+        target_rate=rate,
+        cycles=len(cycle_durations),
+        cycle_rate=len(cycle_durations) / elapsed if elapsed else 0.0,
+        overruns=overruns,
+        reads=reads,
+        read_rate=reads / elapsed if elapsed else 0.0,
+        statuses={
+            status.value: statuses[status.value] for status in ReadStatus
+        },
+        cycle_latency_s=percentiles(cycle_durations),
+        read_latency_s=percentiles(read_durations),
+    )
+
+
+class SamplingProfiler:
+    """
+    Samples the stack of a thread at a fixed interval, counting stacks in
+    the folded format of flame graph tools.
+    """
+
+    def __init__(
+        self,
+        thread_id: Optional[int] = None,
+        interval: float = DEFAULT_SAMPLE_INTERVAL,
+    ):
+        self._thread_id = (
+            thread_id if thread_id is not None else threading.get_ident()
+        )
+        self._interval = interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.stacks: Counter[str] = Counter()
+
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name='sgr-sampling-profiler', daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self._interval):
+            frame = sys._current_frames().get(self._thread_id)
+            names = []
+            while frame is not None:
+                code = frame.f_code
+                names.append(f'{code.co_filename}:{code.co_name}')
+                frame = frame.f_back
+            if names:
+                self.stacks[';'.join(reversed(names))] += 1
+
+    def top(self, count: int = 20) -> list[tuple[str, int]]:
+        """
+        Returns the functions most often on top of the stack.
+        """
+        leaves: Counter[str] = Counter()
+        for stack, samples in self.stacks.items():
+            leaves[stack.rpartition(';')[2]] += samples
+        return leaves.most_common(count)
+
+    def dump(self, path: str):
+        with open(path, 'w') as file:
+            for stack, samples in self.stacks.most_common():
+                file.write(f'{stack} {samples}\n')
+
+
+@contextlib.contextmanager
+def profiled(kind: Optional[str], output: Optional[str]) -> Iterator[None]:
+    """
+    Runs the enclosed code under a profiler, writing the statistics to the
+    output file and a summary to stderr.
+    :param kind: cprofile, sample or None for no profiling
+    :param output: The statistics file, pstats for cprofile and folded
+        stacks for sample
+    """
+    if kind is None:
+        yield
+        return
+    if kind == 'cprofile':
+        profile = cProfile.Profile()
+        profile.enable()
+        try:
+            yield
+        finally:
+            profile.disable()
+            if output:
+                profile.dump_stats(output)
+            stats = pstats.Stats(profile, stream=sys.stderr)
+            stats.sort_stats('cumulative').print_stats(20)
+    elif kind == 'sample':
+        sampler = SamplingProfiler()
+        sampler.start()
+        try:
+            yield
+        finally:
+            sampler.stop()
+            if output:
+                sampler.dump(output)
+            for function, samples in sampler.top():
+                print(f'{samples:8d} {function}', file=sys.stderr)
+    else:
+        raise Exception(f'unknown profiler {kind}')
+
+
+async def _run(args: argparse.Namespace) -> dict:
+    device = build_device(args)
+    if args.command == 'describe':
+        return describe(device)
+    await device.connect_async()
+    try:
+        if args.command == 'read':
+            return await read_once(device, args.timeout)
+        return await poll(device, args.rate, args.duration, args.timeout)
+    finally:
+        await device.disconnect_async()
+
+
+def parser() -> argparse.ArgumentParser:
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('eid', help='path of the EID XML file')
+    common.add_argument(
+        '-p',
+        '--property',
+        action='append',
+        default=[],
+        help='EID property as KEY=VALUE, can be repeated',
+    )
+    common.add_argument(
+        '--properties-path', help='ini file with a [properties] section'
+    )
+    common.add_argument(
+        '--cache',
+        action='store_true',
+        help='serve reads from the value cache within the TTLs of the EID',
+    )
+    common.add_argument(
+        '--profile',
+        choices=('cprofile', 'sample'),
+        help='run the command under a profiler',
+    )
+    common.add_argument('--profile-output', help='file for the statistics')
+    common.add_argument(
+        '--timeout', type=float, help='deadline of a read cycle in seconds'
+    )
+
+    result = argparse.ArgumentParser(
+        prog='python -m sgr_commhandler',
+        description='Inspects, reads and load tests SmartGridready devices.',
+    )
+    commands = result.add_subparsers(dest='command', required=True)
+    commands.add_parser(
+        'describe', parents=[common], help='show the data points'
+    )
+    commands.add_parser(
+        'read', parents=[common], help='read all values once, with timings'
+    )
+    poll_parser = commands.add_parser(
+        'poll', parents=[common], help='poll all values at a rate'
+    )
+    poll_parser.add_argument(
+        '--rate',
+        type=float,
+        default=1.0,
+        help='read cycles per second, 0 for as fast as possible',
+    )
+    poll_parser.add_argument(
+        '--duration', type=float, default=10.0, help='in seconds'
+    )
+    return result
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    args = parser().parse_args(argv)
+    logging.basicConfig(level=logging.WARNING)
+    try:
+        with profiled(args.profile, args.profile_output):
+            report = asyncio.run(_run(args))
+    except Exception as e:
+        logger.error(f'{args.command} failed: {e}')
+        return 1
+    print(json.dumps(report, indent=2))
+    return 0
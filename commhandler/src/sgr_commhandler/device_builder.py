@@ -1,26 +1,41 @@
+import asyncio
 import configparser
-import re
-from collections.abc import Callable
+import hashlib
+import logging
+import threading
+import warnings
+from collections.abc import AsyncIterator, Callable, Iterable
+from concurrent.futures import Executor, ProcessPoolExecutor
 from enum import Enum
+from importlib import metadata
+from typing import Optional
 
+from cachetools import LRUCache
 from sgr_specification.v0.product import DeviceFrame
+from xsdata.exceptions import ConverterWarning
 from xsdata.formats.dataclass.context import XmlContext
 from xsdata.formats.dataclass.parsers import XmlParser
 
 from sgr_commhandler.api.device_api import SGrBaseInterface
-from sgr_commhandler.driver.contact.contact_interface_async import (
-    SGrContactInterface,
+from sgr_commhandler.eid_cache import EidCache, default_eid_cache
+from sgr_commhandler.eid_template import (
+    EidTemplate,
+    property_template,
+    property_values,
+    report_properties,
 )
-from sgr_commhandler.driver.generic.generic_interface_async import (
-    SGrGenericInterface,
-)
-from sgr_commhandler.driver.messaging.messaging_interface_async import (
-    SGrMessagingInterface,
-)
-from sgr_commhandler.driver.modbus.modbus_interface_async import (
-    SGrModbusInterface,
-)
-from sgr_commhandler.driver.rest.restapi_interface_async import SGrRestInterface
+
+logger = logging.getLogger(__name__)
+
+# entry point group of third-party drivers, named after SGrDeviceProtocol members
+DRIVER_ENTRY_POINT_GROUP = 'sgr_commhandler.drivers'
+
+# the class metadata cached by the context is shared by all parsers
+_xml_context = XmlContext()
+
+# parsed EID templates, keyed by a hash of the EID content
+_templates: LRUCache = LRUCache(maxsize=32)
+_templates_lock = threading.Lock()
 
 
 class SGrConfiguration(Enum):
@@ -38,37 +53,119 @@ class SGrDeviceProtocol(Enum):
     UNKNOWN = 5
 
 
-SGrInterfaces = (
-    SGrRestInterface
-    | SGrModbusInterface
-    | SGrMessagingInterface
-    | SGrContactInterface
-    | SGrGenericInterface
-)
-device_builders: dict[
-    SGrDeviceProtocol,
-    Callable[
-        [DeviceFrame, configparser.ConfigParser],
-        SGrInterfaces,
-    ],
-] = {
-    SGrDeviceProtocol.MODBUS: lambda frame, config: SGrModbusInterface(
-        frame, config, sharedRTU=True
-    ),
-    SGrDeviceProtocol.RESTAPI: lambda frame, config: SGrRestInterface(
-        frame, config
-    ),
-    SGrDeviceProtocol.MESSAGING: lambda frame, config: SGrMessagingInterface(
-        frame, config
-    ),
-    SGrDeviceProtocol.CONTACT: lambda frame, config: SGrContactInterface(
-        frame, config
-    ),
-    SGrDeviceProtocol.GENERIC: lambda frame, config: SGrGenericInterface(
-        frame, config
-    ),
+# called with the frame and the properties, and lazy=True in lazy mode
+DeviceFactory = Callable[..., SGrBaseInterface]
+
+# drivers are imported when the first device using them is built,
+# so that e.g. a Modbus-only application does not load aiohttp
+
+
+def _build_modbus_device(
+    frame: DeviceFrame, config: configparser.ConfigParser, lazy: bool = False
+) -> SGrBaseInterface:
+    from sgr_commhandler.driver.modbus.modbus_interface_async import (
+        SGrModbusInterface,
+    )
+
+    return SGrModbusInterface(frame, config, sharedRTU=True, lazy=lazy)
+
+
+def _build_rest_device(
+    frame: DeviceFrame, config: configparser.ConfigParser, lazy: bool = False
+) -> SGrBaseInterface:
+    from sgr_commhandler.driver.rest.restapi_interface_async import (
+        SGrRestInterface,
+    )
+
+    return SGrRestInterface(frame, config, lazy=lazy)
+
+
+def _build_messaging_device(
+    frame: DeviceFrame, config: configparser.ConfigParser, lazy: bool = False
+) -> SGrBaseInterface:
+    from sgr_commhandler.driver.messaging.messaging_interface_async import (
+        SGrMessagingInterface,
+    )
+
+    # data points register their inbound topics when built, so they are
+    # always built eagerly
+    return SGrMessagingInterface(frame, config)
+
+
+def _build_contact_device(
+    frame: DeviceFrame, config: configparser.ConfigParser, lazy: bool = False
+) -> SGrBaseInterface:
+    from sgr_commhandler.driver.contact.contact_interface_async import (
+        SGrContactInterface,
+    )
+
+    return SGrContactInterface(frame, config, lazy=lazy)
+
+
+def _build_generic_device(
+    frame: DeviceFrame, config: configparser.ConfigParser, lazy: bool = False
+) -> SGrBaseInterface:
+    from sgr_commhandler.driver.generic.generic_interface_async import (
+        SGrGenericInterface,
+    )
+
+    return SGrGenericInterface(frame, config, lazy=lazy)
+
+
+device_builders: dict[SGrDeviceProtocol, DeviceFactory] = {
+    SGrDeviceProtocol.MODBUS: _build_modbus_device,
+    SGrDeviceProtocol.RESTAPI: _build_rest_device,
+    SGrDeviceProtocol.MESSAGING: _build_messaging_device,
+    SGrDeviceProtocol.CONTACT: _build_contact_device,
+    SGrDeviceProtocol.GENERIC: _build_generic_device,
 }
 
+_entry_points_loaded = False
+# protocols whose driver was registered explicitly, entry points of
+# installed packages do not replace them
+_registered: set[SGrDeviceProtocol] = set()
+
+
+def register_device_builder(
+    protocol: SGrDeviceProtocol, factory: DeviceFactory
+):
+    """
+    Replaces the driver used to build devices of a protocol, also if an
+    installed package provides one through an entry point.
+    """
+    device_builders[protocol] = factory
+    _registered.add(protocol)
+
+
+def _load_entry_points():
+    global _entry_points_loaded
+    if _entry_points_loaded:
+        return
+    _entry_points_loaded = True
+    for entry_point in metadata.entry_points(group=DRIVER_ENTRY_POINT_GROUP):
+        protocol = SGrDeviceProtocol.__members__.get(entry_point.name.upper())
+        if protocol is None:
+            logger.warning(
+                f'unknown protocol of driver entry point {entry_point.name}'
+            )
+            continue
+        if protocol in _registered:
+            continue
+        try:
+            device_builders[protocol] = entry_point.load()
+        except Exception as e:
+            logger.error(
+                f'could not load driver entry point {entry_point.name}: {e}'
+            )
+
+
+def get_device_builder(protocol: SGrDeviceProtocol) -> DeviceFactory:
+    _load_entry_points()
+    factory = device_builders.get(protocol)
+    if factory is None:
+        raise Exception(f'no driver for protocol {protocol.name}')
+    return factory
+
 
 class DeviceBuilder:
     def __init__(self):
@@ -76,14 +173,107 @@ class DeviceBuilder:
         self._config_value: str | dict | None = None
         self._type: SGrConfiguration = SGrConfiguration.UNKNOWN
         self._config_type: SGrConfiguration = SGrConfiguration.UNKNOWN
+        self._cache: Optional[EidCache] = default_eid_cache
+        self._lazy = False
 
     def build(self) -> SGrBaseInterface:
-        spec, config = self._replace_variables()
-        self._value = spec
-        self._type = SGrConfiguration.FILE
-        xml = self._string_loader()
-        protocol = self._resolve_protocol(xml)
-        return device_builders[protocol](xml, config)
+        frame, config = self._load_frame()
+        return self._create_device(frame, config)
+
+    async def build_async(self) -> SGrBaseInterface:
+        """
+        Builds the device without blocking the event loop. The EID is read
+        and parsed in the default executor, the device is created on the
+        event loop.
+        """
+        loop = asyncio.get_running_loop()
+        frame, config = await loop.run_in_executor(None, self._load_frame)
+        return self._create_device(frame, config)
+
+    def _create_device(
+        self, frame: DeviceFrame, config: configparser.ConfigParser
+    ) -> SGrBaseInterface:
+        protocol = self._resolve_protocol(frame)
+        return self._create(get_device_builder(protocol), frame, config)
+
+    def _create(
+        self,
+        factory: DeviceFactory,
+        frame: DeviceFrame,
+        config: configparser.ConfigParser,
+    ) -> SGrBaseInterface:
+        if self._lazy:
+            return factory(frame, config, lazy=True)
+        return factory(frame, config)
+
+    def build_fleet(
+        self, properties_list: Iterable[dict]
+    ) -> list[SGrBaseInterface]:
+        """
+        Builds one device per property set from the configured EID.
+
+        The EID is parsed once as template, and the devices share all parts
+        of the frame which do not contain properties.
+        :param properties_list: The properties of each device
+        :returns: The devices, in the order of the property sets
+        """
+        template = self._load_template()
+        factory = get_device_builder(self._resolve_protocol(template.frame))
+        devices = []
+        for properties in properties_list:
+            config = configparser.ConfigParser()
+            config.read_dict(dict(properties=properties))
+            frame = template.instantiate(config)
+            devices.append(self._create(factory, frame, config))
+        return devices
+
+    def _load_template(self) -> EidTemplate:
+        content = self.get_eid_content()
+        template_key = hashlib.sha256(content.encode('utf-8')).hexdigest()
+        with _templates_lock:
+            template = _templates.get(template_key)
+        if template is not None:
+            return template
+        config = configparser.ConfigParser()
+        key = None
+        frame = None
+        if self._cache is not None:
+            key = self._cache.key(content, config)
+            frame = self._cache.get(key)
+        if frame is None:
+            with warnings.catch_warnings():
+                # placeholders in non-string fields are converted on instantiation
+                warnings.simplefilter('ignore', ConverterWarning)
+                frame = self._string_loader(content)
+            if self._cache is not None and key is not None:
+                self._cache.put(key, frame)
+        template = EidTemplate(frame)
+        with _templates_lock:
+            _templates[template_key] = template
+        return template
+
+    def _load_frame(self) -> tuple[DeviceFrame, configparser.ConfigParser]:
+        config, content, key, frame = self._lookup_frame()
+        if frame is None:
+            frame = self._string_loader(self._replace_variables(content, config))
+            self._store_frame(key, frame)
+        return frame, config
+
+    def _lookup_frame(
+        self,
+    ) -> tuple[
+        configparser.ConfigParser, str, Optional[str], Optional[DeviceFrame]
+    ]:
+        config = self._load_properties()
+        content = self.get_eid_content()
+        if self._cache is None:
+            return config, content, None, None
+        key = self._cache.key(content, config)
+        return config, content, key, self._cache.get(key)
+
+    def _store_frame(self, key: Optional[str], frame: DeviceFrame):
+        if self._cache is not None and key is not None:
+            self._cache.put(key, frame)
 
     def _resolve_protocol(self, frame: DeviceFrame) -> SGrDeviceProtocol:
         if frame.interface_list is None:
@@ -100,17 +290,17 @@ class DeviceBuilder:
             return SGrDeviceProtocol.GENERIC
         raise Exception('unsupported device interface')
 
-    def _string_loader(self) -> DeviceFrame:
-        parser = XmlParser(context=XmlContext())
-        if self._value is None:
+    def _string_loader(self, xml: Optional[str]) -> DeviceFrame:
+        parser = XmlParser(context=_xml_context)
+        if xml is None:
             raise Exception('missing specifcation')
         try:
-            return parser.from_string(self._value, DeviceFrame)
+            return parser.from_string(xml, DeviceFrame)
         except Exception as e:
             raise e
 
     def _file_loader(self) -> DeviceFrame:
-        parser = XmlParser(context=XmlContext())
+        parser = XmlParser(context=_xml_context)
         return parser.parse(self._value, DeviceFrame)
 
     def get_eid_content(self) -> str:
@@ -146,7 +336,23 @@ class DeviceBuilder:
         self._config_value = config
         return self
 
-    def _replace_variables(self) -> tuple[str, configparser.ConfigParser]:
+    def cache(self, eid_cache: Optional[EidCache]):
+        """
+        Sets the cache for parsed EIDs, None disables caching.
+        """
+        self._cache = eid_cache
+        return self
+
+    def lazy(self, enabled: bool = True):
+        """
+        Builds functional profiles and data points on first access, instead
+        of when the device is built. Factories of custom drivers must accept
+        the `lazy` keyword argument.
+        """
+        self._lazy = enabled
+        return self
+
+    def _load_properties(self) -> configparser.ConfigParser:
         config = configparser.ConfigParser()
         params = self._config_value if self._config_value is not None else {}
         if self._config_type is SGrConfiguration.FILE:
@@ -160,9 +366,80 @@ class DeviceBuilder:
         else:
             config.clear()
         # else no properties
-        spec = self.get_eid_content()
-        for section_name, section in config.items():
-            for param_name in section:
-                pattern = re.compile(r'{{' + param_name + r'}}')
-                spec = pattern.sub(config.get(section_name, param_name), spec)
-        return spec, config
+        return config
+
+    def _replace_variables(
+        self, spec: str, config: configparser.ConfigParser
+    ) -> str:
+        template = property_template(spec)
+        properties = property_values(config)
+        text, missing = template.render(properties)
+        report_properties(template.placeholders(), missing, properties)
+        return text
+
+
+def _parse_eid(xml: str) -> DeviceFrame:
+    # runs in worker processes
+    return XmlParser(context=_xml_context).from_string(xml, DeviceFrame)
+
+
+async def build_many(
+    builders: Iterable[DeviceBuilder],
+    max_workers: Optional[int] = None,
+    executor: Optional[Executor] = None,
+) -> AsyncIterator[tuple[DeviceBuilder, SGrBaseInterface]]:
+    """
+    Builds many devices, parsing distinct EIDs in parallel.
+
+    EIDs are read in the default executor and parsed in a process pool,
+    unless they are cached. Builders resulting in the same EID share one
+    parse. Devices are created on the event loop.
+    :param builders: The configured device builders
+    :param max_workers: The size of the process pool
+    :param executor: Used for parsing instead of a new process pool
+    :returns: The builders with their devices, in order of completion
+    """
+    loop = asyncio.get_running_loop()
+    builders = list(builders)
+    lookups = await asyncio.gather(
+        *(
+            loop.run_in_executor(None, builder._lookup_frame)
+            for builder in builders
+        )
+    )
+
+    # builders waiting for each distinct substituted EID
+    waiting: dict[
+        str,
+        list[tuple[DeviceBuilder, configparser.ConfigParser, Optional[str]]],
+    ] = {}
+    for builder, (config, content, key, frame) in zip(builders, lookups):
+        if frame is not None:
+            yield builder, builder._create_device(frame, config)
+            continue
+        xml = builder._replace_variables(content, config)
+        waiting.setdefault(xml, []).append((builder, config, key))
+    if not waiting:
+        return
+
+    own_executor = None
+    if executor is None and len(waiting) > 1:
+        own_executor = ProcessPoolExecutor(max_workers)
+        executor = own_executor
+    try:
+        parsing = {
+            loop.run_in_executor(executor, _parse_eid, xml): xml
+            for xml in waiting
+        }
+        while parsing:
+            done, _ = await asyncio.wait(
+                parsing, return_when=asyncio.FIRST_COMPLETED
+            )
+            for future in done:
+                frame = future.result()
+                for builder, config, key in waiting[parsing.pop(future)]:
+                    builder._store_frame(key, frame)
+                    yield builder, builder._create_device(frame, config)
+    finally:
+        if own_executor is not None:
+            own_executor.shutdown(wait=False, cancel_futures=True)
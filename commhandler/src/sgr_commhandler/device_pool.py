@@ -0,0 +1,251 @@
+import asyncio
+import logging
+import time
+from collections.abc import AsyncIterator, Iterable
+from typing import Any, NamedTuple, Optional
+
+from sgr_commhandler.api.device_api import SGrBaseInterface
+from sgr_commhandler.api.snapshot import ColumnarSnapshot, SnapshotSchema
+from sgr_commhandler.utils.concurrency import LoopBoundSemaphore
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_POLL_INTERVAL = 10.0
+
+
+class PollResult(NamedTuple):
+    """
+    The values read successfully, and the errors of the data points that
+    failed or timed out. Failures of the device as a whole are reported
+    with the key ('', '').
+    """
+
+    device: SGrBaseInterface
+    values: dict[tuple[str, str], Any]
+    timestamp: float
+    errors: dict[tuple[str, str], Exception]
+
+
+class _PooledDevice:
+    __slots__ = ('device', 'interval')
+
+    def __init__(self, device: SGrBaseInterface, interval: float):
+        self.device = device
+        self.interval = interval
+
+
+class DevicePool:
+    """
+    Connects and polls many devices concurrently.
+
+    Devices sharing a transport, see `SGrBaseInterface.transport_key()`, are
+    polled at most `per_transport` at a time, so e.g. the devices on one
+    serial bus take turns while devices on different buses run in parallel.
+    """
+
+    def __init__(
+        self,
+        max_connecting: int = 10,
+        per_transport: int = 1,
+        read_timeout: Optional[float] = None,
+    ):
+        """
+        :param max_connecting: The number of devices connecting at a time
+        :param per_transport: The number of devices polled at a time per
+            transport
+        :param read_timeout: The time after which outstanding reads of a
+            device are reported as timed out, in seconds
+        """
+        self.read_timeout = read_timeout
+        self._devices: dict[int, _PooledDevice] = {}
+        self._connecting = LoopBoundSemaphore(max_connecting)
+        self._per_transport = per_transport
+        self._transports: dict[str, LoopBoundSemaphore] = {}
+
+    def add(
+        self, device: SGrBaseInterface, interval: float = DEFAULT_POLL_INTERVAL
+    ):
+        """
+        Adds a device, or changes its poll interval.
+        :param device: The device
+        :param interval: The time between polls, in seconds
+        """
+        if interval <= 0:
+            raise Exception('poll interval must be positive')
+        self._devices[id(device)] = _PooledDevice(device, interval)
+
+    def add_all(
+        self,
+        devices: Iterable[SGrBaseInterface],
+        interval: float = DEFAULT_POLL_INTERVAL,
+    ):
+        for device in devices:
+            self.add(device, interval)
+
+    def remove(self, device: SGrBaseInterface):
+        self._devices.pop(id(device), None)
+
+    def devices(self) -> list[SGrBaseInterface]:
+        return [pooled.device for pooled in self._devices.values()]
+
+    def __len__(self) -> int:
+        return len(self._devices)
+
+    def transports(self) -> dict[str, list[SGrBaseInterface]]:
+        """
+        Returns the devices grouped by transport.
+        """
+        groups: dict[str, list[SGrBaseInterface]] = {}
+        for pooled in self._devices.values():
+            groups.setdefault(pooled.device.transport_key(), []).append(
+                pooled.device
+            )
+        return groups
+
+    async def connect_async(
+        self,
+    ) -> list[tuple[SGrBaseInterface, Exception]]:
+        """
+        Connects all devices, a limited number at a time.
+        :returns: The devices which failed to connect, with the error
+        """
+
+        async def connect(device: SGrBaseInterface) -> Optional[Exception]:
+            async with self._connecting:
+                try:
+                    await device.connect_async()
+                    return None
+                except Exception as e:
+                    logger.warning(
+                        f'could not connect {_device_name(device)}: {e}'
+                    )
+                    return e
+
+        devices = self.devices()
+        errors = await asyncio.gather(*(connect(device) for device in devices))
+        return [
+            (device, error)
+            for device, error in zip(devices, errors)
+            if error is not None
+        ]
+
+    async def disconnect_async(self):
+        await asyncio.gather(
+            *(device.disconnect_async() for device in self.devices()),
+            return_exceptions=True,
+        )
+
+    async def poll_once(self) -> list[PollResult]:
+        """
+        Polls each device once.
+        :returns: The results, in the order devices were added
+        """
+        return list(
+            await asyncio.gather(
+                *(self._poll_device(device) for device in self.devices())
+            )
+        )
+
+    async def snapshot_async(
+        self,
+    ) -> dict[SnapshotSchema, ColumnarSnapshot]:
+        """
+        Polls each device once into columnar snapshots, one per device type.
+        Rows are labelled with the device name and the position of the
+        device in the pool, e.g. 'B23#3', since devices of one type often
+        share a name. They are appended as devices complete. Devices which
+        cannot be described are left out.
+        """
+        snapshots: dict[SnapshotSchema, ColumnarSnapshot] = {}
+
+        async def read(index: int, device: SGrBaseInterface):
+            label = f'{_device_name(device)}#{index}'
+            try:
+                schema = SnapshotSchema.of(device)
+            except Exception as e:
+                # without a schema there is no snapshot to add a row to
+                logger.warning(f'cannot describe {label}: {e}')
+                return
+            snapshot = snapshots.get(schema)
+            if snapshot is None:
+                snapshot = ColumnarSnapshot(schema)
+                snapshots[schema] = snapshot
+            async with self._transport(device.transport_key()):
+                try:
+                    await device.read_snapshot_async(
+                        self.read_timeout, snapshot, label
+                    )
+                except Exception as e:
+                    logger.debug(f'polling {label} failed: {e}')
+                    snapshot.append_mapping({}, time.time(), label)
+
+        await asyncio.gather(
+            *(
+                read(index, device)
+                for index, device in enumerate(self.devices())
+            )
+        )
+        return snapshots
+
+    async def poll(self, queue_size: int = 0) -> AsyncIterator[PollResult]:
+        """
+        Polls each device at its interval, until the iteration is stopped.
+        Results are yielded as they arrive. Devices added or removed while
+        polling are not considered before the next call.
+        :param queue_size: The number of results buffered for a slow consumer,
+            0 for no limit. Polling waits while the buffer is full.
+        """
+        results: asyncio.Queue[PollResult] = asyncio.Queue(queue_size)
+        tasks = [
+            asyncio.create_task(self._poll_periodically(pooled, results))
+            for pooled in list(self._devices.values())
+        ]
+        try:
+            while True:
+                yield await results.get()
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _poll_periodically(
+        self, pooled: _PooledDevice, results: asyncio.Queue
+    ):
+        loop = asyncio.get_running_loop()
+        next_poll = loop.time()
+        while True:
+            await results.put(await self._poll_device(pooled.device))
+            next_poll += pooled.interval
+            now = loop.time()
+            if next_poll < now:
+                # overran the interval, skip the missed polls
+                next_poll = now
+            await asyncio.sleep(next_poll - now)
+
+    async def _poll_device(self, device: SGrBaseInterface) -> PollResult:
+        async with self._transport(device.transport_key()):
+            timestamp = time.time()
+            try:
+                results = await device.read_values_async(self.read_timeout)
+            except Exception as e:
+                logger.debug(f'polling {_device_name(device)} failed: {e}')
+                return PollResult(device, {}, timestamp, {('', ''): e})
+            values = {}
+            errors = {}
+            for key, result in results.items():
+                if result.ok():
+                    values[key] = result.value
+                elif result.error is not None:
+                    errors[key] = result.error
+            return PollResult(device, values, timestamp, errors)
+
+    def _transport(self, key: str) -> LoopBoundSemaphore:
+        semaphore = self._transports.get(key)
+        if semaphore is None:
+            semaphore = LoopBoundSemaphore(self._per_transport)
+            self._transports[key] = semaphore
+        return semaphore
+
+
+def _device_name(device: SGrBaseInterface) -> str:
+    return device.device_information.name or device.transport_key()
@@ -21,6 +21,10 @@ from sgr_commhandler.api import (
     FunctionalProfile,
     SGrBaseInterface,
 )
+from sgr_commhandler.api.lazy import (
+    build_data_points,
+    build_functional_profiles,
+)
 from sgr_commhandler.validators import build_validator
 
 logger = logging.getLogger(__name__)
@@ -33,10 +37,15 @@ def build_contact_data_point(
 ) -> DataPoint:
     protocol = ContactDataPoint(data_point, function_profile, interface)
     data_type = None
-    if data_point.data_point and data_point.data_point.data_type:
+    minimum = maximum = None
+    if data_point.data_point:
         data_type = data_point.data_point.data_type
-    validator = build_validator(data_type)
-    return DataPoint(protocol, validator)
+        minimum = data_point.data_point.minimum_value
+        maximum = data_point.data_point.maximum_value
+    validator = build_validator(data_type, minimum, maximum)
+    return DataPoint(
+        protocol, validator, interface.value_cache, interface.interceptors
+    )
 
 
 class ContactDataPoint(DataPointProtocol):
@@ -88,6 +97,7 @@ class ContactFunctionalProfile(FunctionalProfile):
         self,
         fp_spec: ContactFunctionalProfileSpec,
         interface: 'SGrContactInterface',
+        lazy: bool = False,
     ):
         self._fp_spec = fp_spec
         self._interface = interface
@@ -99,12 +109,12 @@ class ContactFunctionalProfile(FunctionalProfile):
         ):
             raw_dps = self._fp_spec.data_point_list.data_point_list_element
 
-        dps = [
-            build_contact_data_point(dp, self._fp_spec, self._interface)
-            for dp in raw_dps
-        ]
-
-        self._data_points = {dp.name(): dp for dp in dps}
+        self._data_points = build_data_points(
+            self.name(),
+            raw_dps,
+            lambda dp: build_contact_data_point(dp, self._fp_spec, self._interface),
+            lazy,
+        )
 
     def name(self) -> str:
         if (
@@ -125,7 +135,10 @@ class SGrContactInterface(SGrBaseInterface):
     """
 
     def __init__(
-        self, frame: DeviceFrame, configuration: configparser.ConfigParser
+        self,
+        frame: DeviceFrame,
+        configuration: configparser.ConfigParser,
+        lazy: bool = False,
     ):
         self._inititalize_device(frame, configuration)
 
@@ -151,8 +164,11 @@ class SGrContactInterface(SGrBaseInterface):
             and self._raw_interface.functional_profile_list.functional_profile_list_element
         ):
             raw_fps = self._raw_interface.functional_profile_list.functional_profile_list_element
-        fps = [ContactFunctionalProfile(profile, self) for profile in raw_fps]
-        self.function_profiles = {fp.name(): fp for fp in fps}
+        self.function_profiles = build_functional_profiles(
+            raw_fps,
+            lambda profile: ContactFunctionalProfile(profile, self, lazy),
+            lazy,
+        )
 
     def is_connected(self):
         return False
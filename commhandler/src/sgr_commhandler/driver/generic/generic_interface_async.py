@@ -21,6 +21,10 @@ from sgr_commhandler.api import (
     FunctionalProfile,
     SGrBaseInterface,
 )
+from sgr_commhandler.api.lazy import (
+    build_data_points,
+    build_functional_profiles,
+)
 from sgr_commhandler.validators import build_validator
 
 logger = logging.getLogger(__name__)
@@ -33,10 +37,15 @@ def build_generic_data_point(
 ) -> DataPoint:
     protocol = GenericDataPoint(data_point, function_profile, interface)
     data_type = None
-    if data_point.data_point and data_point.data_point.data_type:
+    minimum = maximum = None
+    if data_point.data_point:
         data_type = data_point.data_point.data_type
-    validator = build_validator(data_type)
-    return DataPoint(protocol, validator)
+        minimum = data_point.data_point.minimum_value
+        maximum = data_point.data_point.maximum_value
+    validator = build_validator(data_type, minimum, maximum)
+    return DataPoint(
+        protocol, validator, interface.value_cache, interface.interceptors
+    )
 
 
 class GenericDataPoint(DataPointProtocol):
@@ -95,6 +104,7 @@ class GenericFunctionalProfile(FunctionalProfile):
         self,
         fp_spec: GenericFunctionalProfileSpec,
         interface: 'SGrGenericInterface',
+        lazy: bool = False,
     ):
         self._fp_spec = fp_spec
         self._interface = interface
@@ -106,12 +116,12 @@ class GenericFunctionalProfile(FunctionalProfile):
         ):
             raw_dps = self._fp_spec.data_point_list.data_point_list_element
 
-        dps = [
-            build_generic_data_point(dp, self._fp_spec, self._interface)
-            for dp in raw_dps
-        ]
-
-        self._data_points = {dp.name(): dp for dp in dps}
+        self._data_points = build_data_points(
+            self.name(),
+            raw_dps,
+            lambda dp: build_generic_data_point(dp, self._fp_spec, self._interface),
+            lazy,
+        )
 
     def name(self) -> str:
         if (
@@ -132,7 +142,10 @@ class SGrGenericInterface(SGrBaseInterface):
     """
 
     def __init__(
-        self, frame: DeviceFrame, configuration: configparser.ConfigParser
+        self,
+        frame: DeviceFrame,
+        configuration: configparser.ConfigParser,
+        lazy: bool = False,
     ):
         self._inititalize_device(frame, configuration)
 
@@ -151,8 +164,11 @@ class SGrGenericInterface(SGrBaseInterface):
             and self._raw_interface.functional_profile_list.functional_profile_list_element
         ):
             raw_fps = self._raw_interface.functional_profile_list.functional_profile_list_element
-        fps = [GenericFunctionalProfile(profile, self) for profile in raw_fps]
-        self.function_profiles = {fp.name(): fp for fp in fps}
+        self.function_profiles = build_functional_profiles(
+            raw_fps,
+            lambda profile: GenericFunctionalProfile(profile, self, lazy),
+            lazy,
+        )
 
     def is_connected(self):
         return False
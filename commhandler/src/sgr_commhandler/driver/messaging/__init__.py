@@ -1,7 +1,19 @@
-__all__ = ["MessagingDataPoint", "MessagingFunctionalProfile", "SGrMessagingInterface"]
+__all__ = [
+    "InMemoryBroker",
+    "InMemoryMessagingClient",
+    "MessagingDataPoint",
+    "MessagingDeviceSimulator",
+    "MessagingFunctionalProfile",
+    "SGrMessagingClient",
+    "SGrMessagingInterface",
+    "register_messaging_client",
+]
 
+from .in_memory_client import InMemoryBroker, InMemoryMessagingClient
+from .messaging_client import SGrMessagingClient, register_messaging_client
 from .messaging_interface_async import (
     MessagingDataPoint,
     MessagingFunctionalProfile,
     SGrMessagingInterface,
 )
+from .simulator import MessagingDeviceSimulator
@@ -0,0 +1,144 @@
+import asyncio
+import logging
+import random
+from dataclasses import dataclass, replace
+from typing import Optional
+
+from sgr_commhandler.driver.messaging.message_dispatcher import TopicTrie
+from sgr_commhandler.driver.messaging.messaging_client import (
+    MessageCallback,
+    SGrMessagingClient,
+)
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class BrokerStatistics:
+    published: int = 0
+    delivered: int = 0
+    dropped: int = 0
+
+
+class InMemoryBroker:
+    """
+    Message broker living in the current process, following MQTT topic
+    semantics. Used to simulate messaging devices without network access.
+    """
+
+    def __init__(self):
+        self._subscriptions: TopicTrie[InMemoryMessagingClient] = TopicTrie()
+        self._stats = BrokerStatistics()
+
+    def client(
+        self,
+        latency: float = 0.0,
+        loss_rate: float = 0.0,
+        seed: Optional[int] = None,
+        no_local: bool = False,
+    ) -> 'InMemoryMessagingClient':
+        """
+        Creates a client attached to this broker.
+        :param latency: The delay in seconds until a message is delivered to this client
+        :param loss_rate: The probability of a message to this client being lost
+        :param seed: The seed for the loss simulation
+        :param no_local: Do not deliver messages published by this client to itself
+        """
+        return InMemoryMessagingClient(
+            self, latency=latency, loss_rate=loss_rate, seed=seed, no_local=no_local
+        )
+
+    def statistics(self) -> BrokerStatistics:
+        return replace(self._stats)
+
+    def _subscribe(self, topic: str, client: 'InMemoryMessagingClient'):
+        self._subscriptions.add(topic, client)
+
+    def _unsubscribe(self, topic: str, client: 'InMemoryMessagingClient'):
+        while self._subscriptions.remove(topic, client):
+            pass
+
+    async def publish(
+        self,
+        topic: str,
+        payload: str | bytes,
+        sender: Optional['InMemoryMessagingClient'] = None,
+    ):
+        self._stats.published += 1
+        # a client receives a message once, even with overlapping filters
+        receivers = dict.fromkeys(self._subscriptions.match(topic))
+        for client in receivers:
+            if client is sender and client.no_local:
+                continue
+            if client._lose_message():
+                self._stats.dropped += 1
+                continue
+            self._stats.delivered += 1
+            await client._deliver(topic, payload)
+
+
+class InMemoryMessagingClient(SGrMessagingClient):
+    def __init__(
+        self,
+        broker: InMemoryBroker,
+        latency: float = 0.0,
+        loss_rate: float = 0.0,
+        seed: Optional[int] = None,
+        no_local: bool = False,
+    ):
+        self._broker = broker
+        self.latency = latency
+        self.loss_rate = loss_rate
+        self.no_local = no_local
+        self._random = random.Random(seed)
+        self._on_message: Optional[MessageCallback] = None
+        self._topics: set[str] = set()
+        self._tasks: set[asyncio.Task] = set()
+
+    async def connect(self, on_message: MessageCallback):
+        self._on_message = on_message
+
+    async def disconnect(self):
+        for topic in self._topics:
+            self._broker._unsubscribe(topic, self)
+        self._topics.clear()
+        for task in self._tasks:
+            task.cancel()
+        self._on_message = None
+
+    def is_connected(self) -> bool:
+        return self._on_message is not None
+
+    async def subscribe(self, topic: str):
+        if topic not in self._topics:
+            self._topics.add(topic)
+            self._broker._subscribe(topic, self)
+
+    async def unsubscribe(self, topic: str):
+        if topic in self._topics:
+            self._topics.remove(topic)
+            self._broker._unsubscribe(topic, self)
+
+    async def publish(self, topic: str, payload: str | bytes):
+        if self._on_message is None:
+            raise Exception('client not connected')
+        await self._broker.publish(topic, payload, sender=self)
+
+    def _lose_message(self) -> bool:
+        return self.loss_rate > 0 and self._random.random() < self.loss_rate
+
+    async def _deliver(self, topic: str, payload: str | bytes):
+        on_message = self._on_message
+        if on_message is None:
+            return
+        if self.latency <= 0:
+            await on_message(topic, payload)
+            return
+
+        async def deliver_later():
+            await asyncio.sleep(self.latency)
+            await on_message(topic, payload)
+
+        task = asyncio.create_task(deliver_later())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
@@ -0,0 +1,359 @@
+import inspect
+import json
+import logging
+import re
+from collections.abc import Awaitable, Callable
+from typing import Any, Generic, Optional, TypeVar
+
+import jmespath
+from jmespath.parser import ParsedResult
+from sgr_specification.v0.generic.base_types import (
+    MessageFilter,
+    ResponseQuery,
+    ResponseQueryType,
+)
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar('T')
+
+MessageHandler = Callable[[Any], Optional[Awaitable[None]]]
+
+_UNSET = object()
+_NOT_JSON = object()
+
+
+def split_topic(topic: str) -> list[str]:
+    """
+    Splits an MQTT topic or topic filter into its levels.
+    """
+    return topic.split('/')
+
+
+def is_valid_topic_filter(topic_filter: str) -> bool:
+    """
+    Checks the MQTT rules for the wildcards '+' and '#'.
+    """
+    if not topic_filter:
+        return False
+    levels = split_topic(topic_filter)
+    for i, level in enumerate(levels):
+        if '#' in level and (level != '#' or i != len(levels) - 1):
+            return False
+        if '+' in level and level != '+':
+            return False
+    return True
+
+
+class _TopicNode(Generic[T]):
+    __slots__ = ('children', 'values')
+
+    def __init__(self):
+        self.children: dict[str, _TopicNode[T]] = {}
+        self.values: list[T] = []
+
+
+class TopicTrie(Generic[T]):
+    """
+    Stores values by MQTT topic filter and returns all values whose filter
+    matches a concrete topic. The lookup cost depends on the number of topic
+    levels, not on the number of stored filters.
+    """
+
+    def __init__(self):
+        self._root: _TopicNode[T] = _TopicNode()
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def add(self, topic_filter: str, value: T):
+        if not is_valid_topic_filter(topic_filter):
+            raise Exception(f'invalid topic filter: {topic_filter}')
+        node = self._root
+        for level in split_topic(topic_filter):
+            child = node.children.get(level)
+            if child is None:
+                child = _TopicNode()
+                node.children[level] = child
+            node = child
+        node.values.append(value)
+        self._size += 1
+
+    def remove(self, topic_filter: str, value: T) -> bool:
+        path = [self._root]
+        for level in split_topic(topic_filter):
+            child = path[-1].children.get(level)
+            if child is None:
+                return False
+            path.append(child)
+        try:
+            path[-1].values.remove(value)
+        except ValueError:
+            return False
+        self._size -= 1
+        # prune empty branches
+        levels = split_topic(topic_filter)
+        for i in range(len(levels), 0, -1):
+            node = path[i]
+            if node.values or node.children:
+                break
+            del path[i - 1].children[levels[i - 1]]
+        return True
+
+    def match(self, topic: str) -> list[T]:
+        levels = split_topic(topic)
+        # wildcards at the first level do not match system topics
+        system_topic = topic.startswith('$')
+        result: list[T] = []
+        nodes = [self._root]
+        for i, level in enumerate(levels):
+            next_nodes = []
+            for node in nodes:
+                if not (system_topic and i == 0):
+                    multi = node.children.get('#')
+                    if multi is not None:
+                        result.extend(multi.values)
+                    single = node.children.get('+')
+                    if single is not None:
+                        next_nodes.append(single)
+                exact = node.children.get(level)
+                if exact is not None:
+                    next_nodes.append(exact)
+            if not next_nodes:
+                return result
+            nodes = next_nodes
+        for node in nodes:
+            result.extend(node.values)
+            # 'a/#' also matches the parent level 'a'
+            multi = node.children.get('#')
+            if multi is not None:
+                result.extend(multi.values)
+        return result
+
+
+class InboundMessage:
+    """
+    A received message. The payload is decoded at most once, and query
+    results are memoized, so that data points sharing a filter query do not
+    evaluate it again.
+    """
+
+    __slots__ = ('topic', 'payload', '_json', '_results')
+
+    def __init__(self, topic: str, payload: str | bytes):
+        self.topic = topic
+        self.payload = (
+            payload.decode('utf-8')
+            if isinstance(payload, (bytes, bytearray))
+            else payload
+        )
+        self._json: Any = _UNSET
+        self._results: dict[str, Any] = {}
+
+    def json(self) -> Any:
+        """
+        :returns: the decoded JSON payload, or the sentinel _NOT_JSON
+        """
+        if self._json is _UNSET:
+            try:
+                self._json = json.loads(self.payload)
+            except ValueError:
+                self._json = _NOT_JSON
+        return self._json
+
+    def value(self) -> Any:
+        """
+        :returns: the decoded JSON payload, or the raw payload string
+        """
+        data = self.json()
+        return self.payload if data is _NOT_JSON else data
+
+    def search(self, expression: ParsedResult) -> Any:
+        key = expression.expression
+        if key in self._results:
+            return self._results[key]
+        data = self.json()
+        result = None if data is _NOT_JSON else expression.search(data)
+        self._results[key] = result
+        return result
+
+
+def _to_match_string(value: Any) -> str:
+    if isinstance(value, str):
+        return value
+    return json.dumps(value)
+
+
+class CompiledMessageFilter:
+    """
+    Message filter with precompiled JMESPath expressions and regexes.
+    """
+
+    __slots__ = ('_kind', '_query', '_pattern')
+
+    def __init__(self, message_filter: MessageFilter):
+        self._kind = ''
+        self._query: Any = None
+        self._pattern: Optional[re.Pattern] = None
+        if message_filter.jmespath_filter:
+            self._kind = 'jmespath'
+            self._query = jmespath.compile(
+                message_filter.jmespath_filter.query or '@'
+            )
+            self._pattern = re.compile(
+                message_filter.jmespath_filter.matches_regex or '.*'
+            )
+        elif message_filter.regex_filter:
+            self._kind = 'regex'
+            self._query = re.compile(message_filter.regex_filter.query or '.*')
+            self._pattern = re.compile(
+                message_filter.regex_filter.matches_regex or '.*'
+            )
+        elif message_filter.plaintext_filter:
+            self._kind = 'plaintext'
+            self._pattern = re.compile(
+                message_filter.plaintext_filter.matches_regex or '.*'
+            )
+        else:
+            logger.warning('unsupported message filter, messages are ignored')
+
+    def matches(self, message: InboundMessage) -> bool:
+        if self._kind == 'jmespath':
+            result = message.search(self._query)
+            if result is None:
+                return False
+            return self._pattern.fullmatch(_to_match_string(result)) is not None
+        elif self._kind == 'regex':
+            found = self._query.search(message.payload)
+            if found is None:
+                return False
+            text = found.group(1) if found.re.groups else found.group(0)
+            return self._pattern.fullmatch(text) is not None
+        elif self._kind == 'plaintext':
+            return self._pattern.fullmatch(message.payload) is not None
+        return False
+
+
+class CompiledResponseQuery:
+    """
+    Response query with a precompiled JMESPath expression or regex.
+    """
+
+    __slots__ = ('_kind', '_query')
+
+    def __init__(self, response_query: Optional[ResponseQuery]):
+        self._kind = ''
+        self._query: Any = None
+        if response_query is None or not response_query.query:
+            return
+        if response_query.query_type == ResponseQueryType.JMESPATH_EXPRESSION:
+            self._kind = 'jmespath'
+            self._query = jmespath.compile(response_query.query)
+        elif response_query.query_type == ResponseQueryType.REGULAR_EXPRESSION:
+            self._kind = 'regex'
+            self._query = re.compile(response_query.query)
+        else:
+            logger.warning(
+                f'unsupported response query type {response_query.query_type}, using raw payload'
+            )
+
+    def extract(self, message: InboundMessage) -> Any:
+        if self._kind == 'jmespath':
+            return message.search(self._query)
+        elif self._kind == 'regex':
+            found = self._query.search(message.payload)
+            if found is None:
+                return None
+            return found.group(1) if found.re.groups else found.group(0)
+        return message.value()
+
+
+class MessageRoute:
+    """
+    Registration of a handler for an inbound message topic.
+    """
+
+    __slots__ = ('topic', 'handler', 'message_filter', 'response_query')
+
+    def __init__(
+        self,
+        topic: str,
+        handler: MessageHandler,
+        message_filter: Optional[CompiledMessageFilter],
+        response_query: CompiledResponseQuery,
+    ):
+        self.topic = topic
+        self.handler = handler
+        self.message_filter = message_filter
+        self.response_query = response_query
+
+
+class MessageDispatcher:
+    """
+    Routes inbound messages to the registered handlers.
+
+    Candidate routes are looked up in a topic trie, so only routes with a
+    matching topic filter evaluate their message filter and response query.
+    """
+
+    def __init__(self):
+        self._routes: TopicTrie[MessageRoute] = TopicTrie()
+        self._topics: dict[str, int] = {}
+
+    def register(
+        self,
+        topic: str,
+        handler: MessageHandler,
+        message_filter: Optional[MessageFilter] = None,
+        response_query: Optional[ResponseQuery] = None,
+    ) -> MessageRoute:
+        route = MessageRoute(
+            topic,
+            handler,
+            CompiledMessageFilter(message_filter) if message_filter else None,
+            CompiledResponseQuery(response_query),
+        )
+        self._routes.add(topic, route)
+        self._topics[topic] = self._topics.get(topic, 0) + 1
+        return route
+
+    def unregister(self, route: MessageRoute):
+        if self._routes.remove(route.topic, route):
+            count = self._topics[route.topic] - 1
+            if count > 0:
+                self._topics[route.topic] = count
+            else:
+                del self._topics[route.topic]
+
+    def topics(self) -> list[str]:
+        """
+        :returns: the topic filters with at least one registered route
+        """
+        return list(self._topics)
+
+    async def dispatch(self, topic: str, payload: str | bytes) -> int:
+        """
+        Delivers a message to all matching routes.
+        :param topic: The topic the message was received on
+        :param payload: The message payload
+        :returns: The number of handlers the message was delivered to
+        """
+        routes = self._routes.match(topic)
+        if not routes:
+            return 0
+        message = InboundMessage(topic, payload)
+        delivered = 0
+        for route in routes:
+            try:
+                if route.message_filter and not route.message_filter.matches(
+                    message
+                ):
+                    continue
+                result = route.handler(route.response_query.extract(message))
+                if inspect.isawaitable(result):
+                    await result
+                delivered += 1
+            except Exception as e:
+                logger.error(f'failed to handle message on {topic}: {e}')
+        return delivered
@@ -0,0 +1,72 @@
+from abc import ABC, abstractmethod
+from collections.abc import Awaitable, Callable
+
+from sgr_specification.v0.product.messaging_types import (
+    MessagingInterfaceDescription,
+    MessagingPlatformType,
+)
+
+MessageCallback = Callable[[str, str | bytes], Awaitable[None]]
+
+
+class SGrMessagingClient(ABC):
+    """
+    Transport used by the messaging interface to talk to a message broker.
+    """
+
+    @abstractmethod
+    async def connect(self, on_message: MessageCallback):
+        """
+        Connects to the broker.
+        :param on_message: Called with topic and payload of every message received on a subscribed topic
+        """
+        ...
+
+    @abstractmethod
+    async def disconnect(self): ...
+
+    @abstractmethod
+    def is_connected(self) -> bool: ...
+
+    @abstractmethod
+    async def subscribe(self, topic: str):
+        """
+        Subscribes to a topic filter, which may contain MQTT wildcards.
+        :param topic: The topic filter
+        """
+        ...
+
+    async def unsubscribe(self, topic: str):
+        """
+        Unsubscribes from a topic filter, does nothing unless overridden.
+        :param topic: The topic filter
+        """
+        ...
+
+    @abstractmethod
+    async def publish(self, topic: str, payload: str | bytes):
+        """
+        Publishes a message.
+        :param topic: The topic to publish on
+        :param payload: The message payload
+        """
+        ...
+
+
+MessagingClientFactory = Callable[
+    [MessagingInterfaceDescription], SGrMessagingClient
+]
+
+supported_messaging_clients: dict[
+    MessagingPlatformType, MessagingClientFactory
+] = {}
+
+
+def register_messaging_client(
+    platform: MessagingPlatformType, factory: MessagingClientFactory
+):
+    """
+    Registers the transport used for devices of a messaging platform,
+    unless a client is passed to the interface explicitly.
+    """
+    supported_messaging_clients[platform] = factory
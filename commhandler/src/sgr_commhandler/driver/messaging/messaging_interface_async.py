@@ -1,7 +1,9 @@
+import asyncio
 import configparser
 import logging
-from collections.abc import Callable
-from typing import Any
+import time
+from collections.abc import Awaitable, Callable
+from typing import Any, Optional
 
 from sgr_specification.v0.generic import DataDirectionProduct
 from sgr_specification.v0.product import (
@@ -20,10 +22,27 @@ from sgr_commhandler.api import (
     FunctionalProfile,
     SGrBaseInterface,
 )
+from sgr_commhandler.api.interceptor import (
+    Invocation,
+    Operation,
+    has_interceptors,
+    intercept,
+)
+from sgr_commhandler.driver.messaging.message_dispatcher import (
+    MessageDispatcher,
+    MessageRoute,
+)
+from sgr_commhandler.driver.messaging.messaging_client import (
+    SGrMessagingClient,
+    supported_messaging_clients,
+)
 from sgr_commhandler.validators import build_validator
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_CACHE_MAX_AGE = 5.0
+DEFAULT_READ_TIMEOUT = 5.0
+
 
 def build_messaging_data_point(
     data_point: MessagingDataPointSpec,
@@ -32,10 +51,15 @@ def build_messaging_data_point(
 ) -> DataPoint:
     protocol = MessagingDataPoint(data_point, function_profile, interface)
     data_type = None
-    if data_point.data_point and data_point.data_point.data_type:
+    minimum = maximum = None
+    if data_point.data_point:
         data_type = data_point.data_point.data_type
-    validator = build_validator(data_type)
-    return DataPoint(protocol, validator)
+        minimum = data_point.data_point.minimum_value
+        maximum = data_point.data_point.maximum_value
+    validator = build_validator(data_type, minimum, maximum)
+    return DataPoint(
+        protocol, validator, interface.value_cache, interface.interceptors
+    )
 
 
 class MessagingDataPoint(DataPointProtocol):
@@ -67,12 +91,116 @@ class MessagingDataPoint(DataPointProtocol):
             self._dp_name = dp_spec.data_point.data_point_name
 
         self._interface = interface
+        self._subscriber: Optional[
+            Callable[[Any], Optional[Awaitable[None]]]
+        ] = None
+
+        # last value received, fed by inbound messages
+        self._last_value: Any = None
+        self._last_update: Optional[float] = None
+        self._pending: Optional[asyncio.Future] = None
+        self._read_cmd = dp_config.read_cmd_message
+
+        self._route: Optional[MessageRoute] = None
+        in_message = dp_config.in_message
+        if in_message and in_message.topic:
+            self._route = interface.dispatcher.register(
+                in_message.topic,
+                self._on_message,
+                in_message.filter,
+                in_message.response_query,
+            )
 
     def name(self) -> tuple[str, str]:
         return self._fp_name, self._dp_name
 
-    async def get_val(self, skip_cache: bool = False):
-        raise Exception('Not implemented')
+    def _on_message(self, value: Any) -> Optional[Awaitable[None]]:
+        # convert to DP units
+        if (
+            value is not None
+            and self._dp_spec.data_point
+            and self._dp_spec.data_point.unit_conversion_multiplicator
+            and self._dp_spec.data_point.unit_conversion_multiplicator != 1.0
+        ):
+            value = (
+                float(value)
+                * self._dp_spec.data_point.unit_conversion_multiplicator
+            )
+        self._last_value = value
+        self._last_update = time.monotonic()
+        if self._pending is not None:
+            if not self._pending.done():
+                self._pending.set_result(value)
+            self._pending = None
+        if self._subscriber is not None:
+            return self._subscriber(value)
+
+    def cached_value(self, max_age: Optional[float] = None) -> tuple[bool, Any]:
+        """
+        Returns the last received value, if it is fresh enough.
+        :param max_age: The maximum age in seconds, None accepts any age
+        :returns: Tuple of (hit, value)
+        """
+        if self._last_update is None:
+            return False, None
+        if max_age is not None and time.monotonic() - self._last_update > max_age:
+            return False, None
+        return True, self._last_value
+
+    async def get_val(
+        self, skip_cache: bool = False, max_age: Optional[float] = None
+    ):
+        """
+        Returns the last received value if it is not older than max_age,
+        otherwise publishes the read command and waits for the response.
+        Concurrent reads of the same data point share one read command.
+        :param skip_cache: Always publish the read command
+        :param max_age: The maximum age in seconds, defaults to the interface setting
+        """
+        if max_age is None:
+            max_age = self._interface.cache_max_age
+        if not skip_cache:
+            hit, value = self.cached_value(max_age)
+            if hit:
+                return value
+        if self._route is None:
+            raise Exception('no inMessage configured')
+        if self._read_cmd is None or not self._read_cmd.topic:
+            # no read command, rely on the device publishing by itself
+            hit, value = self.cached_value()
+            if hit:
+                return value
+        # the response may arrive and reset _pending while publishing
+        pending = self._pending
+        if pending is None or pending.done():
+            pending = asyncio.get_running_loop().create_future()
+            self._pending = pending
+            if self._read_cmd is not None and self._read_cmd.topic:
+                try:
+                    await self._interface.publish(
+                        self._read_cmd.topic, self._read_cmd.template or ''
+                    )
+                except BaseException:
+                    self._abandon(pending)
+                    raise
+        try:
+            return await asyncio.wait_for(
+                asyncio.shield(pending), self._interface.read_timeout
+            )
+        except asyncio.TimeoutError:
+            self._abandon(pending)
+            raise Exception(f'no response received for {self.name()}')
+        except asyncio.CancelledError:
+            if not pending.cancelled():
+                raise
+            # abandoned by the reader which published the read command
+            raise Exception(f'no response received for {self.name()}')
+
+    def _abandon(self, pending: asyncio.Future):
+        # the next read publishes the read command again
+        if self._pending is pending:
+            self._pending = None
+        pending.cancel()
 
     async def set_val(self, value: Any):
         raise Exception('Not implemented')
@@ -86,15 +214,15 @@ class MessagingDataPoint(DataPointProtocol):
         return self._dp_spec.data_point.data_direction
 
     def can_subscribe(self) -> bool:
-        return True
+        return self._route is not None
 
-    def subscribe(self, fn: Callable[[Any], None]):
-        # TODO implement
-        raise Exception('not implemented yet')
+    def subscribe(self, fn: Callable[[Any], Optional[Awaitable[None]]]):
+        if self._route is None:
+            raise Exception('no inMessage configured')
+        self._subscriber = fn
 
     def unsubscribe(self):
-        # TODO implement
-        raise Exception('not implemented yet')
+        self._subscriber = None
 
 
 class MessagingFunctionalProfile(FunctionalProfile):
@@ -138,9 +266,18 @@ class SGrMessagingInterface(SGrBaseInterface):
     """
 
     def __init__(
-        self, frame: DeviceFrame, configuration: configparser.ConfigParser
+        self,
+        frame: DeviceFrame,
+        configuration: configparser.ConfigParser,
+        client: Optional[SGrMessagingClient] = None,
+        cache_max_age: Optional[float] = DEFAULT_CACHE_MAX_AGE,
+        read_timeout: float = DEFAULT_READ_TIMEOUT,
     ):
         self._inititalize_device(frame, configuration)
+        self.dispatcher = MessageDispatcher()
+        self.cache_max_age = cache_max_age
+        self.read_timeout = read_timeout
+        self._client = client
 
         if (
             self.frame.interface_list
@@ -156,7 +293,10 @@ class SGrMessagingInterface(SGrBaseInterface):
         if desc is None:
             raise Exception('No messaging interface description')
 
-        # TODO configure interface
+        if self._client is None and desc.platform is not None:
+            client_factory = supported_messaging_clients.get(desc.platform)
+            if client_factory is not None:
+                self._client = client_factory(desc)
 
         raw_fps = []
         if (
@@ -167,13 +307,86 @@ class SGrMessagingInterface(SGrBaseInterface):
         fps = [MessagingFunctionalProfile(profile, self) for profile in raw_fps]
         self.function_profiles = {fp.name(): fp for fp in fps}
 
+    def set_client(self, client: SGrMessagingClient):
+        """
+        Sets the transport used to talk to the message broker.
+        """
+        self._client = client
+
     def is_connected(self):
-        return False
+        return self._client is not None and self._client.is_connected()
+
+    def broker_key(self) -> str:
+        """
+        Identifies the broker of the device in invocations, so that
+        recordings can be replayed on another instance of the device.
+        Unlike the transport key this is shared by all devices of a broker,
+        which are not limited to one request at a time.
+        """
+        desc = self._raw_interface.messaging_interface_description
+        brokers = (
+            desc.message_broker_list.message_broker_list_element
+            if desc and desc.message_broker_list
+            else []
+        )
+        if not brokers:
+            return self.transport_key()
+        return f'messaging:{brokers[0].host}:{brokers[0].port}'
+
+    def subscribed_topics(self) -> list[str]:
+        """
+        Returns the topic filters the device needs to receive messages on.
+        """
+        return self.dispatcher.topics()
+
+    async def handle_message(self, topic: str, payload: str | bytes) -> int:
+        """
+        Dispatches an inbound message to the data points.
+        :param topic: The topic the message was received on
+        :param payload: The message payload
+        :returns: The number of data points the message was delivered to
+        """
+        if not has_interceptors(self.interceptors):
+            return await self.dispatcher.dispatch(topic, payload)
+        return await intercept(
+            self.interceptors,
+            Invocation(
+                Operation.MESSAGE,
+                value=payload,
+                transport=self.broker_key(),
+                attributes=dict(topic=topic),
+            ),
+            lambda invocation: self.dispatcher.dispatch(
+                topic, invocation.value
+            ),
+        )
 
     async def disconnect_async(self):
-        # TODO implement
-        pass
+        if self._client is not None:
+            await self._client.disconnect()
 
     async def connect_async(self):
-        # TODO implement
-        pass
+        if self._client is None:
+            raise Exception('no messaging client configured')
+        await self._client.connect(self.handle_message)
+        for topic in self.subscribed_topics():
+            await self._client.subscribe(topic)
+
+    async def publish(self, topic: str, payload: str | bytes):
+        if not has_interceptors(self.interceptors):
+            return await self._publish(topic, payload)
+        return await intercept(
+            self.interceptors,
+            Invocation(
+                Operation.REQUEST,
+                value=payload,
+                transport=self.broker_key(),
+                attributes=dict(topic=topic),
+            ),
+            lambda invocation: self._publish(topic, invocation.value),
+        )
+
+    async def _publish(self, topic: str, payload: str | bytes):
+        if self._client is None:
+            raise Exception('no messaging client configured')
+        await self._client.publish(topic, payload)
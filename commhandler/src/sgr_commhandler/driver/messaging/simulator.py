@@ -0,0 +1,228 @@
+import json
+import logging
+import re
+from typing import Any, Optional
+
+from sgr_specification.v0.generic import DataTypeProduct
+from sgr_specification.v0.generic.base_types import ResponseQueryType
+from sgr_specification.v0.product import (
+    DeviceFrame,
+)
+from sgr_specification.v0.product import (
+    MessagingDataPoint as MessagingDataPointSpec,
+)
+
+from sgr_commhandler.driver.messaging.message_dispatcher import TopicTrie
+from sgr_commhandler.driver.messaging.messaging_client import (
+    SGrMessagingClient,
+)
+
+logger = logging.getLogger(__name__)
+
+_SIMPLE_PATH = re.compile(r'[A-Za-z_][A-Za-z0-9_]*(\.[A-Za-z_][A-Za-z0-9_]*)*')
+
+
+def _assign(target: dict, path: str, value: Any):
+    keys = path.split('.')
+    for key in keys[:-1]:
+        target = target.setdefault(key, {})
+    target[keys[-1]] = value
+
+
+def _default_value(data_type: Optional[DataTypeProduct]) -> Any:
+    if data_type is None:
+        return None
+    if data_type.string is not None:
+        return ''
+    if data_type.boolean is not None:
+        return False
+    if data_type.enum is not None and data_type.enum.enum_entry:
+        return data_type.enum.enum_entry[0].literal
+    return 0
+
+
+class _SimulatedDataPoint:
+    def __init__(self, fp_name: str, dp_spec: MessagingDataPointSpec):
+        dp = dp_spec.data_point
+        config = dp_spec.messaging_data_point_configuration
+        self.name = (
+            fp_name,
+            dp.data_point_name if dp and dp.data_point_name else '',
+        )
+        self.value = _default_value(dp.data_type if dp else None)
+        self.multiplicator = (
+            dp.unit_conversion_multiplicator
+            if dp and dp.unit_conversion_multiplicator
+            else 1.0
+        )
+        self.read_topic = None
+        self.read_template = None
+        if config.read_cmd_message and config.read_cmd_message.topic:
+            self.read_topic = config.read_cmd_message.topic
+            self.read_template = config.read_cmd_message.template or ''
+        self.write_topic = None
+        if (
+            config.write_cmd_message
+            and config.write_cmd_message.topic
+            and (config.write_cmd_message.template or '').strip()
+            == '{{value}}'
+        ):
+            self.write_topic = config.write_cmd_message.topic
+
+        in_message = config.in_message
+        self.in_topic = in_message.topic if in_message else None
+        self.filter_fields: dict[str, str] = {}
+        self.response_path: Optional[str] = None
+        self.raw_response = True
+        if in_message and in_message.filter:
+            jmespath_filter = in_message.filter.jmespath_filter
+            if (
+                jmespath_filter is None
+                or not _SIMPLE_PATH.fullmatch(jmespath_filter.query or '')
+                or re.escape(jmespath_filter.matches_regex or '')
+                != (jmespath_filter.matches_regex or '')
+            ):
+                raise Exception(f'cannot simulate message filter of {self.name}')
+            self.filter_fields[jmespath_filter.query] = (
+                jmespath_filter.matches_regex
+            )
+        if in_message and in_message.response_query:
+            query = in_message.response_query
+            if (
+                query.query_type == ResponseQueryType.JMESPATH_EXPRESSION
+                and query.query
+            ):
+                if not _SIMPLE_PATH.fullmatch(query.query):
+                    raise Exception(
+                        f'cannot simulate response query of {self.name}'
+                    )
+                self.response_path = query.query
+                self.raw_response = False
+
+    def device_value(self) -> Any:
+        if self.multiplicator != 1.0 and isinstance(self.value, (int, float)):
+            return self.value / self.multiplicator
+        return self.value
+
+    def response(self) -> str:
+        value = self.device_value()
+        if self.raw_response and not self.filter_fields:
+            return value if isinstance(value, str) else json.dumps(value)
+        payload: dict = {}
+        for path, literal in self.filter_fields.items():
+            _assign(payload, path, literal)
+        if self.response_path:
+            _assign(payload, self.response_path, value)
+        return json.dumps(payload)
+
+
+class MessagingDeviceSimulator:
+    """
+    Simulates the device side of a messaging EID. Read commands are answered
+    with a message that passes the inMessage filter and response query of the
+    data point, and plain '{{value}}' write commands update the simulated value.
+    """
+
+    def __init__(
+        self,
+        frame: DeviceFrame,
+        client: SGrMessagingClient,
+        values: Optional[dict[tuple[str, str], Any]] = None,
+    ):
+        self._client = client
+        self._data_points: dict[tuple[str, str], _SimulatedDataPoint] = {}
+        self._reads: TopicTrie[_SimulatedDataPoint] = TopicTrie()
+        self._writes: TopicTrie[_SimulatedDataPoint] = TopicTrie()
+        self.requests_answered = 0
+
+        interface = (
+            frame.interface_list.messaging_interface
+            if frame.interface_list
+            else None
+        )
+        if interface is None:
+            raise Exception('No messaging interface')
+        raw_fps = []
+        if (
+            interface.functional_profile_list
+            and interface.functional_profile_list.functional_profile_list_element
+        ):
+            raw_fps = interface.functional_profile_list.functional_profile_list_element
+        for fp in raw_fps:
+            fp_name = (
+                fp.functional_profile.functional_profile_name
+                if fp.functional_profile
+                and fp.functional_profile.functional_profile_name
+                else ''
+            )
+            raw_dps = (
+                fp.data_point_list.data_point_list_element
+                if fp.data_point_list
+                else []
+            )
+            for dp_spec in raw_dps:
+                if dp_spec.messaging_data_point_configuration is None:
+                    continue
+                try:
+                    dp = _SimulatedDataPoint(fp_name, dp_spec)
+                except Exception as e:
+                    logger.warning(f'data point not simulated: {e}')
+                    continue
+                self._data_points[dp.name] = dp
+                if dp.read_topic and dp.in_topic:
+                    self._reads.add(dp.read_topic, dp)
+                if dp.write_topic:
+                    self._writes.add(dp.write_topic, dp)
+        for (fp_name, dp_name), value in (values or {}).items():
+            self.set_value((fp_name, dp_name), value)
+
+    def set_value(self, dp: tuple[str, str], value: Any):
+        """
+        Sets the simulated value of a data point, in data point units.
+        """
+        self._data_points[dp].value = value
+
+    def get_value(self, dp: tuple[str, str]) -> Any:
+        return self._data_points[dp].value
+
+    async def start(self):
+        await self._client.connect(self._on_message)
+        topics = set()
+        for dp in self._data_points.values():
+            if dp.read_topic and dp.in_topic:
+                topics.add(dp.read_topic)
+            if dp.write_topic:
+                topics.add(dp.write_topic)
+        for topic in topics:
+            await self._client.subscribe(topic)
+
+    async def stop(self):
+        await self._client.disconnect()
+
+    async def publish_value(self, dp: tuple[str, str]):
+        """
+        Publishes the current value unsolicited, like a device pushing updates.
+        """
+        simulated = self._data_points[dp]
+        if simulated.in_topic:
+            await self._client.publish(simulated.in_topic, simulated.response())
+
+    async def _on_message(self, topic: str, payload: str | bytes):
+        if isinstance(payload, (bytes, bytearray)):
+            payload = payload.decode('utf-8')
+        answered = False
+        for dp in self._reads.match(topic):
+            if payload == dp.read_template:
+                self.requests_answered += 1
+                answered = True
+                await self._client.publish(dp.in_topic, dp.response())
+        if answered:
+            return
+        for dp in self._writes.match(topic):
+            try:
+                value = json.loads(payload)
+            except ValueError:
+                value = payload
+            if isinstance(value, (int, float)) and dp.multiplicator != 1.0:
+                value = value * dp.multiplicator
+            dp.value = value
@@ -1,6 +1,6 @@
 import logging
-import threading
 from abc import ABC
+from collections.abc import Awaitable, Callable
 from typing import Any, Optional
 
 from pymodbus.client import AsyncModbusSerialClient, AsyncModbusTcpClient
@@ -12,14 +12,35 @@ from sgr_commhandler.driver.modbus.payload_decoder import (
     PayloadBuilder,
     PayloadDecoder,
 )
+from sgr_commhandler.metrics import (
+    TRANSPORT_BYTES,
+    TRANSPORT_QUEUE_WAIT_SECONDS,
+    TRANSPORT_RECONNECTS,
+    TRANSPORT_TRANSACTIONS,
+    default_registry,
+)
+from sgr_commhandler.utils.concurrency import LoopBoundSemaphore
 
 logger = logging.getLogger(__name__)
 
 
+def _payload_bytes(response: Any) -> int:
+    registers = getattr(response, 'registers', None)
+    if registers:
+        return 2 * len(registers)
+    bits = getattr(response, 'bits', None)
+    if bits:
+        return (len(bits) + 7) // 8
+    return 0
+
+
 class SGrModbusClient(ABC):
-    def __init__(self, endianness: BitOrder):
-        self._lock = threading.Lock()
+    def __init__(self, endianness: BitOrder, transport: str = ''):
+        # one request at a time per connection, without blocking the loop
+        self._lock = LoopBoundSemaphore(1)
         self._client: Optional[ModbusBaseClient] = None
+        # label of the transport metrics
+        self._transport = (transport,)
         self._byte_order: Endian = (
             Endian.BIG
             if endianness is None or endianness == BitOrder.BIG_ENDIAN
@@ -38,6 +59,37 @@ class SGrModbusClient(ABC):
 
     def is_connected(self) -> bool: ...
 
+    async def _transact(
+        self, request: Callable[[], Awaitable[Any]], tx_bytes: int = 0
+    ) -> Any:
+        """
+        Sends a request when the connection is free, and records the
+        transport metrics.
+        :param request: Sends the request and returns the response
+        :param tx_bytes: The payload size of the request
+        :returns: The response
+        """
+        queued = default_registry.clock()
+        async with self._lock:
+            if queued is None:
+                return await request()
+            default_registry.observe_since(
+                TRANSPORT_QUEUE_WAIT_SECONDS, self._transport, queued
+            )
+            default_registry.increment(TRANSPORT_TRANSACTIONS, self._transport)
+            default_registry.increment(
+                TRANSPORT_BYTES, (*self._transport, 'tx'), tx_bytes
+            )
+            response = await request()
+        default_registry.increment(
+            TRANSPORT_BYTES, (*self._transport, 'rx'), _payload_bytes(response)
+        )
+        return response
+
+    def _count_reconnect(self):
+        if self._client is not None and not self._client.connected:
+            default_registry.increment(TRANSPORT_RECONNECTS, self._transport)
+
     async def write_holding_registers(
         self, slave_id: int, address: int, data_type: ModbusDataType, value: Any
     ) -> None:
@@ -54,10 +106,14 @@ class SGrModbusClient(ABC):
             byteorder=self._byte_order, wordorder=self._word_order
         )
         builder.sgr_encode(value, data_type)
-        with self._lock:
-            await self._client.write_registers(
-                address=address, values=builder.to_registers(), unit=slave_id
-            )
+        client = self._client
+        registers = builder.to_registers()
+        await self._transact(
+            lambda: client.write_registers(
+                address=address, values=registers, unit=slave_id
+            ),
+            2 * len(registers),
+        )
 
     async def write_coils(
         self, slave_id: int, address: int, data_type: ModbusDataType, value: Any
@@ -75,10 +131,14 @@ class SGrModbusClient(ABC):
             byteorder=self._byte_order, wordorder=self._word_order
         )
         builder.sgr_encode(value, data_type)
-        with self._lock:
-            await self._client.write_coils(
-                address=address, values=builder.to_coils(), unit=slave_id
-            )
+        client = self._client
+        coils = builder.to_coils()
+        await self._transact(
+            lambda: client.write_coils(
+                address=address, values=coils, unit=slave_id
+            ),
+            (len(coils) + 7) // 8,
+        )
 
     async def read_input_registers(
         self, slave_id: int, address: int, size: int, data_type: ModbusDataType
@@ -93,10 +153,12 @@ class SGrModbusClient(ABC):
         """
         if self._client is None:
             raise Exception('Client not initialized')
-        with self._lock:
-            response = await self._client.read_input_registers(
+        client = self._client
+        response = await self._transact(
+            lambda: client.read_input_registers(
                 address, count=size, slave=slave_id
             )
+        )
         if response and not response.isError():
             decoder = PayloadDecoder.fromRegisters(
                 response.registers,
@@ -118,10 +180,12 @@ class SGrModbusClient(ABC):
         """
         if self._client is None:
             raise Exception('Client not initialized')
-        with self._lock:
-            response = await self._client.read_holding_registers(
+        client = self._client
+        response = await self._transact(
+            lambda: client.read_holding_registers(
                 address, count=size, slave=slave_id
             )
+        )
         if response and not response.isError():
             decoder = PayloadDecoder.fromRegisters(
                 response.registers,
@@ -143,10 +207,10 @@ class SGrModbusClient(ABC):
         """
         if self._client is None:
             raise Exception('Client not initialized')
-        with self._lock:
-            response = await self._client.read_coils(
-                address, count=size, slave=slave_id
-            )
+        client = self._client
+        response = await self._transact(
+            lambda: client.read_coils(address, count=size, slave=slave_id)
+        )
         if response and not response.isError():
             decoder = PayloadDecoder.fromCoils(
                 response.bits,
@@ -220,27 +284,29 @@ class SGrModbusTCPClient(SGrModbusClient):
         """
         self._ip = ip
         self._port = port
-        self._client = AsyncModbusTcpClient(
-            host=ip,
-            port=port,
-            timeout=1,
-            retries=0,
-            reconnect_delay=5000,
-            reconnect_delay_max=30000,
-        )
+        self._transport = (f'modbus-tcp:{ip}:{port}',)
 
     async def connect(self):
+        self._count_reconnect()
         if self._client is None:
-            raise Exception('Client not initialized')
+            # created on the event loop the client is used in
+            self._client = AsyncModbusTcpClient(
+                host=self._ip,
+                port=self._port,
+                timeout=1,
+                retries=0,
+                reconnect_delay=5000,
+                reconnect_delay_max=30000,
+            )
 
-        with self._lock:
+        async with self._lock:
             await self._client.connect()
             logger.debug('Connected to ModbusTCP on ip: ' + self._ip)
 
     async def disconnect(self):
         if self._client is None:
             return
-        with self._lock:
+        async with self._lock:
             self._client.close()
             logger.debug('Disconnected from ModbusTCP on ip: ' + self._ip)
 
@@ -260,17 +326,21 @@ class SGrModbusRTUClient(SGrModbusClient):
         :param baudrate: The serial baudrate (e.g. 19200)
         """
         self._serial_port = serial_port
-        self._client = AsyncModbusSerialClient(
-            method='rtu',
-            port=serial_port,
-            parity=parity,
-            baudrate=baudrate,
-        )  # changed source: https://stackoverflow.com/questions/58773476/why-do-i-get-pymodbus-modbusioexception-on-20-of-attempts
+        self._parity = parity
+        self._baudrate = baudrate
+        self._transport = (f'modbus-rtu:{serial_port}',)
 
     async def connect(self):
+        self._count_reconnect()
         if self._client is None:
-            raise Exception('Client not initialized')
-        with self._lock:
+            # created on the event loop the client is used in
+            self._client = AsyncModbusSerialClient(
+                method='rtu',
+                port=self._serial_port,
+                parity=self._parity,
+                baudrate=self._baudrate,
+            )  # changed source: https://stackoverflow.com/questions/58773476/why-do-i-get-pymodbus-modbusioexception-on-20-of-attempts
+        async with self._lock:
             _is_connected = await self._client.connect()
             logger.debug(
                 'Connected to ModbusRTU on serial port: ' + self._serial_port
@@ -278,8 +348,8 @@ class SGrModbusRTUClient(SGrModbusClient):
 
     async def disconnect(self):
         if self._client is None:
-            raise Exception('Client not initialized')
-        with self._lock:
+            return
+        async with self._lock:
             self._client.close(reconnect=False)
             logger.debug(
                 'Disconnected from ModbusRTU on serial port: '
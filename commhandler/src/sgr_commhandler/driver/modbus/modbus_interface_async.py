@@ -31,6 +31,17 @@ from sgr_commhandler.api import (
     FunctionalProfile,
     SGrBaseInterface,
 )
+from sgr_commhandler.api.data_point_api import intern_name
+from sgr_commhandler.api.interceptor import (
+    Invocation,
+    Operation,
+    has_interceptors,
+    intercept,
+)
+from sgr_commhandler.api.lazy import (
+    build_data_points,
+    build_functional_profiles,
+)
 from sgr_commhandler.driver.modbus.modbus_client_async import (
     SGrModbusRTUClient,
     SGrModbusTCPClient,
@@ -131,10 +142,15 @@ def build_modbus_data_point(
     interface: 'SGrModbusInterface',
 ) -> DataPoint:
     protocol = ModbusDataPoint(data_point, function_profile, interface)
+    dp = data_point.data_point
     validator = build_validator(
-        data_point.data_point.data_type if data_point.data_point else None
+        dp.data_type if dp else None,
+        dp.minimum_value if dp else None,
+        dp.maximum_value if dp else None,
+    )
+    return DataPoint(
+        protocol, validator, interface.value_cache, interface.interceptors
     )
-    return DataPoint(protocol, validator)
 
 
 def is_integer_type(data_type: DataTypeProduct | ModbusDataType) -> bool:
@@ -157,87 +173,89 @@ def is_float_type(data_type: DataTypeProduct | ModbusDataType) -> bool:
 
 
 class ModbusDataPoint(DataPointProtocol):
+    __slots__ = (
+        '_interface',
+        '_name',
+        '_direction',
+        '_address',
+        '_data_type',
+        '_size',
+        '_register_type',
+        '_multiplicator',
+        '_round_on_write',
+        '_round_on_read',
+    )
+
     def __init__(
         self,
         dp_spec: ModbusDataPointSpec,
         fp_spec: ModbusFunctionalProfileSpec,
         interface: 'SGrModbusInterface',
     ):
-        self._dp_spec = dp_spec
-        self._fp_spec = fp_spec
+        # everything needed is taken from the specification here, so that
+        # data points do not keep it alive
         self._interface = interface
+        dp = dp_spec.data_point
+        dp_config = dp_spec.modbus_data_point_configuration
 
-        self._dp_name: str = ''
-        if (
-            self._dp_spec.data_point
-            and self._dp_spec.data_point.data_point_name
-        ):
-            self._dp_name = self._dp_spec.data_point.data_point_name
+        dp_name = ''
+        if dp and dp.data_point_name:
+            dp_name = dp.data_point_name
 
         self._direction: DataDirectionProduct = DataDirectionProduct.C
-        if self._dp_spec.data_point and self._dp_spec.data_point.data_direction:
-            self._direction = self._dp_spec.data_point.data_direction
+        if dp and dp.data_direction:
+            self._direction = dp.data_direction
 
-        self._fp_name: str = ''
+        fp_name = ''
         if (
-            self._fp_spec.functional_profile
-            and self._fp_spec.functional_profile.functional_profile_name
+            fp_spec.functional_profile
+            and fp_spec.functional_profile.functional_profile_name
         ):
-            self._fp_name = (
-                self._fp_spec.functional_profile.functional_profile_name
-            )
+            fp_name = fp_spec.functional_profile.functional_profile_name
+        self._name = intern_name(fp_name, dp_name)
 
         self._address: int = -1
-        if (
-            self._dp_spec.modbus_data_point_configuration
-            and self._dp_spec.modbus_data_point_configuration.address
-        ):
-            self._address = (
-                self._dp_spec.modbus_data_point_configuration.address
-            )
+        if dp_config and dp_config.address:
+            self._address = dp_config.address
 
         self._data_type: Optional[ModbusDataType] = None
-        if (
-            self._dp_spec.modbus_data_point_configuration
-            and self._dp_spec.modbus_data_point_configuration.modbus_data_type
-        ):
-            self._data_type = (
-                self._dp_spec.modbus_data_point_configuration.modbus_data_type
-            )
+        if dp_config and dp_config.modbus_data_type:
+            self._data_type = dp_config.modbus_data_type
 
         self._size = -1
-        if (
-            self._dp_spec.modbus_data_point_configuration
-            and self._dp_spec.modbus_data_point_configuration.number_of_registers
-        ):
-            self._size = self._dp_spec.modbus_data_point_configuration.number_of_registers
+        if dp_config and dp_config.number_of_registers:
+            self._size = dp_config.number_of_registers
 
         self._register_type: RegisterType = None
+        if dp_config and dp_config.register_type:
+            self._register_type = dp_config.register_type
+
+        self._multiplicator: Optional[float] = None
         if (
-            self._dp_spec.modbus_data_point_configuration
-            and self._dp_spec.modbus_data_point_configuration.register_type
+            dp
+            and dp.unit_conversion_multiplicator
+            and dp.unit_conversion_multiplicator != 1.0
         ):
-            self._register_type = (
-                self._dp_spec.modbus_data_point_configuration.register_type
-            )
+            self._multiplicator = dp.unit_conversion_multiplicator
+
+        # round to int if modbus type is int and DP type is not, or the
+        # other way round
+        self._round_on_write = False
+        self._round_on_read = False
+        if dp and dp.data_type and self._data_type:
+            self._round_on_write = is_float_type(
+                dp.data_type
+            ) and not is_integer_type(self._data_type)
+            self._round_on_read = is_integer_type(
+                dp.data_type
+            ) and not is_float_type(self._data_type)
 
     async def set_val(self, value: Any):
         # convert to device units
-        if (
-            self._dp_spec.data_point.unit_conversion_multiplicator
-            and self._dp_spec.data_point.unit_conversion_multiplicator != 1.0
-        ):
-            value = (
-                float(value)
-                / self._dp_spec.data_point.unit_conversion_multiplicator
-            )
+        if self._multiplicator is not None:
+            value = float(value) / self._multiplicator
 
-        # round to int if modbus type is int and DP type is not
-        if is_float_type(
-            self._dp_spec.data_point.data_type
-        ) and not is_integer_type(
-            self._dp_spec.modbus_data_point_configuration.modbus_data_type
-        ):
+        if self._round_on_write:
             value = value_util.round_to_int(float(value))
 
         return await self._interface.write_data(
@@ -245,51 +263,58 @@ class ModbusDataPoint(DataPointProtocol):
         )
 
     async def get_val(self, skip_cache: bool = False) -> Any:
-        # TODO implement skip_cache
         ret_value = await self._interface.read_data(
             self._register_type, self._address, self._size, self._data_type
         )
 
         # convert to DP units
-        if (
-            self._dp_spec.data_point.unit_conversion_multiplicator
-            and self._dp_spec.data_point.unit_conversion_multiplicator != 1.0
-        ):
-            ret_value = (
-                float(ret_value)
-                * self._dp_spec.data_point.unit_conversion_multiplicator
-            )
+        if self._multiplicator is not None:
+            ret_value = float(ret_value) * self._multiplicator
 
-        # round to int if DP type is int and modbus type is not
-        if is_integer_type(
-            self._dp_spec.data_point.data_type
-        ) and not is_float_type(
-            self._dp_spec.modbus_data_point_configuration.modbus_data_type
-        ):
+        if self._round_on_read:
             ret_value = value_util.round_to_int(float(ret_value))
 
         return ret_value
 
     def name(self) -> tuple[str, str]:
-        return self._fp_name, self._dp_name
+        return self._name
 
     def direction(self) -> DataDirectionProduct:
         return self._direction
 
+    def decoded_type(self) -> Optional[type]:
+        if self._round_on_read:
+            return int
+        if self._multiplicator is not None:
+            return float
+        if self._data_type is None:
+            return None
+        if is_integer_type(self._data_type):
+            return int
+        if is_float_type(self._data_type):
+            return float
+        if self._data_type.boolean:
+            return bool
+        return None
+
 
 class ModbusFunctionalProfile(FunctionalProfile):
     def __init__(
         self,
         fp_spec: ModbusFunctionalProfileSpec,
         interface: 'SGrModbusInterface',
+        lazy: bool = False,
     ):
         self._fp_spec = fp_spec
         self._interface = interface
-        dps = [
-            build_modbus_data_point(dp, self._fp_spec, self._interface)
-            for dp in self._fp_spec.data_point_list.data_point_list_element
-        ]
-        self._data_points = {dp.name(): dp for dp in dps}
+        self._data_points = build_data_points(
+            self.name(),
+            self._fp_spec.data_point_list.data_point_list_element,
+            lambda dp: build_modbus_data_point(
+                dp, self._fp_spec, self._interface
+            ),
+            lazy,
+        )
 
     def name(self) -> str:
         return self._fp_spec.functional_profile.functional_profile_name
@@ -304,6 +329,7 @@ class SGrModbusInterface(SGrBaseInterface):
         frame: DeviceFrame,
         configuration: configparser.ConfigParser,
         sharedRTU: bool = False,
+        lazy: bool = False,
     ):
         self._inititalize_device(frame, configuration)
         if (
@@ -345,11 +371,11 @@ class SGrModbusInterface(SGrBaseInterface):
         )
 
         # build functional profiles
-        fps = [
-            ModbusFunctionalProfile(fp, self)
-            for fp in self.frame.interface_list.modbus_interface.functional_profile_list.functional_profile_list_element
-        ]
-        self.function_profiles = {fp.name(): fp for fp in fps}
+        self.function_profiles = build_functional_profiles(
+            self.frame.interface_list.modbus_interface.functional_profile_list.functional_profile_list_element,
+            lambda fp: ModbusFunctionalProfile(fp, self, lazy),
+            lazy,
+        )
 
         # unique string used in combination with shared Modbus client
         self._device_id = ''.join(random.choices(string.ascii_letters, k=8))
@@ -400,6 +426,11 @@ class SGrModbusInterface(SGrBaseInterface):
     def is_connected(self) -> bool:
         return self._client_wrapper.is_connected(self._device_id)
 
+    def transport_key(self) -> str:
+        if hasattr(self, 'serial_port'):
+            return f'modbus-rtu:{self.serial_port}'
+        return f'modbus-tcp:{self.ip_address}:{self.ip_port}'
+
     async def connect_async(self):
         await self._client_wrapper.connect(self._device_id)
 
@@ -416,6 +447,32 @@ class SGrModbusInterface(SGrBaseInterface):
         """
         Reads data from the given Modbus address(es).
         """
+        if not has_interceptors(self.interceptors):
+            return await self._read_data(reg_type, address, size, data_type)
+        return await intercept(
+            self.interceptors,
+            Invocation(
+                Operation.REQUEST,
+                transport=self.transport_key(),
+                attributes=dict(
+                    slave_id=self.slave_id,
+                    register_type=reg_type.value,
+                    address=address,
+                    size=size,
+                ),
+            ),
+            lambda invocation: self._read_data(
+                reg_type, address, size, data_type
+            ),
+        )
+
+    async def _read_data(
+        self,
+        reg_type: RegisterType,
+        address: int,
+        size: int,
+        data_type: ModbusDataType,
+    ) -> Any:
         slave_id = self.slave_id
         if reg_type == RegisterType.INPUT_REGISTER:
             return await self._client_wrapper.client.read_input_registers(
@@ -446,6 +503,32 @@ class SGrModbusInterface(SGrBaseInterface):
         """
         Writes data to the given Modbus address(es).
         """
+        if not has_interceptors(self.interceptors):
+            return await self._write_data(reg_type, address, data_type, value)
+        return await intercept(
+            self.interceptors,
+            Invocation(
+                Operation.REQUEST,
+                value=value,
+                transport=self.transport_key(),
+                attributes=dict(
+                    slave_id=self.slave_id,
+                    register_type=reg_type.value,
+                    address=address,
+                ),
+            ),
+            lambda invocation: self._write_data(
+                reg_type, address, data_type, invocation.value
+            ),
+        )
+
+    async def _write_data(
+        self,
+        reg_type: RegisterType,
+        address: int,
+        data_type: ModbusDataType,
+        value: Any,
+    ) -> None:
         slave_id = self.slave_id
         if reg_type == RegisterType.HOLD_REGISTER:
             await self._client_wrapper.client.write_holding_registers(
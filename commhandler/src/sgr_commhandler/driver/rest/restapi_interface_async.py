@@ -1,16 +1,16 @@
+import asyncio
 import configparser
 import json
 import logging
 import ssl
 from io import UnsupportedOperation
 from typing import Any, Callable, Optional
-from urllib.parse import urlencode
+from urllib.parse import urlencode, urlsplit
 
 import aiohttp
 import certifi
 import jmespath
 from aiohttp import ClientConnectionError, ClientResponseError
-from cachetools import TTLCache
 from sgr_specification.v0.generic import DataDirectionProduct
 from sgr_specification.v0.generic.base_types import ResponseQueryType
 from sgr_specification.v0.product import (
@@ -35,12 +35,37 @@ from sgr_commhandler.api import (
     DataPointProtocol,
     FunctionalProfile,
     SGrBaseInterface,
+    ValueCache,
+)
+from sgr_commhandler.api.data_point_api import intern_name
+from sgr_commhandler.api.interceptor import (
+    Invocation,
+    Operation,
+    has_interceptors,
+    intercept,
+)
+from sgr_commhandler.api.lazy import (
+    build_data_points,
+    build_functional_profiles,
 )
 from sgr_commhandler.driver.rest.authentication import setup_authentication
+from sgr_commhandler.metrics import (
+    TRANSPORT_BYTES,
+    TRANSPORT_QUEUE_WAIT_SECONDS,
+    TRANSPORT_RECONNECTS,
+    TRANSPORT_TRANSACTIONS,
+    default_registry,
+)
+from sgr_commhandler.utils.concurrency import LoopBoundSemaphore
 from sgr_commhandler.validators import build_validator
 
 logger = logging.getLogger(__name__)
 
+# embedded web servers often handle only a few connections at a time
+DEFAULT_MAX_CONCURRENT_REQUESTS = 4
+# how long read values are served from the value cache, in seconds
+DEFAULT_CACHE_TTL = 5.0
+
 
 def build_rest_data_point(
     data_point: RestApiDataPointSpec,
@@ -49,10 +74,15 @@ def build_rest_data_point(
 ) -> DataPoint:
     protocol = RestDataPoint(data_point, function_profile, interface)
     data_type = None
-    if data_point.data_point and data_point.data_point.data_type:
+    minimum = maximum = None
+    if data_point.data_point:
         data_type = data_point.data_point.data_type
-    validator = build_validator(data_type)
-    return DataPoint(protocol, validator)
+        minimum = data_point.data_point.minimum_value
+        maximum = data_point.data_point.maximum_value
+    validator = build_validator(data_type, minimum, maximum)
+    return DataPoint(
+        protocol, validator, interface.value_cache, interface.interceptors
+    )
 
 
 class RestResponse:
@@ -80,16 +110,22 @@ class RestRequest:
 
 
 class RestDataPoint(DataPointProtocol):
+    __slots__ = (
+        '_interface',
+        '_name',
+        '_direction',
+        '_multiplicator',
+        '_read_call',
+        '_write_call',
+    )
+
     def __init__(
         self,
         dp_spec: RestApiDataPointSpec,
         fp_spec: RestApiFunctionalProfileSpec,
         interface: 'SGrRestInterface',
     ):
-        self._dp_spec = dp_spec
-        self._fp_spec = fp_spec
-
-        dp_config = self._dp_spec.rest_api_data_point_configuration
+        dp_config = dp_spec.rest_api_data_point_configuration
         if not dp_config:
             raise Exception('REST service call configuration missing')
 
@@ -203,24 +239,37 @@ class RestDataPoint(DataPointProtocol):
         if not self._read_call and not self._write_call:
             raise Exception('No REST service call configured')
 
-        self._fp_name = ''
+        fp_name = ''
         if (
             fp_spec.functional_profile is not None
             and fp_spec.functional_profile.functional_profile_name is not None
         ):
-            self._fp_name = fp_spec.functional_profile.functional_profile_name
+            fp_name = fp_spec.functional_profile.functional_profile_name
 
-        self._dp_name = ''
+        dp_name = ''
         if (
             dp_spec.data_point is not None
             and dp_spec.data_point.data_point_name is not None
         ):
-            self._dp_name = dp_spec.data_point.data_point_name
+            dp_name = dp_spec.data_point.data_point_name
+        self._name = intern_name(fp_name, dp_name)
+
+        self._direction: Optional[DataDirectionProduct] = None
+        self._multiplicator: Optional[float] = None
+        if dp_spec.data_point is not None:
+            self._direction = dp_spec.data_point.data_direction
+            if (
+                dp_spec.data_point.unit_conversion_multiplicator
+                and dp_spec.data_point.unit_conversion_multiplicator != 1.0
+            ):
+                self._multiplicator = (
+                    dp_spec.data_point.unit_conversion_multiplicator
+                )
 
         self._interface = interface
 
     def name(self) -> tuple[str, str]:
-        return self._fp_name, self._dp_name
+        return self._name
 
     async def get_val(self, skip_cache: bool = False):
         if not self._read_call:
@@ -248,15 +297,8 @@ class RestDataPoint(DataPointProtocol):
         ret_value = response.body
 
         # convert to DP units
-        if (
-            self._dp_spec.data_point
-            and self._dp_spec.data_point.unit_conversion_multiplicator
-            and self._dp_spec.data_point.unit_conversion_multiplicator != 1.0
-        ):
-            ret_value = (
-                float(ret_value)
-                * self._dp_spec.data_point.unit_conversion_multiplicator
-            )
+        if self._multiplicator is not None:
+            ret_value = float(ret_value) * self._multiplicator
 
         return ret_value
 
@@ -265,15 +307,8 @@ class RestDataPoint(DataPointProtocol):
             raise Exception('No write call')
 
         # convert to device units
-        if (
-            self._dp_spec.data_point is None
-            or self._dp_spec.data_point.unit_conversion_multiplicator
-            and self._dp_spec.data_point.unit_conversion_multiplicator != 1.0
-        ):
-            value = (
-                float(value)
-                / self._dp_spec.data_point.unit_conversion_multiplicator
-            )
+        if self._multiplicator is not None:
+            value = float(value) / self._multiplicator
 
         # TODO auch hier scheint alles no ein bisschen fehlerhaft
         # replace {{value}} placeholder
@@ -293,12 +328,9 @@ class RestDataPoint(DataPointProtocol):
         await self._interface.execute_request(request, skip_cache=True)
 
     def direction(self) -> DataDirectionProduct:
-        if (
-            self._dp_spec.data_point is None
-            or self._dp_spec.data_point.data_direction is None
-        ):
+        if self._direction is None:
             raise Exception('missing data direction')
-        return self._dp_spec.data_point.data_direction
+        return self._direction
 
     def subscribe(self, fn: Callable[[Any], None]):
         raise UnsupportedOperation(
@@ -316,6 +348,7 @@ class RestFunctionalProfile(FunctionalProfile):
         self,
         fp_spec: RestApiFunctionalProfileSpec,
         interface: 'SGrRestInterface',
+        lazy: bool = False,
     ):
         self._fp_spec = fp_spec
         self._interface = interface
@@ -327,12 +360,12 @@ class RestFunctionalProfile(FunctionalProfile):
         ):
             raw_dps = self._fp_spec.data_point_list.data_point_list_element
 
-        dps = [
-            build_rest_data_point(dp, self._fp_spec, self._interface)
-            for dp in raw_dps
-        ]
-
-        self._data_points = {dp.name(): dp for dp in dps}
+        self._data_points = build_data_points(
+            self.name(),
+            raw_dps,
+            lambda dp: build_rest_data_point(dp, self._fp_spec, self._interface),
+            lazy,
+        )
 
     def name(self) -> str:
         if (
@@ -352,13 +385,23 @@ class SGrRestInterface(SGrBaseInterface):
     """
 
     def __init__(
-        self, frame: DeviceFrame, configuration: configparser.ConfigParser
+        self,
+        frame: DeviceFrame,
+        configuration: configparser.ConfigParser,
+        lazy: bool = False,
+        max_concurrent_requests: Optional[
+            int
+        ] = DEFAULT_MAX_CONCURRENT_REQUESTS,
+        cache_ttl: float = DEFAULT_CACHE_TTL,
     ):
-        self._inititalize_device(frame, configuration)
+        self._inititalize_device(
+            frame, configuration, ValueCache(default_ttl=cache_ttl)
+        )
         self._session = None
         self._ssl_context = ssl.create_default_context(cafile=certifi.where())
-        self._connector = aiohttp.TCPConnector(ssl=self._ssl_context)
-        self._cache = TTLCache(maxsize=100, ttl=5)
+        self._request_slots = LoopBoundSemaphore(max_concurrent_requests)
+        # identical reads in flight share one request
+        self._in_flight: dict[tuple, asyncio.Future] = {}
 
         if (
             self.frame.interface_list
@@ -381,12 +424,18 @@ class SGrRestInterface(SGrBaseInterface):
             and self._raw_interface.functional_profile_list.functional_profile_list_element
         ):
             raw_fps = self._raw_interface.functional_profile_list.functional_profile_list_element
-        fps = [RestFunctionalProfile(profile, self) for profile in raw_fps]
-        self.function_profiles = {fp.name(): fp for fp in fps}
+        self.function_profiles = build_functional_profiles(
+            raw_fps,
+            lambda profile: RestFunctionalProfile(profile, self, lazy),
+            lazy,
+        )
 
     def is_connected(self):
         return self._session is not None and not self._session.closed
 
+    def transport_key(self) -> str:
+        return f'rest:{urlsplit(self.base_url).netloc}'
+
     async def disconnect_async(self):
         if self._session is not None and not self._session.closed:
             await self._session.close()
@@ -394,7 +443,14 @@ class SGrRestInterface(SGrBaseInterface):
 
     async def connect_async(self):
         if self._session is None or self._session.closed:
-            self._session = aiohttp.ClientSession(connector=self._connector)
+            if self._session is not None:
+                default_registry.increment(
+                    TRANSPORT_RECONNECTS, (self.transport_key(),)
+                )
+            # the session and its connector are bound to the running loop,
+            # and the connector is closed with the session
+            connector = aiohttp.TCPConnector(ssl=self._ssl_context)
+            self._session = aiohttp.ClientSession(connector=connector)
             await self.authenticate()
 
     async def authenticate(self):
@@ -433,31 +489,46 @@ class SGrRestInterface(SGrBaseInterface):
                     'application/x-www-form-urlencoded'
                 )
 
-            cache_key = (frozenset(request_headers), request.url)
-            if not skip_cache and cache_key in self._cache:
-                return self._cache[cache_key]
+            if skip_cache:
+                return await self._send(
+                    request, request_headers, query_parameters, request_body
+                )
 
-            async with self._session.request(
-                request.method.value,
+            flight_key = (
+                request.method,
                 request.url,
-                headers=request_headers,
-                params=query_parameters,
-                data=request_body,
-            ) as req:
-                req.raise_for_status()  # Raises an HTTPError if the HTTP request returned an unsuccessful status code
-                logger.info(f'execute_request status: {req.status}')
-                res_body = await req.text()
-
-                sgr_headers = []
-                for name, value in req.headers.items():
-                    sgr_headers.append(
-                        HeaderEntry(header_name=name, value=value)
-                    )
-                header_list = HeaderList(header=sgr_headers)
-                response = RestResponse(headers=header_list, body=res_body)
-                if not skip_cache:
-                    self._cache[cache_key] = response
+                frozenset(request_headers.items()),
+                frozenset(query_parameters.items()),
+                request_body,
+            )
+            pending = self._in_flight.get(flight_key)
+            while pending is not None:
+                try:
+                    return await asyncio.shield(pending)
+                except asyncio.CancelledError:
+                    if not pending.cancelled():
+                        raise
+                # the caller which sent the request was cancelled, the
+                # first remaining caller sends it again
+                pending = self._in_flight.get(flight_key)
+            pending = asyncio.get_running_loop().create_future()
+            self._in_flight[flight_key] = pending
+            try:
+                response = await self._send(
+                    request, request_headers, query_parameters, request_body
+                )
+                pending.set_result(response)
                 return response
+            except asyncio.CancelledError:
+                pending.cancel()
+                raise
+            except Exception as e:
+                pending.set_exception(e)
+                # retrieved, even if nobody else waits
+                pending.exception()
+                raise
+            finally:
+                self._in_flight.pop(flight_key, None)
 
         except ClientResponseError as e:
             logger.error(f'HTTP error occurred: {e}')
@@ -471,3 +542,80 @@ class SGrRestInterface(SGrBaseInterface):
         except Exception as e:
             logger.error(f'An unexpected error occurred: {e}')
             raise e
+
+    async def _send(
+        self,
+        request: RestRequest,
+        headers: dict[str, str],
+        query_parameters: dict[str, str],
+        body: Optional[str],
+    ) -> RestResponse:
+        if not has_interceptors(self.interceptors):
+            return await self._send_request(
+                request, headers, query_parameters, body
+            )
+        return await intercept(
+            self.interceptors,
+            Invocation(
+                Operation.REQUEST,
+                value=body,
+                transport=self.transport_key(),
+                # the query identifies the request in recordings
+                attributes=dict(
+                    method=request.method.value,
+                    url=request.url,
+                    query=urlencode(sorted(query_parameters.items())),
+                ),
+            ),
+            lambda invocation: self._send_request(
+                request, headers, query_parameters, invocation.value
+            ),
+        )
+
+    async def _send_request(
+        self,
+        request: RestRequest,
+        headers: dict[str, str],
+        query_parameters: dict[str, str],
+        body: Optional[str],
+    ) -> RestResponse:
+        if self._session is None:
+            raise Exception('no connection to device established')
+        queued = default_registry.clock()
+        async with self._request_slots:
+            if queued is not None:
+                transport = (self.transport_key(),)
+                default_registry.observe_since(
+                    TRANSPORT_QUEUE_WAIT_SECONDS, transport, queued
+                )
+                default_registry.increment(TRANSPORT_TRANSACTIONS, transport)
+                if body:
+                    default_registry.increment(
+                        TRANSPORT_BYTES,
+                        (*transport, 'tx'),
+                        len(body.encode('utf-8')),
+                    )
+            async with self._session.request(
+                request.method.value,
+                request.url,
+                headers=headers,
+                params=query_parameters,
+                data=body,
+            ) as req:
+                req.raise_for_status()  # Raises an HTTPError if the HTTP request returned an unsuccessful status code
+                logger.debug(f'execute_request status: {req.status}')
+                res_body = await req.text()
+                if queued is not None:
+                    # the body read by text() is kept by the response
+                    received = len(await req.read())
+                    default_registry.increment(
+                        TRANSPORT_BYTES, (*transport, 'rx'), received
+                    )
+
+                sgr_headers = []
+                for name, value in req.headers.items():
+                    sgr_headers.append(
+                        HeaderEntry(header_name=name, value=value)
+                    )
+                header_list = HeaderList(header=sgr_headers)
+                return RestResponse(headers=header_list, body=res_body)
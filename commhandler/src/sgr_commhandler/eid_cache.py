@@ -0,0 +1,138 @@
+import configparser
+import contextlib
+import hashlib
+import logging
+import os
+import pickle
+import tempfile
+import threading
+from dataclasses import dataclass, replace
+from importlib import metadata
+from typing import Optional
+
+from cachetools import LRUCache
+from sgr_specification.v0.product import DeviceFrame
+
+logger = logging.getLogger(__name__)
+
+# increase when the cached representation changes
+CACHE_FORMAT_VERSION = 1
+
+
+def _specification_version() -> str:
+    try:
+        return metadata.version('SGrSpecificationPythontks4r')
+    except metadata.PackageNotFoundError:
+        return ''
+
+
+@dataclass
+class EidCacheStatistics:
+    hits: int = 0
+    disk_hits: int = 0
+    misses: int = 0
+
+
+class EidCache:
+    """
+    Cache of parsed EIDs, keyed by a hash of the EID content and the
+    properties substituted into it.
+
+    Parsed frames are kept in memory with LRU eviction, and optionally
+    pickled to a directory, so that a restart with unchanged EIDs does not
+    parse XML at all. Cached frames are shared between devices and must be
+    treated as read-only. Only use a cache directory that is not writable by
+    untrusted users, since entries are unpickled.
+    """
+
+    def __init__(self, maxsize: int = 32, cache_dir: Optional[str] = None):
+        self._lock = threading.Lock()
+        self._memory: LRUCache = LRUCache(maxsize=maxsize)
+        self._cache_dir = cache_dir
+        self._stats = EidCacheStatistics()
+        self._salt = f'{CACHE_FORMAT_VERSION}:{_specification_version()}'
+        if cache_dir is not None:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    def key(
+        self, eid_content: str, configuration: configparser.ConfigParser
+    ) -> str:
+        """
+        Computes the cache key of an EID with its properties.
+        :param eid_content: The unsubstituted EID XML
+        :param configuration: The properties substituted into the EID
+        :returns: The hex digest used as key
+        """
+        digest = hashlib.sha256(self._salt.encode('utf-8'))
+        digest.update(eid_content.encode('utf-8'))
+        for section_name, section in sorted(configuration.items()):
+            for name, value in sorted(section.items()):
+                digest.update(f'\0{section_name}\0{name}\0{value}'.encode('utf-8'))
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[DeviceFrame]:
+        with self._lock:
+            frame = self._memory.get(key)
+            if frame is not None:
+                self._stats.hits += 1
+                return frame
+        frame = self._load(key)
+        with self._lock:
+            if frame is None:
+                self._stats.misses += 1
+            else:
+                self._stats.disk_hits += 1
+                self._memory[key] = frame
+        return frame
+
+    def put(self, key: str, frame: DeviceFrame):
+        with self._lock:
+            self._memory[key] = frame
+        self._store(key, frame)
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+        if self._cache_dir is not None:
+            for file_name in os.listdir(self._cache_dir):
+                if file_name.endswith('.pickle'):
+                    os.remove(os.path.join(self._cache_dir, file_name))
+
+    def statistics(self) -> EidCacheStatistics:
+        with self._lock:
+            return replace(self._stats)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self._cache_dir or '', f'{key}.pickle')
+
+    def _load(self, key: str) -> Optional[DeviceFrame]:
+        if self._cache_dir is None:
+            return None
+        try:
+            with open(self._path(key), 'rb') as file:
+                frame = pickle.load(file)
+            return frame if isinstance(frame, DeviceFrame) else None
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f'discarding unreadable EID cache entry {key}: {e}')
+            return None
+
+    def _store(self, key: str, frame: DeviceFrame):
+        if self._cache_dir is None:
+            return
+        tmp_path = None
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=self._cache_dir)
+            with os.fdopen(fd, 'wb') as file:
+                pickle.dump(frame, file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self._path(key))
+        except Exception as e:
+            logger.warning(f'could not write EID cache entry {key}: {e}')
+            if tmp_path is not None:
+                with contextlib.suppress(OSError):
+                    os.unlink(tmp_path)
+
+
+# used by DeviceBuilder unless configured otherwise
+default_eid_cache = EidCache()
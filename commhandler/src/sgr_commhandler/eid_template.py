@@ -0,0 +1,216 @@
+import configparser
+import copy
+import dataclasses
+import logging
+import re
+import types
+import typing
+from collections.abc import Iterable, Mapping
+from functools import lru_cache
+from typing import Any, Union
+
+from sgr_specification.v0.product import DeviceFrame
+from xsdata.formats.converter import converter
+
+logger = logging.getLogger(__name__)
+
+_PLACEHOLDER = re.compile(r'{{([^{}]+)}}')
+
+# placeholders substituted by the drivers at runtime, not by properties
+RUNTIME_PLACEHOLDERS = frozenset({'value'})
+
+Path = tuple[Union[str, int], ...]
+
+
+class PropertyTemplate:
+    """
+    Text split into literals and placeholders, which is rendered in a single
+    pass. Placeholder names are case-insensitive, like property names.
+    """
+
+    __slots__ = ('_literals', '_names')
+
+    def __init__(self, text: str):
+        parts = _PLACEHOLDER.split(text)
+        self._literals: list[str] = parts[0::2]
+        self._names: list[str] = parts[1::2]
+
+    def placeholders(self) -> set[str]:
+        return set(self._names)
+
+    def render(self, properties: Mapping[str, str]) -> tuple[str, set[str]]:
+        """
+        Substitutes the properties into the text.
+        :param properties: The property values by lowercase name
+        :returns: The text, and the placeholders without property value
+        """
+        if not self._names:
+            return self._literals[0], set()
+        missing: set[str] = set()
+        parts = [self._literals[0]]
+        for name, literal in zip(self._names, self._literals[1:]):
+            value = properties.get(name.lower())
+            if value is None:
+                missing.add(name)
+                value = '{{' + name + '}}'
+            parts.append(value)
+            parts.append(literal)
+        return ''.join(parts), missing
+
+
+@lru_cache(maxsize=32)
+def property_template(text: str) -> PropertyTemplate:
+    """
+    Returns the tokenised template of a text, cached per text.
+    """
+    return PropertyTemplate(text)
+
+
+def property_values(configuration: configparser.ConfigParser) -> dict[str, str]:
+    """
+    Flattens the sections of a configuration, the first section defining a
+    property wins.
+    """
+    properties: dict[str, str] = {}
+    for section in configuration.values():
+        for name, value in section.items():
+            properties.setdefault(name.lower(), value)
+    return properties
+
+
+def report_properties(
+    placeholders: Iterable[str],
+    missing: Iterable[str],
+    properties: Mapping[str, str],
+):
+    """
+    Logs placeholders without property value, and properties without
+    placeholder.
+    """
+    missing = sorted(set(missing) - RUNTIME_PLACEHOLDERS)
+    if missing:
+        logger.warning(f'no value for EID properties: {", ".join(missing)}')
+    used = {name.lower() for name in placeholders}
+    unknown = sorted(name for name in properties if name not in used)
+    if unknown:
+        logger.warning(f'unknown EID properties: {", ".join(unknown)}')
+
+
+@lru_cache(maxsize=None)
+def _type_hints(cls: type) -> dict[str, Any]:
+    return typing.get_type_hints(cls)
+
+
+def _value_types(hint: Any) -> tuple[type, ...]:
+    """
+    Unwraps Optional[...] and List[...] to the types a value is converted to.
+    """
+    origin = typing.get_origin(hint)
+    if origin in (Union, types.UnionType, list):
+        result: tuple[type, ...] = ()
+        for arg in typing.get_args(hint):
+            if arg is not type(None):
+                result += _value_types(arg)
+        return result
+    return (hint,) if isinstance(hint, type) else ()
+
+
+class _TemplateField:
+    __slots__ = ('path', 'template', 'types')
+
+    def __init__(self, path: Path, text: str, value_types: tuple[type, ...]):
+        self.path = path
+        self.template = PropertyTemplate(text)
+        self.types = value_types
+
+
+class EidTemplate:
+    """
+    A parsed EID whose property placeholders are not substituted yet.
+
+    Instances are created by copying only the objects on the way to fields
+    containing placeholders. Everything else, e.g. functional profile and data
+    point specifications, is shared with the template and must be treated as
+    read-only.
+    """
+
+    def __init__(self, frame: DeviceFrame):
+        self.frame = frame
+        self._fields: list[_TemplateField] = []
+        self._collect(frame, ())
+        self._placeholders = {
+            name for field in self._fields for name in field.template.placeholders()
+        }
+
+    def placeholders(self) -> set[str]:
+        """
+        Returns the names of all placeholders in the template.
+        """
+        return set(self._placeholders)
+
+    def instantiate(self, configuration: configparser.ConfigParser) -> DeviceFrame:
+        """
+        Creates a frame with the properties substituted.
+        :param configuration: The properties of the device
+        :returns: The device frame, sharing unchanged parts with the template
+        """
+        properties = property_values(configuration)
+        root = copy.copy(self.frame)
+        copied = {id(root)}
+        all_missing: set[str] = set()
+        for field in self._fields:
+            text, missing = field.template.render(properties)
+            all_missing |= missing
+            if missing == field.template.placeholders():
+                continue
+            self._assign(root, field.path, self._convert(text, field.types), copied)
+        report_properties(self._placeholders, all_missing, properties)
+        return root
+
+    def _collect(self, obj: Any, path: Path):
+        if dataclasses.is_dataclass(obj):
+            hints = _type_hints(type(obj))
+            for field in dataclasses.fields(obj):
+                value = getattr(obj, field.name)
+                self._collect_value(
+                    value, path + (field.name,), hints.get(field.name)
+                )
+        elif isinstance(obj, list):
+            for i, value in enumerate(obj):
+                self._collect_value(value, path + (i,), None)
+
+    def _collect_value(self, value: Any, path: Path, hint: Any):
+        if isinstance(value, str):
+            if '{{' in value and _PLACEHOLDER.search(value):
+                value_types = _value_types(hint) if hint is not None else (str,)
+                self._fields.append(_TemplateField(path, value, value_types))
+        elif isinstance(value, list) and hint is not None:
+            for i, item in enumerate(value):
+                self._collect_value(item, path + (i,), hint)
+        elif dataclasses.is_dataclass(value) or isinstance(value, list):
+            self._collect(value, path)
+
+    @staticmethod
+    def _convert(text: str, value_types: tuple[type, ...]) -> Any:
+        if not value_types or str in value_types:
+            return text
+        return converter.deserialize(text, list(value_types))
+
+    @staticmethod
+    def _assign(root: Any, path: Path, value: Any, copied: set[int]):
+        node = root
+        for step in path[:-1]:
+            child = node[step] if isinstance(step, int) else getattr(node, step)
+            if id(child) not in copied:
+                child = list(child) if isinstance(child, list) else copy.copy(child)
+                copied.add(id(child))
+                if isinstance(step, int):
+                    node[step] = child
+                else:
+                    setattr(node, step, child)
+            node = child
+        step = path[-1]
+        if isinstance(step, int):
+            node[step] = value
+        else:
+            setattr(node, step, value)
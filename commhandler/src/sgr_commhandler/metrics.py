@@ -0,0 +1,335 @@
+import asyncio
+import logging
+import math
+import threading
+import time
+from bisect import bisect_left
+from collections.abc import Sequence
+from dataclasses import dataclass
+from enum import Enum
+from typing import Any, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+# upper bounds of the latency buckets, in seconds
+DEFAULT_BUCKETS: tuple[float, ...] = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+# per data point series are labelled by profile and data point name, not by
+# device, which keeps the number of series bounded in large fleets
+DATA_POINT_READ_SECONDS = 'sgr_data_point_read_seconds'
+DATA_POINT_WRITE_SECONDS = 'sgr_data_point_write_seconds'
+DATA_POINT_ERRORS = 'sgr_data_point_errors_total'
+DATA_POINT_TIMEOUTS = 'sgr_data_point_timeouts_total'
+DATA_POINT_CACHE_HITS = 'sgr_data_point_cache_hits_total'
+TRANSPORT_TRANSACTIONS = 'sgr_transport_transactions_total'
+TRANSPORT_BYTES = 'sgr_transport_bytes_total'
+TRANSPORT_QUEUE_WAIT_SECONDS = 'sgr_transport_queue_wait_seconds'
+TRANSPORT_RECONNECTS = 'sgr_transport_reconnects_total'
+
+
+class MetricType(Enum):
+    COUNTER = 'counter'
+    HISTOGRAM = 'histogram'
+
+
+@dataclass(frozen=True)
+class MetricDefinition:
+    name: str
+    type: MetricType
+    help: str
+    labels: tuple[str, ...]
+
+
+class Histogram:
+    __slots__ = ('buckets', 'counts', 'sum', 'count')
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = buckets
+        # the last count is the +Inf bucket
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> list[tuple[float, int]]:
+        """
+        Returns the cumulative count per upper bound, ending with +Inf.
+        """
+        result = []
+        total = 0
+        for bound, count in zip((*self.buckets, math.inf), self.counts):
+            total += count
+            result.append((bound, total))
+        return result
+
+
+Series = dict[tuple[str, ...], Union[float, Histogram]]
+
+
+class MetricsRegistry:
+    """
+    Counters and histograms, keyed by metric name and label values.
+
+    Recording does nothing while the registry is disabled, so instrumented
+    code only pays for a check of the enabled flag. Values can be taken as a
+    dict snapshot or rendered in the Prometheus text format.
+    """
+
+    def __init__(
+        self, enabled: bool = False, buckets: Sequence[float] = DEFAULT_BUCKETS
+    ):
+        self.enabled = enabled
+        self._buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._definitions: dict[str, MetricDefinition] = {}
+        self._series: dict[str, Series] = {}
+        for definition in _BUILTIN_METRICS:
+            self.register(definition)
+
+    def register(self, definition: MetricDefinition):
+        with self._lock:
+            self._definitions[definition.name] = definition
+            self._series.setdefault(definition.name, {})
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def clear(self):
+        with self._lock:
+            for series in self._series.values():
+                series.clear()
+
+    def clock(self) -> Optional[float]:
+        """
+        Returns the start time of a measurement, None while disabled.
+        """
+        return time.perf_counter() if self.enabled else None
+
+    def increment(
+        self, name: str, labels: tuple[str, ...], amount: float = 1
+    ):
+        if not self.enabled:
+            return
+        with self._lock:
+            series = self._series[name]
+            series[labels] = series.get(labels, 0) + amount
+
+    def observe(self, name: str, labels: tuple[str, ...], value: float):
+        if not self.enabled:
+            return
+        with self._lock:
+            series = self._series[name]
+            histogram = series.get(labels)
+            if histogram is None:
+                histogram = series[labels] = Histogram(self._buckets)
+            histogram.observe(value)
+
+    def observe_since(
+        self, name: str, labels: tuple[str, ...], start: Optional[float]
+    ):
+        """
+        Observes the time passed since a start time from clock().
+        """
+        if start is not None:
+            self.observe(name, labels, time.perf_counter() - start)
+
+    def snapshot(self) -> dict[str, list[dict[str, Any]]]:
+        """
+        Returns the current values.
+        :returns: Per metric name a list of series, with the labels and the
+            value of counters, or the cumulative buckets, sum and count of
+            histograms
+        """
+        result: dict[str, list[dict[str, Any]]] = {}
+        with self._lock:
+            for name, series in self._series.items():
+                label_names = self._definitions[name].labels
+                entries = []
+                for label_values, value in series.items():
+                    entry: dict[str, Any] = dict(
+                        labels=dict(zip(label_names, label_values))
+                    )
+                    if isinstance(value, Histogram):
+                        entry.update(
+                            buckets=value.cumulative(),
+                            sum=value.sum,
+                            count=value.count,
+                        )
+                    else:
+                        entry.update(value=value)
+                    entries.append(entry)
+                result[name] = entries
+        return result
+
+    def to_prometheus(self) -> str:
+        """
+        Renders the current values in the Prometheus text format.
+        """
+        lines = []
+        with self._lock:
+            for name, series in self._series.items():
+                definition = self._definitions[name]
+                lines.append(f'# HELP {name} {definition.help}')
+                lines.append(f'# TYPE {name} {definition.type.value}')
+                for label_values, value in series.items():
+                    labels = list(zip(definition.labels, label_values))
+                    if isinstance(value, Histogram):
+                        for bound, count in value.cumulative():
+                            le = '+Inf' if bound == math.inf else repr(bound)
+                            lines.append(
+                                f'{name}_bucket'
+                                f'{_format_labels(labels + [("le", le)])}'
+                                f' {count}'
+                            )
+                        lines.append(
+                            f'{name}_sum{_format_labels(labels)} {value.sum}'
+                        )
+                        lines.append(
+                            f'{name}_count{_format_labels(labels)}'
+                            f' {value.count}'
+                        )
+                    else:
+                        lines.append(
+                            f'{name}{_format_labels(labels)} {_number(value)}'
+                        )
+        return '\n'.join(lines) + '\n'
+
+
+def _escape(value: str) -> str:
+    return (
+        value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+    )
+
+
+def _format_labels(labels: list[tuple[str, str]]) -> str:
+    if not labels:
+        return ''
+    return (
+        '{'
+        + ','.join(f'{name}="{_escape(str(value))}"' for name, value in labels)
+        + '}'
+    )
+
+
+def _number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(value)
+
+
+_BUILTIN_METRICS = (
+    MetricDefinition(
+        DATA_POINT_READ_SECONDS,
+        MetricType.HISTOGRAM,
+        'Duration of data point reads from the device.',
+        ('profile', 'data_point'),
+    ),
+    MetricDefinition(
+        DATA_POINT_WRITE_SECONDS,
+        MetricType.HISTOGRAM,
+        'Duration of data point writes to the device.',
+        ('profile', 'data_point'),
+    ),
+    MetricDefinition(
+        DATA_POINT_ERRORS,
+        MetricType.COUNTER,
+        'Failed data point reads and writes.',
+        ('profile', 'data_point', 'operation'),
+    ),
+    MetricDefinition(
+        DATA_POINT_TIMEOUTS,
+        MetricType.COUNTER,
+        'Data point reads cancelled by a deadline.',
+        ('profile', 'data_point'),
+    ),
+    MetricDefinition(
+        DATA_POINT_CACHE_HITS,
+        MetricType.COUNTER,
+        'Data point reads served from the value cache.',
+        ('profile', 'data_point'),
+    ),
+    MetricDefinition(
+        TRANSPORT_TRANSACTIONS,
+        MetricType.COUNTER,
+        'Requests sent over a transport.',
+        ('transport',),
+    ),
+    MetricDefinition(
+        TRANSPORT_BYTES,
+        MetricType.COUNTER,
+        'Payload bytes sent (tx) and received (rx) over a transport.',
+        ('transport', 'direction'),
+    ),
+    MetricDefinition(
+        TRANSPORT_QUEUE_WAIT_SECONDS,
+        MetricType.HISTOGRAM,
+        'Time requests waited for a free slot on a transport.',
+        ('transport',),
+    ),
+    MetricDefinition(
+        TRANSPORT_RECONNECTS,
+        MetricType.COUNTER,
+        'Connections re-established after the first connect.',
+        ('transport',),
+    ),
+)
+
+# used by the drivers, disabled until enabled by the application
+default_registry = MetricsRegistry()
+
+
+async def serve_prometheus(
+    host: str = '127.0.0.1',
+    port: int = 9464,
+    registry: Optional[MetricsRegistry] = None,
+) -> asyncio.AbstractServer:
+    """
+    Serves the metrics in the Prometheus text format over HTTP, on any path.
+    :param host: The address to listen on
+    :param port: The port to listen on
+    :param registry: The registry to serve, defaults to the default registry
+    :returns: The server, close it to stop serving
+    """
+    registry = registry if registry is not None else default_registry
+
+    async def handle(
+        reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ):
+        try:
+            # the request line and headers are not needed
+            while (await reader.readline()).strip():
+                pass
+            body = registry.to_prometheus().encode('utf-8')
+            writer.write(
+                b'HTTP/1.1 200 OK\r\n'
+                b'Content-Type: text/plain; version=0.0.4; charset=utf-8\r\n'
+                + f'Content-Length: {len(body)}\r\n'.encode('ascii')
+                + b'Connection: close\r\n\r\n'
+                + body
+            )
+            await writer.drain()
+        except Exception as e:
+            logger.warning(f'could not serve metrics: {e}')
+        finally:
+            writer.close()
+
+    return await asyncio.start_server(handle, host, port)
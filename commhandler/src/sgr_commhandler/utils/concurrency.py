@@ -0,0 +1,48 @@
+import asyncio
+import weakref
+from typing import Optional
+
+
+class LoopBoundSemaphore:
+    """
+    Semaphore which can be used from several event loops. One device can
+    be driven from more than one loop, e.g. by the synchronous API and by an
+    application's own loop, and an asyncio semaphore is bound to a single
+    loop. Each loop gets its own semaphore with the same limit. Without
+    limit, it never blocks.
+
+    Use as `async with semaphore:`.
+    """
+
+    def __init__(self, limit: Optional[int] = None):
+        if limit is not None and limit < 1:
+            raise Exception('concurrency limit must be at least 1')
+        self.limit = limit
+        self._semaphores: weakref.WeakKeyDictionary[
+            asyncio.AbstractEventLoop, asyncio.Semaphore
+        ] = weakref.WeakKeyDictionary()
+
+    def _semaphore(self) -> Optional[asyncio.Semaphore]:
+        if self.limit is None:
+            return None
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.limit)
+            self._semaphores[loop] = semaphore
+        return semaphore
+
+    def locked(self) -> bool:
+        semaphore = self._semaphore()
+        return semaphore is not None and semaphore.locked()
+
+    async def __aenter__(self):
+        semaphore = self._semaphore()
+        if semaphore is not None:
+            await semaphore.acquire()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        semaphore = self._semaphore()
+        if semaphore is not None:
+            semaphore.release()
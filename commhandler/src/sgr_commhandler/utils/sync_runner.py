@@ -0,0 +1,113 @@
+import asyncio
+import atexit
+import logging
+import threading
+from collections.abc import Coroutine
+from typing import Any, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar('T')
+
+
+class SyncRunner:
+    """
+    Runs coroutines for synchronous callers on a long-lived event loop in a
+    daemon thread.
+
+    Connections, e.g. aiohttp sessions and pymodbus transports, are bound to
+    the loop they were created in, so all synchronous calls share one loop.
+    Calls can be made from any thread except the loop thread itself.
+    """
+
+    def __init__(self, name: str = 'sgr-commhandler'):
+        self._name = name
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def loop(self) -> asyncio.AbstractEventLoop:
+        """
+        Returns the loop, starting it on first use.
+        """
+        with self._lock:
+            if self._loop is None or self._loop.is_closed():
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(
+                    target=self._run_loop,
+                    args=(loop,),
+                    name=self._name,
+                    daemon=True,
+                )
+                thread.start()
+                self._loop = loop
+                self._thread = thread
+            return self._loop
+
+    def run(
+        self, coro: Coroutine[Any, Any, T], timeout: Optional[float] = None
+    ) -> T:
+        """
+        Runs a coroutine on the loop and waits for its result.
+        :param coro: The coroutine to run
+        :param timeout: The maximum time to wait, in seconds
+        :returns: The result of the coroutine
+        """
+        loop = self.loop()
+        if threading.current_thread() is self._thread:
+            coro.close()
+            raise Exception(
+                'synchronous API called from its event loop, use the async API'
+            )
+        future = asyncio.run_coroutine_threadsafe(coro, loop)
+        try:
+            return future.result(timeout)
+        except BaseException:
+            future.cancel()
+            raise
+
+    def close(self):
+        """
+        Stops the loop. It is started again by the next call.
+        """
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            self._loop = None
+            self._thread = None
+        if loop is None or thread is None:
+            return
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
+
+    @staticmethod
+    def _run_loop(loop: asyncio.AbstractEventLoop):
+        asyncio.set_event_loop(loop)
+        try:
+            loop.run_forever()
+        finally:
+            try:
+                pending = asyncio.all_tasks(loop)
+                for task in pending:
+                    task.cancel()
+                if pending:
+                    loop.run_until_complete(
+                        asyncio.gather(*pending, return_exceptions=True)
+                    )
+                loop.run_until_complete(loop.shutdown_asyncgens())
+            except Exception as e:
+                logger.warning(f'error while stopping event loop: {e}')
+
+
+# shared by the synchronous methods of all devices
+default_runner = SyncRunner()
+atexit.register(default_runner.close)
+
+
+def run_sync(
+    coro: Coroutine[Any, Any, T], timeout: Optional[float] = None
+) -> T:
+    """
+    Runs a coroutine on the shared event loop of the synchronous API.
+    """
+    return default_runner.run(coro, timeout)
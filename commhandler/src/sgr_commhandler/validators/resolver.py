@@ -1,6 +1,7 @@
+from collections.abc import Callable
 from typing import Optional
 
-from sgr_specification.v0.generic import DataTypeProduct
+from sgr_specification.v0.generic import DataTypeProduct, EnumMapProduct
 
 from sgr_commhandler.api import DataPointValidator
 from sgr_commhandler.validators.validator import (
@@ -13,38 +14,83 @@ from sgr_commhandler.validators.validator import (
     StringValidator,
 )
 
+# data type attribute, size and signedness of the integer types
+_INT_TYPES: tuple[tuple[str, int, bool], ...] = (
+    ('int8', 8, True),
+    ('int16', 16, True),
+    ('int32', 32, True),
+    ('int64', 64, True),
+    ('int8_u', 8, False),
+    ('int16_u', 16, False),
+    ('int32_u', 32, False),
+    ('int64_u', 64, False),
+)
+_FLOAT_TYPES: tuple[tuple[str, int], ...] = (('float32', 32), ('float64', 64))
+
+# validators are immutable, so data points with the same type and range
+# share one
+_STRING = StringValidator()
+_BOOLEAN = BooleanValidator()
+_BITMAP = BitmapValidator()
+_DATE_TIME = DateTimeValidator()
+
+_validators: dict[tuple, DataPointValidator] = {}
+
+
+def _shared(
+    key: tuple, create: Callable[[], DataPointValidator]
+) -> DataPointValidator:
+    validator = _validators.get(key)
+    if validator is None:
+        validator = create()
+        _validators[key] = validator
+    return validator
+
+
+def _enum_key(type: EnumMapProduct) -> tuple:
+    return (
+        'enum',
+        tuple(
+            (entry.literal, entry.ordinal) for entry in (type.enum_entry or [])
+        ),
+    )
+
 
-def build_validator(type: Optional[DataTypeProduct]) -> DataPointValidator:
+def build_validator(
+    type: Optional[DataTypeProduct],
+    minimum: Optional[float] = None,
+    maximum: Optional[float] = None,
+) -> DataPointValidator:
+    """
+    Returns the validator of a data type, shared by all data points with the
+    same type and range.
+    :param type: The data type of the data point
+    :param minimum: The minimum value of numeric data points from the EID
+    :param maximum: The maximum value of numeric data points from the EID
+    :returns: The validator
+    """
     if type is None:
         raise Exception("Missing datatype")
-    if type.int8:
-        return IntValidator(8, signed=True)
-    elif type.int16:
-        return IntValidator(16, signed=True)
-    elif type.int32:
-        return IntValidator(32, signed=True)
-    elif type.int64:
-        return IntValidator(64, signed=True)
-    elif type.enum:
-        return EnumValidator(type.enum)
-    elif type.int8_u:
-        return IntValidator(8, signed=False)
-    elif type.int16_u:
-        return IntValidator(16, signed=False)
-    elif type.int32_u:
-        return IntValidator(32, signed=False)
-    elif type.int64_u:
-        return IntValidator(64, signed=False)
-    elif type.float32:
-        return FloatValidator(32)
-    elif type.float64:
-        return FloatValidator(64)
-    elif type.string:
-        return StringValidator()
+    if type.enum:
+        return _shared(_enum_key(type.enum), lambda: EnumValidator(type.enum))
+    for attribute, size, signed in _INT_TYPES:
+        if getattr(type, attribute):
+            return _shared(
+                ('int', size, signed, minimum, maximum),
+                lambda: IntValidator(size, signed, minimum, maximum),
+            )
+    for attribute, size in _FLOAT_TYPES:
+        if getattr(type, attribute):
+            return _shared(
+                ('float', size, minimum, maximum),
+                lambda: FloatValidator(size, minimum, maximum),
+            )
+    if type.string:
+        return _STRING
     elif type.boolean:
-        return BooleanValidator()
+        return _BOOLEAN
     elif type.bitmap:
-        return BitmapValidator()
+        return _BITMAP
     elif type.date_time:
-        return DateTimeValidator()
+        return _DATE_TIME
     raise Exception("unsupported validator")
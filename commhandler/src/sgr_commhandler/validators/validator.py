@@ -1,5 +1,7 @@
+import math
+from collections.abc import Sequence
 from datetime import datetime
-from typing import Any
+from typing import Any, Optional
 
 from sgr_specification.v0.generic import EnumMapProduct
 
@@ -11,34 +13,42 @@ FLOAT_SIZES: set[int] = {32, 64}
 
 
 class UnsupportedValidator(DataPointValidator):
+    __slots__ = ()
+
     def validate(self, value: Any) -> bool:
         return False
 
 
 class EnumValidator(DataPointValidator):
+    __slots__ = ('_valid_ordinals', '_valid_literals', '_options')
+
     def __init__(self, type: EnumMapProduct):
         if type and type.enum_entry:
-            self._valid_ordinals: set[int] = {
+            self._valid_ordinals: frozenset[int] = frozenset(
                 entry.ordinal
                 for entry in type.enum_entry
                 if entry.ordinal is not None
-            }
-            self._valid_literals: set[str] = {
+            )
+            self._valid_literals: frozenset[str] = frozenset(
                 entry.literal
                 for entry in type.enum_entry
                 if entry.literal is not None
-            }
+            )
             self._options: list[tuple[str, int]] = [
                 (entry.literal, entry.ordinal)
                 for entry in type.enum_entry
                 if entry.ordinal is not None and entry.literal is not None
             ]
         else:
-            self._valid_literals: set[str] = set()
-            self._valid_ordinals: set[int] = set()
+            self._valid_literals: frozenset[str] = frozenset()
+            self._valid_ordinals: frozenset[int] = frozenset()
             self._options: list[tuple[str, int]] = []
 
     def validate(self, value: Any) -> bool:
+        if type(value) is str:
+            return value in self._valid_literals
+        if type(value) is int:
+            return value in self._valid_ordinals
         if value is None:
             return False
         return (isinstance(value, str) and value in self._valid_literals) or (
@@ -53,7 +63,15 @@ class EnumValidator(DataPointValidator):
 
 
 class IntValidator(DataPointValidator):
-    def __init__(self, size: int, signed: bool = True):
+    __slots__ = ('_size', '_lower_bound', '_upper_bound')
+
+    def __init__(
+        self,
+        size: int,
+        signed: bool = True,
+        minimum: Optional[float] = None,
+        maximum: Optional[float] = None,
+    ):
         self._size = size if size in INT_SIZES else next(iter(INT_SIZES))
         if signed:
             self._lower_bound = -(2 ** (self._size - 1))
@@ -62,8 +80,15 @@ class IntValidator(DataPointValidator):
             # TODO verify that this even works with uint64
             self._lower_bound = 0
             self._upper_bound = (2**self._size) - 1
+        # the range of the EID narrows the range of the type
+        if minimum is not None:
+            self._lower_bound = max(self._lower_bound, minimum)
+        if maximum is not None:
+            self._upper_bound = min(self._upper_bound, maximum)
 
     def validate(self, value: Any) -> bool:
+        if type(value) is int or type(value) is float:
+            return self._lower_bound <= value <= self._upper_bound
         if value is None:
             return False
         if isinstance(value, float):
@@ -73,30 +98,83 @@ class IntValidator(DataPointValidator):
         except Exception:
             return False
 
+    def validate_many(self, values: Sequence[Any]) -> list[bool]:
+        lower, upper = self._lower_bound, self._upper_bound
+        if hasattr(values, 'dtype'):
+            # numpy arrays are compared as a whole
+            return ((values >= lower) & (values <= upper)).tolist()
+        return [
+            lower <= value <= upper
+            if type(value) is int or type(value) is float
+            else self.validate(value)
+            for value in values
+        ]
+
     def data_type(self) -> DataTypes:
         return DataTypes.INT
 
 
 class FloatValidator(DataPointValidator):
-    def __init__(self, size: int):
+    __slots__ = ('_size', '_lower_bound', '_upper_bound', '_bounded')
+
+    def __init__(
+        self,
+        size: int,
+        minimum: Optional[float] = None,
+        maximum: Optional[float] = None,
+    ):
         self._size = size if size in FLOAT_SIZES else next(iter(FLOAT_SIZES))
+        self._lower_bound = -math.inf if minimum is None else minimum
+        self._upper_bound = math.inf if maximum is None else maximum
+        # without range any number is valid, including NaN
+        self._bounded = minimum is not None or maximum is not None
 
     def validate(self, value: Any) -> bool:
+        if type(value) is float or type(value) is int:
+            if self._bounded:
+                return self._lower_bound <= value <= self._upper_bound
+            return True
         if value is None:
             return False
-        if isinstance(value, float):
-            return True
         try:
-            float(value)
-            return True
+            value = float(value)
         except Exception:
             return False
+        return (
+            not self._bounded
+            or self._lower_bound <= value <= self._upper_bound
+        )
+
+    def validate_many(self, values: Sequence[Any]) -> list[bool]:
+        lower, upper = self._lower_bound, self._upper_bound
+        if hasattr(values, 'dtype'):
+            if not self._bounded:
+                return [True] * len(values)
+            return ((values >= lower) & (values <= upper)).tolist()
+        if not self._bounded:
+            return [
+                type(value) is float
+                or type(value) is int
+                or self.validate(value)
+                for value in values
+            ]
+        return [
+            lower <= value <= upper
+            if type(value) is float or type(value) is int
+            else self.validate(value)
+            for value in values
+        ]
+
+    def trusts(self, value_type: type) -> bool:
+        return not self._bounded and value_type in (float, int)
 
     def data_type(self) -> DataTypes:
         return DataTypes.FLOAT
 
 
 class StringValidator(DataPointValidator):
+    __slots__ = ()
+
     def validate(self, value: Any) -> bool:
         if value is None:
             return False
@@ -108,11 +186,16 @@ class StringValidator(DataPointValidator):
         except Exception:
             return False
 
+    def trusts(self, value_type: type) -> bool:
+        return value_type is str
+
     def data_type(self) -> DataTypes:
         return DataTypes.STRING
 
 
 class BooleanValidator(DataPointValidator):
+    __slots__ = ()
+
     def validate(self, value: Any) -> bool:
         if value is None:
             return False
@@ -124,11 +207,16 @@ class BooleanValidator(DataPointValidator):
         except Exception:
             return False
 
+    def trusts(self, value_type: type) -> bool:
+        return value_type is bool
+
     def data_type(self) -> DataTypes:
         return DataTypes.BOOLEAN
 
 
 class BitmapValidator(DataPointValidator):
+    __slots__ = ()
+
     def validate(self, value: Any) -> bool:
         if value is None:
             return False
@@ -139,6 +227,8 @@ class BitmapValidator(DataPointValidator):
 
 
 class DateTimeValidator(DataPointValidator):
+    __slots__ = ()
+
     def validate(self, value: Any) -> bool:
         if value is None:
             return False
@@ -0,0 +1,137 @@
+import pytest
+from sgr_specification.v0.generic import DataDirectionProduct
+
+from sgr_commhandler.api import (
+    DataPoint,
+    DataPointProtocol,
+    InterceptorChain,
+    Invocation,
+    Operation,
+    SamplingInterceptor,
+    SpanInterceptor,
+    TimingInterceptor,
+)
+from sgr_commhandler.api.interceptor import global_interceptors, intercept
+from sgr_commhandler.validators.validator import IntValidator
+
+
+class FakeProtocol(DataPointProtocol):
+    """
+    Reads through a transport request, like the drivers do.
+    """
+
+    def __init__(self, chain: InterceptorChain):
+        self._chain = chain
+        self.value = 1
+
+    async def get_val(self, skip_cache: bool = False):
+        return await intercept(
+            self._chain,
+            Invocation(Operation.REQUEST, transport='fake:1'),
+            self._request,
+        )
+
+    async def _request(self, invocation: Invocation):
+        return self.value
+
+    async def set_val(self, value):
+        self.value = value
+
+    def name(self) -> tuple[str, str]:
+        return 'fp', 'dp'
+
+    def direction(self) -> DataDirectionProduct:
+        return DataDirectionProduct.RW
+
+
+class Recorder:
+    def __init__(self, label: str, log: list):
+        self._label = label
+        self._log = log
+
+    async def intercept(self, invocation, call_next):
+        self._log.append((self._label, invocation.operation))
+        return await call_next(invocation)
+
+
+class Doubler:
+    async def intercept(self, invocation, call_next):
+        if invocation.operation is Operation.WRITE:
+            invocation.value *= 2
+        return await call_next(invocation)
+
+
+def build(chain: InterceptorChain):
+    protocol = FakeProtocol(chain)
+    return protocol, DataPoint(protocol, IntValidator(16), None, chain)
+
+
+@pytest.mark.asyncio
+async def test_chain_order():
+    log = []
+    chain = InterceptorChain([Recorder('device', log)])
+    global_interceptors.add(Recorder('global', log))
+    try:
+        _, dp = build(chain)
+        assert await dp.get_value_async() == 1
+    finally:
+        global_interceptors.clear()
+
+    assert log == [
+        ('global', Operation.READ),
+        ('device', Operation.READ),
+        ('global', Operation.REQUEST),
+        ('device', Operation.REQUEST),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_interceptor_changes_written_value():
+    protocol, dp = build(InterceptorChain([Doubler()]))
+
+    await dp.set_value_async(4)
+
+    assert protocol.value == 8
+
+
+@pytest.mark.asyncio
+async def test_timing_and_spans():
+    timing = TimingInterceptor()
+    spans = SpanInterceptor()
+    _, dp = build(InterceptorChain([timing, spans]))
+
+    await dp.get_value_async()
+
+    assert [t.invocation.operation for t in timing.timings] == [
+        Operation.REQUEST,
+        Operation.READ,
+    ]
+    request, read = spans.spans
+    assert read.name == 'READ fp/dp'
+    assert read.parent is None
+    assert request.name == 'REQUEST fake:1'
+    assert request.parent is read
+    assert request.attributes['sgr.transport'] == 'fake:1'
+    assert read.duration() >= request.duration()
+
+
+@pytest.mark.asyncio
+async def test_sampling():
+    timing = TimingInterceptor()
+    samples = iter([0.05, 0.5, 0.05, 0.5])
+    sampled = SamplingInterceptor(timing, 0.1, lambda: next(samples))
+    protocol, dp = build(InterceptorChain([sampled]))
+
+    # the read and its request are sampled independently
+    await dp.get_value_async()
+    await dp.get_value_async()
+
+    assert [t.invocation.operation for t in timing.timings] == [
+        Operation.READ,
+        Operation.READ,
+    ]
+
+
+def test_sampling_rate_is_checked():
+    with pytest.raises(Exception):
+        SamplingInterceptor(TimingInterceptor(), 2.0)
@@ -0,0 +1,139 @@
+import asyncio
+
+import pytest
+from sgr_specification.v0.generic import DataDirectionProduct
+
+from sgr_commhandler.api import DataPoint, DataPointProtocol, ValueCache
+from sgr_commhandler.api.read_result import read_data_point_list
+from sgr_commhandler.metrics import (
+    DATA_POINT_CACHE_HITS,
+    DATA_POINT_ERRORS,
+    DATA_POINT_READ_SECONDS,
+    DATA_POINT_TIMEOUTS,
+    TRANSPORT_TRANSACTIONS,
+    MetricsRegistry,
+    default_registry,
+    serve_prometheus,
+)
+from sgr_commhandler.validators.validator import IntValidator
+
+
+class FakeProtocol(DataPointProtocol):
+    def __init__(self, value, delay: float = 0):
+        self._value = value
+        self._delay = delay
+
+    async def get_val(self, skip_cache: bool = False):
+        await asyncio.sleep(self._delay)
+        if isinstance(self._value, Exception):
+            raise self._value
+        return self._value
+
+    def name(self) -> tuple[str, str]:
+        return 'fp', 'dp'
+
+    def direction(self) -> DataDirectionProduct:
+        return DataDirectionProduct.R
+
+
+@pytest.fixture
+def metrics():
+    default_registry.clear()
+    default_registry.enable()
+    yield default_registry
+    default_registry.disable()
+    default_registry.clear()
+
+
+def series(registry: MetricsRegistry, name: str) -> dict:
+    return {
+        tuple(entry['labels'].values()): entry
+        for entry in registry.snapshot()[name]
+    }
+
+
+def test_disabled_registry_records_nothing():
+    registry = MetricsRegistry()
+    assert registry.clock() is None
+    registry.increment(TRANSPORT_TRANSACTIONS, ('modbus-tcp:host:502',))
+    registry.observe(DATA_POINT_READ_SECONDS, ('fp', 'dp'), 0.1)
+    assert registry.snapshot()[TRANSPORT_TRANSACTIONS] == []
+    assert registry.snapshot()[DATA_POINT_READ_SECONDS] == []
+
+
+def test_prometheus_text():
+    registry = MetricsRegistry(enabled=True, buckets=(0.1, 1.0))
+    registry.increment(TRANSPORT_TRANSACTIONS, ('rest:host"1',), 2)
+    registry.observe(DATA_POINT_READ_SECONDS, ('fp', 'dp'), 0.05)
+    registry.observe(DATA_POINT_READ_SECONDS, ('fp', 'dp'), 0.5)
+
+    text = registry.to_prometheus()
+
+    assert '# TYPE sgr_transport_transactions_total counter' in text
+    assert 'sgr_transport_transactions_total{transport="rest:host\\"1"} 2' in (
+        text
+    )
+    assert '# TYPE sgr_data_point_read_seconds histogram' in text
+    lines = [
+        line
+        for line in text.splitlines()
+        if line.startswith('sgr_data_point_read_seconds')
+    ]
+    assert lines == [
+        'sgr_data_point_read_seconds_bucket'
+        '{profile="fp",data_point="dp",le="0.1"} 1',
+        'sgr_data_point_read_seconds_bucket'
+        '{profile="fp",data_point="dp",le="1.0"} 2',
+        'sgr_data_point_read_seconds_bucket'
+        '{profile="fp",data_point="dp",le="+Inf"} 2',
+        'sgr_data_point_read_seconds_sum{profile="fp",data_point="dp"} 0.55',
+        'sgr_data_point_read_seconds_count{profile="fp",data_point="dp"} 2',
+    ]
+
+
+@pytest.mark.asyncio
+async def test_data_point_metrics(metrics):
+    dp = DataPoint(FakeProtocol(1), IntValidator(16), ValueCache())
+    failing = DataPoint(FakeProtocol(Exception('offline')), IntValidator(16))
+
+    await dp.get_value_async()
+    await dp.get_value_async(max_age=60)
+    with pytest.raises(Exception):
+        await failing.get_value_async()
+
+    reads = series(metrics, DATA_POINT_READ_SECONDS)[('fp', 'dp')]
+    assert reads['count'] == 2
+    assert series(metrics, DATA_POINT_CACHE_HITS)[('fp', 'dp')]['value'] == 1
+    errors = series(metrics, DATA_POINT_ERRORS)
+    assert errors[('fp', 'dp', 'read')]['value'] == 1
+
+
+@pytest.mark.asyncio
+async def test_timeout_metrics(metrics):
+    slow = DataPoint(FakeProtocol(1, delay=1), IntValidator(16))
+
+    await read_data_point_list([slow], timeout=0.01)
+
+    timeouts = series(metrics, DATA_POINT_TIMEOUTS)
+    assert timeouts[('fp', 'dp')]['value'] == 1
+
+
+@pytest.mark.asyncio
+async def test_serve_prometheus():
+    registry = MetricsRegistry(enabled=True)
+    registry.increment(TRANSPORT_TRANSACTIONS, ('rest:host',))
+    server = await serve_prometheus(port=0, registry=registry)
+    port = server.sockets[0].getsockname()[1]
+    try:
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        writer.write(b'GET /metrics HTTP/1.1\r\nHost: localhost\r\n\r\n')
+        response = (await reader.read()).decode('utf-8')
+        writer.close()
+    finally:
+        server.close()
+        await server.wait_closed()
+
+    assert response.startswith('HTTP/1.1 200 OK')
+    assert 'sgr_transport_transactions_total{transport="rest:host"} 1' in (
+        response
+    )
@@ -0,0 +1,127 @@
+import asyncio
+
+import pytest
+from sgr_specification.v0.generic import DataDirectionProduct
+
+from sgr_commhandler.api import (
+    DataPoint,
+    DataPointProtocol,
+    FunctionalProfile,
+    ReadStatus,
+    SGrBaseInterface,
+)
+from sgr_commhandler.validators.validator import IntValidator
+
+
+class FakeProtocol(DataPointProtocol):
+    def __init__(self, name: str, value, delay: float = 0):
+        self._name = name
+        self._value = value
+        self._delay = delay
+
+    async def get_val(self, skip_cache: bool = False):
+        await asyncio.sleep(self._delay)
+        if isinstance(self._value, Exception):
+            raise self._value
+        return self._value
+
+    def name(self) -> tuple[str, str]:
+        return 'fp', self._name
+
+    def direction(self) -> DataDirectionProduct:
+        return DataDirectionProduct.R
+
+
+class FakeProfile(FunctionalProfile):
+    def __init__(self, protocols):
+        self._data_points = {
+            protocol.name(): DataPoint(protocol, IntValidator(16))
+            for protocol in protocols
+        }
+
+    def name(self) -> str:
+        return 'fp'
+
+    def get_data_points(self):
+        return self._data_points
+
+
+class FakeDevice(SGrBaseInterface):
+    def __init__(self, protocols):
+        self.function_profiles = {'fp': FakeProfile(protocols)}
+
+
+def device() -> FakeDevice:
+    return FakeDevice(
+        [
+            FakeProtocol('ok', 1),
+            FakeProtocol('broken', Exception('dead register')),
+            FakeProtocol('invalid', 2**20),
+            FakeProtocol('hanging', 2, delay=10),
+        ]
+    )
+
+
+@pytest.mark.asyncio
+async def test_failures_are_isolated():
+    start = asyncio.get_running_loop().time()
+    results = await device().read_values_async(timeout=0.1)
+    elapsed = asyncio.get_running_loop().time() - start
+
+    assert elapsed < 1
+    assert results[('fp', 'ok')].ok()
+    assert results[('fp', 'ok')].value == 1
+    assert results[('fp', 'broken')].status is ReadStatus.ERROR
+    assert str(results[('fp', 'broken')].error) == 'dead register'
+    # failed validation
+    assert results[('fp', 'invalid')].status is ReadStatus.ERROR
+    assert results[('fp', 'hanging')].status is ReadStatus.TIMEOUT
+    assert isinstance(results[('fp', 'hanging')].error, asyncio.TimeoutError)
+
+
+@pytest.mark.asyncio
+async def test_profile_read_values():
+    results = await device().get_function_profile('fp').read_values_async(
+        timeout=0.1
+    )
+
+    assert {name: result.status for name, result in results.items()} == {
+        'ok': ReadStatus.OK,
+        'broken': ReadStatus.ERROR,
+        'invalid': ReadStatus.ERROR,
+        'hanging': ReadStatus.TIMEOUT,
+    }
+
+
+@pytest.mark.asyncio
+async def test_get_values_still_raises():
+    broken = FakeDevice(
+        [FakeProtocol('ok', 1), FakeProtocol('broken', Exception('dead'))]
+    )
+    with pytest.raises(Exception, match='dead'):
+        await broken.get_values_async()
+
+
+class TrackingProtocol(FakeProtocol):
+    def __init__(self, name: str):
+        super().__init__(name, 1, delay=10)
+        self.cancelled = False
+
+    async def get_val(self, skip_cache: bool = False):
+        try:
+            return await super().get_val(skip_cache)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+
+
+@pytest.mark.asyncio
+async def test_cancelled_caller_cancels_reads():
+    protocols = [TrackingProtocol('a'), TrackingProtocol('b')]
+    read = asyncio.create_task(FakeDevice(protocols).read_values_async())
+    await asyncio.sleep(0.05)
+    read.cancel()
+
+    with pytest.raises(asyncio.CancelledError):
+        await read
+    assert all(protocol.cancelled for protocol in protocols)
@@ -0,0 +1,221 @@
+import asyncio
+import os
+
+import pytest
+import pytest_asyncio
+from aiohttp import web
+
+from sgr_commhandler.api import (
+    Exchange,
+    Invocation,
+    Operation,
+    Recording,
+    RecordingInterceptor,
+    ReplayInterceptor,
+    replay_recording,
+)
+from sgr_commhandler.device_builder import DeviceBuilder
+from sgr_commhandler.driver.messaging import (
+    InMemoryBroker,
+    MessagingDeviceSimulator,
+)
+
+EID_PATH = os.path.join(
+    os.path.dirname(os.path.realpath(__file__)), '..', 'test_devices', 'eids'
+)
+REST_EID = os.path.join(
+    EID_PATH, 'SGr_01_mmmm_dddd_Shelly_1PM_RestAPILocal_V0.1.xml'
+)
+MESSAGING_EID = os.path.join(EID_PATH, 'SGr_XX_HiveMQ_MQTT_Cloud.xml')
+MESSAGING_PROPERTIES = dict(
+    host='localhost', port='1883', username='test', password='test'
+)
+FP = 'EVSE_Station1'
+
+
+class Shelly:
+    def __init__(self):
+        self.requests = 0
+        self.power = 12.5
+        self.app = web.Application()
+        self.app.router.add_get('/status', self.status)
+        self.app.router.add_get('/relay/0', self.relay)
+
+    async def status(self, request):
+        self.requests += 1
+        return web.json_response(
+            dict(meters=[dict(power=self.power, total=42)])
+        )
+
+    async def relay(self, request):
+        self.requests += 1
+        return web.json_response(dict(ison=True))
+
+
+@pytest_asyncio.fixture
+async def shelly():
+    simulator = Shelly()
+    runner = web.AppRunner(simulator.app)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    yield simulator, f'http://127.0.0.1:{port}'
+    await runner.cleanup()
+
+
+def build_rest(base_uri: str):
+    return (
+        DeviceBuilder()
+        .eid_path(REST_EID)
+        .properties(dict(baseUri=base_uri))
+        .build()
+    )
+
+
+@pytest.mark.asyncio
+async def test_record_and_replay_rest(shelly, tmp_path):
+    simulator, base_uri = shelly
+    device = build_rest(base_uri)
+    recorder = RecordingInterceptor()
+    device.interceptors.add(recorder)
+    await device.connect_async()
+    recorded = await device.get_values_async()
+    simulator.power = 20.0
+    power = device.get_data_point(('ActivePowerAC', 'ActivePowerACtot'))
+    await power.get_value_async(max_age=0)
+    await device.disconnect_async()
+    path = str(tmp_path / 'shelly.jsonl')
+    recorder.recording.save(path)
+    requests = simulator.requests
+
+    recording = Recording.load(path)
+    operations = [exchange.operation for exchange in recording.exchanges]
+    assert operations.count(Operation.REQUEST) == 3
+    assert operations.count(Operation.READ) == 4
+
+    replayed = build_rest(base_uri)
+    replayed.interceptors.add(ReplayInterceptor(recording, cycle=False))
+    await replayed.connect_async()
+    assert await replayed.get_values_async() == recorded
+    power = replayed.get_data_point(('ActivePowerAC', 'ActivePowerACtot'))
+    # responses to the same request are replayed in order
+    assert await power.get_value_async(max_age=0) == 20.0
+    with pytest.raises(Exception):
+        await power.get_value_async(max_age=0)
+    await replayed.disconnect_async()
+
+    assert simulator.requests == requests
+
+
+@pytest.mark.asyncio
+async def test_replay_distinguishes_query_parameters():
+    def exchange(query: str, power: float) -> Exchange:
+        return Exchange(
+            Operation.REQUEST,
+            0.0,
+            0.0,
+            transport='rest:device',
+            attributes=dict(method='GET', url='/status', query=query),
+            result=power,
+        )
+
+    replay = ReplayInterceptor(
+        Recording([exchange('meter=0', 1.0), exchange('meter=1', 2.0)])
+    )
+
+    async def unreachable(invocation):
+        raise AssertionError('replayed requests do not reach the device')
+
+    async def request(query: str) -> float:
+        return await replay.intercept(
+            Invocation(
+                Operation.REQUEST,
+                transport='rest:device',
+                attributes=dict(method='GET', url='/status', query=query),
+            ),
+            unreachable,
+        )
+
+    assert await request('meter=1') == 2.0
+    assert await request('meter=0') == 1.0
+
+
+@pytest.mark.asyncio
+async def test_replay_at_recorded_timing(shelly):
+    _, base_uri = shelly
+    device = build_rest(base_uri)
+    recorder = RecordingInterceptor()
+    device.interceptors.add(recorder)
+    await device.connect_async()
+    power = device.get_data_point(('ActivePowerAC', 'ActivePowerACtot'))
+    for _ in range(3):
+        await power.get_value_async(max_age=0)
+        await asyncio.sleep(0.1)
+    await device.disconnect_async()
+
+    replayed = build_rest(base_uri)
+    replayed.interceptors.add(ReplayInterceptor(recorder.recording))
+    await replayed.connect_async()
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    results = await replay_recording(replayed, recorder.recording, speed=2.0)
+    elapsed = loop.time() - start
+    fast = await replay_recording(replayed, recorder.recording)
+    await replayed.disconnect_async()
+
+    assert results == [12.5, 12.5, 12.5]
+    assert fast == results
+    # two gaps of 0.1 s at double speed
+    assert 0.09 <= elapsed < 0.2
+
+
+@pytest.mark.asyncio
+async def test_record_and_replay_messaging():
+    broker = InMemoryBroker()
+    builder = (
+        DeviceBuilder()
+        .eid_path(MESSAGING_EID)
+        .properties(MESSAGING_PROPERTIES)
+    )
+    device = builder.build()
+    device.set_client(broker.client(no_local=True))
+    recorder = RecordingInterceptor()
+    device.interceptors.add(recorder)
+    simulator = MessagingDeviceSimulator(
+        device.frame,
+        broker.client(no_local=True),
+        values={
+            (FP, 'SafeCurrent'): 12.0,
+            (FP, 'MaxReceiveTimeSec'): 30,
+            (FP, 'ChargingCurrentMin'): 6,
+            (FP, 'ChargingCurrentMax'): 16,
+        },
+    )
+    await simulator.start()
+    await device.connect_async()
+    await simulator.publish_value((FP, 'ChargingCurrentMin'))
+    await simulator.publish_value((FP, 'ChargingCurrentMax'))
+    await asyncio.sleep(0.05)
+    recorded = await device.get_values_async()
+    await device.disconnect_async()
+    await simulator.stop()
+
+    publishes = [
+        exchange
+        for exchange in recorder.recording.exchanges
+        if exchange.operation is Operation.REQUEST
+    ]
+    assert len(publishes) == 2
+    assert publishes[0].transport == 'messaging:localhost:1883'
+    # devices of a broker are not limited to one request at a time
+    assert device.transport_key() != builder.build().transport_key()
+
+    # no broker needed
+    replayed = builder.build()
+    replayed.interceptors.add(ReplayInterceptor(recorder.recording))
+    await replay_recording(replayed, recorder.recording)
+
+    assert {
+        name: replayed.value_cache.peek(name).value for name in recorded
+    } == recorded
@@ -0,0 +1,202 @@
+import os
+from array import array
+
+import pytest
+from sgr_specification.v0.generic import DataDirectionProduct
+
+from sgr_commhandler.api import (
+    ColumnarSnapshot,
+    DataPoint,
+    DataPointProtocol,
+    FunctionalProfile,
+    ReadResult,
+    ReadStatus,
+    SGrBaseInterface,
+    SnapshotSchema,
+)
+from sgr_commhandler.api.device_api import DeviceInformation
+from sgr_commhandler.device_builder import DeviceBuilder
+from sgr_commhandler.device_pool import DevicePool
+from sgr_commhandler.validators.validator import (
+    FloatValidator,
+    IntValidator,
+    StringValidator,
+)
+
+EID_PATH = os.path.join(
+    os.path.dirname(os.path.realpath(__file__)),
+    '..',
+    'test_devices',
+    'eids',
+    'SGr_00_0016_dddd_ABB_B23_ModbusTCP_V0.3.xml',
+)
+GENERIC_EID_PATH = os.path.join(
+    os.path.dirname(EID_PATH), 'test_eid_generic_V0.1.xml'
+)
+
+
+class FakeProtocol(DataPointProtocol):
+    def __init__(self, name: str, value):
+        self._name = name
+        self._value = value
+
+    async def get_val(self, skip_cache: bool = False):
+        if isinstance(self._value, Exception):
+            raise self._value
+        return self._value
+
+    def name(self) -> tuple[str, str]:
+        return 'fp', self._name
+
+    def direction(self) -> DataDirectionProduct:
+        return DataDirectionProduct.R
+
+
+class FakeProfile(FunctionalProfile):
+    def __init__(self, data_points):
+        self._data_points = {dp.name(): dp for dp in data_points}
+
+    def name(self) -> str:
+        return 'fp'
+
+    def get_data_points(self):
+        return self._data_points
+
+
+class FakeDevice(SGrBaseInterface):
+    def __init__(self, power, state='on'):
+        self.device_information = DeviceInformation(
+            'fake', '', '', '', None, False
+        )
+        self.function_profiles = {
+            'fp': FakeProfile(
+                [
+                    DataPoint(FakeProtocol('count', 7), IntValidator(32)),
+                    DataPoint(FakeProtocol('power', power), FloatValidator(64)),
+                    DataPoint(FakeProtocol('state', state), StringValidator()),
+                ]
+            )
+        }
+
+
+@pytest.mark.asyncio
+async def test_device_snapshot():
+    first, second = FakeDevice(1.5), FakeDevice(Exception('dead'), 'off')
+    snapshot = await first.read_snapshot_async(label='first')
+    await second.read_snapshot_async(snapshot=snapshot, label='second')
+
+    assert SnapshotSchema.of(first) == SnapshotSchema.of(second)
+    assert snapshot.schema.keys == (
+        ('fp', 'count'),
+        ('fp', 'power'),
+        ('fp', 'state'),
+    )
+    assert len(snapshot) == 2
+    assert snapshot.labels == ['first', 'second']
+    assert snapshot.column(('fp', 'count')) == array('q', [7, 7])
+    assert snapshot.column(('fp', 'power')) == array('d', [1.5, 0.0])
+    assert snapshot.status(('fp', 'power')) == array('b', [0, 1])
+    assert snapshot.column(('fp', 'state')) == ['on', 'off']
+    assert snapshot.row(1) == {('fp', 'count'): 7, ('fp', 'state'): 'off'}
+
+
+def test_extend_and_missing_values():
+    schema = SnapshotSchema.of(FakeDevice(1.0))
+    history = ColumnarSnapshot(schema)
+    cycle = ColumnarSnapshot(schema)
+    cycle.append_mapping(
+        {('fp', 'power'): ReadResult(ReadStatus.OK, 2.0)}, 10.0, 'a'
+    )
+    history.extend(cycle)
+    history.extend(cycle)
+
+    assert list(history.timestamps) == [10.0, 10.0]
+    assert list(history.status(('fp', 'count'))) == [3, 3]
+    assert list(history.column(('fp', 'power'))) == [2.0, 2.0]
+
+
+def test_int_column_beyond_int64():
+    schema = SnapshotSchema.of(FakeDevice(1.0))
+    small = ColumnarSnapshot(schema)
+    large = ColumnarSnapshot(schema)
+    small.append_mapping(
+        {('fp', 'count'): ReadResult(ReadStatus.OK, 1)}, 1.0, 'a'
+    )
+    large.append_mapping(
+        {('fp', 'count'): ReadResult(ReadStatus.OK, 2**64 - 1)}, 2.0, 'b'
+    )
+    assert list(large.status(('fp', 'count'))) == [0]
+    assert large.column(('fp', 'count')) == [2**64 - 1]
+
+    small.extend(large)
+    assert small.column(('fp', 'count')) == [1, 2**64 - 1]
+
+
+def test_int_column_keeps_other_values():
+    schema = SnapshotSchema.of(FakeDevice(1.0))
+    snapshot = ColumnarSnapshot(schema)
+    for value in (1, '1337', 2.5):
+        snapshot.append_mapping(
+            {('fp', 'count'): ReadResult(ReadStatus.OK, value)}, 1.0, 'a'
+        )
+
+    assert list(snapshot.status(('fp', 'count'))) == [0, 0, 0]
+    assert snapshot.column(('fp', 'count')) == [1, '1337', 2.5]
+
+
+@pytest.mark.asyncio
+async def test_generic_device_snapshot_matches_values():
+    device = DeviceBuilder().eid_path(GENERIC_EID_PATH).build()
+    await device.connect_async()
+    values = await device.get_values_async()
+    snapshot = await device.read_snapshot_async()
+    await device.disconnect_async()
+
+    assert set(snapshot.status(key)[0] for key in values) == {0}
+    assert snapshot.row(0) == values
+
+
+class BrokenDevice(FakeDevice):
+    def describe(self):
+        raise Exception('broken specification')
+
+
+@pytest.mark.asyncio
+async def test_pool_snapshot_isolates_schema_failures():
+    pool = DevicePool()
+    pool.add_all([FakeDevice(1.0), BrokenDevice(2.0)])
+
+    (snapshot,) = (await pool.snapshot_async()).values()
+
+    assert snapshot.labels == ['fake#0']
+
+
+@pytest.mark.asyncio
+async def test_pool_snapshot_labels_are_unique():
+    pool = DevicePool()
+    pool.add_all([FakeDevice(1.0), FakeDevice(2.0)])
+
+    (snapshot,) = (await pool.snapshot_async()).values()
+
+    assert sorted(snapshot.labels) == ['fake#0', 'fake#1']
+
+
+@pytest.mark.asyncio
+async def test_schema_units_from_specification():
+    device = (
+        DeviceBuilder()
+        .eid_path(EID_PATH)
+        .properties(
+            dict(slave_id='1', tcp_address='127.0.0.1', tcp_port='502')
+        )
+        .lazy()
+        .build()
+    )
+    schema = SnapshotSchema.of(device)
+
+    _, profiles = device.describe()
+    assert len(schema) == sum(len(dps) for dps in profiles.values())
+    assert 'VOLTS' in schema.units
+    # describing the schema does not build lazy data points
+    for fp in device.function_profiles.values():
+        assert fp.get_data_points().materialized() == 0
@@ -0,0 +1,63 @@
+import asyncio
+
+import pytest
+
+from sgr_commhandler.api import OverflowPolicy, SubscriptionChannel
+
+DP_A = ('fp', 'a')
+DP_B = ('fp', 'b')
+
+
+@pytest.mark.asyncio
+async def test_keep_latest_coalesces_per_data_point():
+    channel = SubscriptionChannel(maxsize=10)
+    for i in range(5):
+        channel.offer(DP_A, i)
+    channel.offer(DP_B, 'x')
+
+    assert channel.qsize() == 2
+    assert await channel.get() == (DP_A, 4)
+    assert await channel.get() == (DP_B, 'x')
+
+    metrics = channel.metrics()
+    assert metrics.received == 6
+    assert metrics.coalesced == 4
+    assert metrics.delivered == 2
+    assert metrics.dropped == 0
+
+
+@pytest.mark.asyncio
+async def test_drop_oldest():
+    channel = SubscriptionChannel(maxsize=2, policy=OverflowPolicy.DROP_OLDEST)
+    for i in range(5):
+        channel.offer(DP_A, i)
+
+    assert channel.get_nowait() == (DP_A, 3)
+    assert channel.get_nowait() == (DP_A, 4)
+    assert channel.metrics().dropped == 3
+    assert channel.metrics().max_depth == 2
+
+
+@pytest.mark.asyncio
+async def test_block_waits_for_consumer():
+    channel = SubscriptionChannel(maxsize=1, policy=OverflowPolicy.BLOCK)
+    assert channel.offer(DP_A, 1)
+    assert not channel.offer(DP_A, 2)
+
+    producer = asyncio.create_task(channel.put(DP_A, 2))
+    await asyncio.sleep(0)
+    assert not producer.done()
+
+    assert await channel.get() == (DP_A, 1)
+    await asyncio.wait_for(producer, 1)
+    assert await channel.get() == (DP_A, 2)
+    assert channel.metrics().blocked == 1
+
+
+@pytest.mark.asyncio
+async def test_close_ends_iteration():
+    channel = SubscriptionChannel()
+    channel.offer(DP_A, 1)
+    channel.close()
+    assert not channel.offer(DP_A, 2)
+    assert [item async for item in channel] == [(DP_A, 1)]
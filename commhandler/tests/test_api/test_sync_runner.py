@@ -0,0 +1,83 @@
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from aiohttp import web
+
+from sgr_commhandler.device_builder import DeviceBuilder
+from sgr_commhandler.utils.sync_runner import SyncRunner, run_sync
+
+EID_PATH = os.path.join(
+    os.path.dirname(os.path.realpath(__file__)),
+    '..',
+    'test_devices',
+    'eids',
+    'SGr_01_mmmm_dddd_Shelly_1PM_RestAPILocal_V0.1.xml',
+)
+
+
+async def running_loop():
+    return asyncio.get_running_loop()
+
+
+def test_calls_share_one_loop():
+    runner = SyncRunner()
+    try:
+        with ThreadPoolExecutor(4) as executor:
+            loops = set(
+                executor.map(lambda _: runner.run(running_loop()), range(8))
+            )
+        assert len(loops) == 1
+        assert loops.pop() is runner.loop()
+    finally:
+        runner.close()
+
+
+def test_call_from_loop_thread_fails():
+    runner = SyncRunner()
+
+    async def nested():
+        return runner.run(running_loop())
+
+    try:
+        with pytest.raises(Exception, match='use the async API'):
+            runner.run(nested())
+    finally:
+        runner.close()
+
+
+def test_sync_device_reuses_session():
+    async def status(request):
+        return web.json_response(dict(meters=[dict(power=12.5, total=42)]))
+
+    async def relay(request):
+        return web.json_response(dict(ison=True))
+
+    async def start_server():
+        app = web.Application()
+        app.router.add_get('/status', status)
+        app.router.add_get('/relay/0', relay)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, '127.0.0.1', 0)
+        await site.start()
+        return runner, site._server.sockets[0].getsockname()[1]
+
+    server, port = run_sync(start_server())
+    try:
+        device = (
+            DeviceBuilder()
+            .eid_path(EID_PATH)
+            .properties(dict(baseUri=f'http://127.0.0.1:{port}'))
+            .build()
+        )
+        device.connect()
+        session = device._session
+        assert len(device.get_values()) == 3
+        dp = device.get_data_point(('ActivePowerAC', 'ActivePowerACtot'))
+        assert dp.get_value() == 12.5
+        assert device._session is session
+        device.disconnect()
+    finally:
+        run_sync(server.cleanup())
@@ -0,0 +1,158 @@
+import asyncio
+
+import pytest
+from sgr_specification.v0.generic import DataDirectionProduct
+
+from sgr_commhandler.api import (
+    DataPoint,
+    DataPointProtocol,
+    ValueCache,
+    ValueSource,
+)
+from sgr_commhandler.validators.validator import IntValidator
+
+
+class CountingProtocol(DataPointProtocol):
+    def __init__(self, name: str = 'dp', delay: float = 0):
+        self._name = name
+        self._delay = delay
+        self.value = 1
+        self.reads = 0
+        self.skipped = 0
+        self._subscriber = None
+
+    async def get_val(self, skip_cache: bool = False):
+        self.reads += 1
+        if skip_cache:
+            self.skipped += 1
+        await asyncio.sleep(self._delay)
+        return self.value
+
+    async def set_val(self, value):
+        self.value = value
+
+    def name(self) -> tuple[str, str]:
+        return 'fp', self._name
+
+    def direction(self) -> DataDirectionProduct:
+        return DataDirectionProduct.RW
+
+    def can_subscribe(self) -> bool:
+        return True
+
+    def subscribe(self, fn):
+        self._subscriber = fn
+
+    def unsubscribe(self):
+        self._subscriber = None
+
+
+def build(cache: ValueCache, name: str = 'dp', delay: float = 0):
+    protocol = CountingProtocol(name, delay)
+    return protocol, DataPoint(protocol, IntValidator(16), cache)
+
+
+@pytest.mark.asyncio
+async def test_max_age():
+    protocol, dp = build(ValueCache())
+
+    # the default TTL of 0 always reads
+    assert await dp.get_value_async() == 1
+    assert await dp.get_value_async() == 1
+    assert protocol.reads == 2
+
+    protocol.value = 2
+    assert await dp.get_value_async(max_age=60) == 1
+    assert protocol.reads == 2
+    assert await dp.get_value_async(max_age=0) == 2
+    assert protocol.reads == 3
+    assert protocol.skipped == 1
+
+    cached = dp.cached_value()
+    assert cached.value == 2
+    assert cached.source is ValueSource.READ
+
+
+@pytest.mark.asyncio
+async def test_per_data_point_ttl():
+    cache = ValueCache(ttls={('fp', 'slow'): 60})
+    slow_protocol, slow = build(cache, 'slow')
+    fast_protocol, fast = build(cache, 'fast')
+
+    for _ in range(3):
+        await slow.get_value_async()
+        await fast.get_value_async()
+    assert slow_protocol.reads == 1
+    assert fast_protocol.reads == 3
+
+    cache.set_ttl(('fp', 'fast'), 60)
+    await fast.get_value_async()
+    assert fast_protocol.reads == 3
+
+
+@pytest.mark.asyncio
+async def test_concurrent_reads_are_shared():
+    cache = ValueCache()
+    protocol, dp = build(cache, delay=0.05)
+
+    values = await asyncio.gather(*(dp.get_value_async() for _ in range(5)))
+
+    assert values == [1] * 5
+    assert protocol.reads == 1
+    statistics = cache.statistics()
+    assert statistics.misses == 1
+    assert statistics.shared == 4
+    assert statistics.hit_ratio() == pytest.approx(0.8)
+
+
+@pytest.mark.asyncio
+async def test_cancelled_reader_does_not_cancel_joined_reads():
+    protocol, dp = build(ValueCache(), delay=0.05)
+
+    first = asyncio.create_task(dp.get_value_async())
+    await asyncio.sleep(0.01)
+    joined = asyncio.create_task(dp.get_value_async())
+    await asyncio.sleep(0.01)
+    first.cancel()
+
+    assert await joined == 1
+    assert first.cancelled()
+    # the joined reader read again
+    assert protocol.reads == 2
+
+
+@pytest.mark.asyncio
+async def test_write_invalidates():
+    protocol, dp = build(ValueCache(default_ttl=60))
+    assert await dp.get_value_async() == 1
+
+    await dp.set_value_async(5)
+
+    assert dp.cached_value() is None
+    assert await dp.get_value_async() == 5
+    assert protocol.reads == 2
+
+
+@pytest.mark.asyncio
+async def test_eviction():
+    cache = ValueCache(default_ttl=60, maxsize=2)
+    data_points = [build(cache, f'dp{i}')[1] for i in range(3)]
+
+    for dp in data_points:
+        await dp.get_value_async()
+
+    assert len(cache) == 2
+    assert data_points[0].cached_value() is None
+    assert cache.statistics().evictions == 1
+
+
+@pytest.mark.asyncio
+async def test_pushed_values_are_cached():
+    protocol, dp = build(ValueCache(default_ttl=60))
+    dp.subscribe(lambda value: None)
+
+    protocol._subscriber(7)
+
+    assert dp.cached_value().source is ValueSource.PUSH
+    assert await dp.get_value_async() == 7
+    assert protocol.reads == 0
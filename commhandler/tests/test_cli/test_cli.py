@@ -0,0 +1,130 @@
+import json
+import os
+import time
+
+import pytest
+import pytest_asyncio
+from aiohttp import web
+
+from sgr_commhandler.cli import (
+    SamplingProfiler,
+    main,
+    percentiles,
+    poll,
+    read_once,
+)
+from sgr_commhandler.device_builder import DeviceBuilder
+
+EID_PATH = os.path.join(
+    os.path.dirname(os.path.realpath(__file__)), '..', 'test_devices', 'eids'
+)
+MODBUS_EID = os.path.join(
+    EID_PATH, 'SGr_00_0016_dddd_ABB_B23_ModbusTCP_V0.3.xml'
+)
+REST_EID = os.path.join(
+    EID_PATH, 'SGr_01_mmmm_dddd_Shelly_1PM_RestAPILocal_V0.1.xml'
+)
+
+
+@pytest_asyncio.fixture
+async def shelly():
+    async def status(request):
+        return web.json_response(dict(meters=[dict(power=12.5, total=42)]))
+
+    async def relay(request):
+        return web.json_response(dict(ison=True))
+
+    app = web.Application()
+    app.router.add_get('/status', status)
+    app.router.add_get('/relay/0', relay)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    device = (
+        DeviceBuilder()
+        .eid_path(REST_EID)
+        .properties(dict(baseUri=f'http://127.0.0.1:{port}'))
+        .build()
+    )
+    await device.connect_async()
+    yield device
+    await device.disconnect_async()
+    await runner.cleanup()
+
+
+def test_describe(capsys):
+    code = main(
+        [
+            'describe',
+            MODBUS_EID,
+            '-p',
+            'slave_id=1',
+            '-p',
+            'tcp_address=127.0.0.1',
+            '-p',
+            'tcp_port=502',
+        ]
+    )
+
+    report = json.loads(capsys.readouterr().out)
+    assert code == 0
+    assert report['manufacturer'] == 'ABB'
+    assert report['transport'] == 'modbus-tcp:127.0.0.1:502'
+    assert report['functional_profiles']['VoltageAC']['VoltageACL1_N'] == {
+        'direction': 'R',
+        'type': 'FLOAT',
+    }
+
+
+def test_invalid_property():
+    with pytest.raises(SystemExit):
+        main(['describe'])
+    assert main(['describe', MODBUS_EID, '-p', 'slave_id']) == 1
+
+
+@pytest.mark.asyncio
+async def test_read_once(shelly):
+    report = await read_once(shelly)
+
+    assert len(report['data_points']) == 3
+    for data_point in report['data_points']:
+        assert data_point['status'] == 'OK'
+        assert data_point['duration_s'] > 0
+    # timing interceptor is removed afterwards
+    assert len(shelly.interceptors) == 0
+
+
+@pytest.mark.asyncio
+async def test_poll(shelly):
+    report = await poll(shelly, rate=20, duration=0.3)
+
+    assert 3 <= report['cycles'] <= 8
+    assert report['reads'] == 3 * report['cycles']
+    assert report['statuses']['OK'] == report['reads']
+    assert report['cycle_latency_s']['p50'] > 0
+
+
+def test_percentiles():
+    values = [float(i) for i in range(1, 101)]
+    assert percentiles(values) == dict(p50=50.0, p90=90.0, p99=99.0, max=100.0)
+    assert percentiles([])['p50'] is None
+
+
+def busy(seconds: float):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+def test_sampling_profiler(tmp_path):
+    profiler = SamplingProfiler(interval=0.001)
+    profiler.start()
+    busy(0.1)
+    profiler.stop()
+
+    assert any(function.endswith(':busy') for function, _ in profiler.top())
+    path = tmp_path / 'stacks.txt'
+    profiler.dump(str(path))
+    assert 'test_cli.py:busy' in path.read_text()
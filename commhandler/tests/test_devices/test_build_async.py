@@ -0,0 +1,65 @@
+import os
+
+import pytest
+
+from sgr_commhandler.device_builder import DeviceBuilder, build_many
+from sgr_commhandler.eid_cache import EidCache
+
+EID_BASE_PATH = os.path.join(
+    os.path.dirname(os.path.realpath(__file__)), 'eids'
+)
+MODBUS_EID_PATH = os.path.join(
+    EID_BASE_PATH, 'SGr_00_0016_dddd_ABB_B23_ModbusTCP_V0.3.xml'
+)
+REST_EID_PATH = os.path.join(
+    EID_BASE_PATH, 'SGr_01_mmmm_dddd_Shelly_1PM_RestAPILocal_V0.1.xml'
+)
+
+
+def modbus_builder(cache: EidCache, slave_id: str) -> DeviceBuilder:
+    return (
+        DeviceBuilder()
+        .eid_path(MODBUS_EID_PATH)
+        .properties(
+            dict(slave_id=slave_id, tcp_address='127.0.0.1', tcp_port='502')
+        )
+        .cache(cache)
+    )
+
+
+@pytest.mark.asyncio
+async def test_build_async():
+    device = await modbus_builder(EidCache(), '3').build_async()
+
+    assert device.slave_id == 3
+    assert device.describe()[0] == 'betaABBMeterTcpV0.3.0'
+
+
+@pytest.mark.asyncio
+async def test_build_many():
+    cache = EidCache()
+    builders = [
+        modbus_builder(cache, '1'),
+        modbus_builder(cache, '2'),
+        modbus_builder(cache, '1'),
+        DeviceBuilder()
+        .eid_path(REST_EID_PATH)
+        .properties(dict(baseUri='http://127.0.0.1'))
+        .cache(cache),
+    ]
+
+    results = {}
+    async for builder, device in build_many(builders, max_workers=2):
+        results[id(builder)] = device
+
+    assert len(results) == len(builders)
+    first, second, third, rest = (results[id(b)] for b in builders)
+    assert (first.slave_id, second.slave_id) == (1, 2)
+    # identical EIDs are parsed once
+    assert first.frame is third.frame
+    assert rest.base_url == 'http://127.0.0.1'
+
+    # everything is cached afterwards
+    async for _ in build_many([modbus_builder(cache, '2')]):
+        pass
+    assert cache.statistics().hits == 1
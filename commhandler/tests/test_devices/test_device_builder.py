@@ -2,7 +2,8 @@ import os
 
 import pytest
 
-from sgr_commhandler.device_builder import DeviceBuilder
+from sgr_commhandler import device_builder
+from sgr_commhandler.device_builder import DeviceBuilder, SGrDeviceProtocol
 
 EID_BASE_PATH = os.path.join(
     os.path.dirname(os.path.realpath(__file__)), "eids"
@@ -159,3 +160,37 @@ async def test_device_builder_generic_noprops():
     assert device_info is not None
     assert device_info.manufacturer == "Test"
     assert device_info.name == "Test Device Generic"
+
+
+class FakeEntryPoint:
+    def __init__(self, name, factory):
+        self.name = name
+        self._factory = factory
+
+    def load(self):
+        return self._factory
+
+
+def test_explicit_driver_wins_over_entry_point(monkeypatch):
+    def entry_point_driver(frame, config, lazy=False):
+        raise AssertionError("entry point driver used")
+
+    def explicit_driver(frame, config, lazy=False):
+        return "explicit"
+
+    monkeypatch.setattr(
+        device_builder.metadata,
+        "entry_points",
+        lambda group: [FakeEntryPoint("generic", entry_point_driver)],
+    )
+    monkeypatch.setattr(device_builder, "_entry_points_loaded", False)
+    monkeypatch.setattr(device_builder, "_registered", set())
+    monkeypatch.setattr(
+        device_builder, "device_builders", dict(device_builder.device_builders)
+    )
+
+    device_builder.register_device_builder(
+        SGrDeviceProtocol.GENERIC, explicit_driver
+    )
+    eid_path = os.path.join(EID_BASE_PATH, "test_eid_generic_V0.1.xml")
+    assert DeviceBuilder().eid_path(eid_path).build() == "explicit"
@@ -0,0 +1,98 @@
+import asyncio
+
+import pytest
+
+from sgr_commhandler.api import ReadResult, ReadStatus, SGrBaseInterface
+from sgr_commhandler.api.device_api import DeviceInformation
+from sgr_commhandler.device_pool import DevicePool
+
+LATENCY = 0.05
+
+
+class FakeDevice(SGrBaseInterface):
+    def __init__(self, name: str, transport: str, fail: bool = False):
+        self.device_information = DeviceInformation(
+            name, '', '', '', None, False
+        )
+        self.function_profiles = {}
+        self._transport = transport
+        self._fail = fail
+        self.connected = False
+        self.reads = 0
+
+    def transport_key(self) -> str:
+        return self._transport
+
+    async def connect_async(self):
+        if self._fail:
+            raise Exception('unreachable')
+        self.connected = True
+
+    async def disconnect_async(self):
+        self.connected = False
+
+    def is_connected(self) -> bool:
+        return self.connected
+
+    async def read_values_async(self, timeout=None):
+        await asyncio.sleep(LATENCY)
+        if self._fail:
+            error = Exception('unreachable')
+            return {('fp', 'dp'): ReadResult(ReadStatus.ERROR, error=error)}
+        self.reads += 1
+        return {('fp', 'dp'): ReadResult(ReadStatus.OK, self.reads)}
+
+
+@pytest.mark.asyncio
+async def test_poll_once_respects_transports():
+    pool = DevicePool()
+    # two devices on one bus, two on their own transports
+    devices = [
+        FakeDevice('a', 'bus'),
+        FakeDevice('b', 'bus'),
+        FakeDevice('c', 'c'),
+        FakeDevice('d', 'd'),
+    ]
+    pool.add_all(devices)
+
+    start = asyncio.get_running_loop().time()
+    results = await pool.poll_once()
+    elapsed = asyncio.get_running_loop().time() - start
+
+    assert [result.device for result in results] == devices
+    assert all(result.values == {('fp', 'dp'): 1} for result in results)
+    assert 2 * LATENCY <= elapsed < 3 * LATENCY
+    assert sorted(pool.transports()) == ['bus', 'c', 'd']
+
+
+@pytest.mark.asyncio
+async def test_connect_reports_failures():
+    ok, broken = FakeDevice('ok', 'a'), FakeDevice('broken', 'b', fail=True)
+    pool = DevicePool(max_connecting=1)
+    pool.add_all([ok, broken])
+
+    failures = await pool.connect_async()
+
+    assert ok.connected
+    assert [device for device, _ in failures] == [broken]
+
+
+@pytest.mark.asyncio
+async def test_poll_streams_results():
+    fast, slow = FakeDevice('fast', 'a'), FakeDevice('slow', 'b')
+    broken = FakeDevice('broken', 'c', fail=True)
+    pool = DevicePool()
+    pool.add(fast, interval=0.1)
+    pool.add(slow, interval=10)
+    pool.add(broken, interval=10)
+
+    results = []
+    async for device, values, timestamp, errors in pool.poll():
+        results.append((device, errors))
+        if len(results) == 5:
+            break
+
+    assert [device for device, _ in results].count(fast) == 3
+    assert (slow, {}) in results
+    (broken_errors,) = [errors for device, errors in results if device is broken]
+    assert str(broken_errors[('fp', 'dp')]) == 'unreachable'
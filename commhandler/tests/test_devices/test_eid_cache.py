@@ -0,0 +1,76 @@
+import os
+
+import pytest
+
+from sgr_commhandler.device_builder import DeviceBuilder
+from sgr_commhandler.eid_cache import EidCache
+
+EID_PATH = os.path.join(
+    os.path.dirname(os.path.realpath(__file__)),
+    'eids',
+    'SGr_00_0016_dddd_ABB_B23_ModbusTCP_V0.3.xml',
+)
+
+
+def build(cache: EidCache, **properties):
+    return (
+        DeviceBuilder()
+        .eid_path(EID_PATH)
+        .properties(properties)
+        .cache(cache)
+        .build()
+    )
+
+
+@pytest.mark.asyncio
+async def test_memory_cache_hit():
+    cache = EidCache()
+    first = build(cache, slave_id='1', tcp_address='127.0.0.1', tcp_port='502')
+    second = build(cache, slave_id='1', tcp_address='127.0.0.1', tcp_port='502')
+
+    assert cache.statistics().misses == 1
+    assert cache.statistics().hits == 1
+    assert first.frame is second.frame
+
+
+@pytest.mark.asyncio
+async def test_properties_are_part_of_key():
+    cache = EidCache()
+    first = build(cache, slave_id='1', tcp_address='127.0.0.1', tcp_port='502')
+    second = build(cache, slave_id='2', tcp_address='127.0.0.1', tcp_port='502')
+
+    assert cache.statistics().misses == 2
+    assert first.slave_id == 1
+    assert second.slave_id == 2
+
+
+@pytest.mark.asyncio
+async def test_disk_cache_survives_restart(tmp_path):
+    properties = dict(slave_id='1', tcp_address='127.0.0.1', tcp_port='502')
+    first = build(EidCache(cache_dir=str(tmp_path)), **properties)
+
+    restarted = EidCache(cache_dir=str(tmp_path))
+    second = build(restarted, **properties)
+
+    assert restarted.statistics().disk_hits == 1
+    assert restarted.statistics().misses == 0
+    assert second.frame == first.frame
+    assert second.device_information == first.device_information
+
+
+@pytest.mark.asyncio
+async def test_failed_disk_write_leaves_no_temporary_file(
+    tmp_path, monkeypatch
+):
+    def fail(*args, **kwargs):
+        raise OSError('disk full')
+
+    monkeypatch.setattr(os, 'replace', fail)
+    build(
+        EidCache(cache_dir=str(tmp_path)),
+        slave_id='1',
+        tcp_address='127.0.0.1',
+        tcp_port='502',
+    )
+
+    assert os.listdir(tmp_path) == []
@@ -0,0 +1,94 @@
+import os
+
+import pytest
+
+from sgr_commhandler.api import data_point_api
+from sgr_commhandler.device_builder import DeviceBuilder
+from sgr_commhandler.eid_template import EidTemplate
+
+EID_PATH = os.path.join(
+    os.path.dirname(os.path.realpath(__file__)),
+    'eids',
+    'SGr_00_0016_dddd_ABB_B23_ModbusTCP_V0.3.xml',
+)
+
+
+@pytest.mark.asyncio
+async def test_fleet_shares_specification():
+    devices = (
+        DeviceBuilder()
+        .eid_path(EID_PATH)
+        .build_fleet(
+            dict(slave_id=str(i), tcp_address=f'10.0.0.{i}', tcp_port='502')
+            for i in range(1, 4)
+        )
+    )
+
+    assert [device.slave_id for device in devices] == [1, 2, 3]
+    assert [device.ip_address for device in devices] == [
+        '10.0.0.1',
+        '10.0.0.2',
+        '10.0.0.3',
+    ]
+    first, second, _ = (device.frame for device in devices)
+    assert first is not second
+    assert (
+        first.interface_list.modbus_interface.functional_profile_list
+        is second.interface_list.modbus_interface.functional_profile_list
+    )
+    assert first.device_information is second.device_information
+
+
+@pytest.mark.asyncio
+async def test_fleet_matches_single_build():
+    properties = dict(slave_id='7', tcp_address='127.0.0.1', tcp_port='502')
+    (fleet_device,) = (
+        DeviceBuilder().eid_path(EID_PATH).build_fleet([properties])
+    )
+    device = (
+        DeviceBuilder()
+        .eid_path(EID_PATH)
+        .properties(properties)
+        .cache(None)
+        .build()
+    )
+
+    assert fleet_device.frame == device.frame
+
+
+def test_template_placeholders():
+    with open(EID_PATH) as file:
+        content = file.read()
+    frame = DeviceBuilder()._string_loader(content)
+
+    assert EidTemplate(frame).placeholders() == {
+        'slave_id',
+        'tcp_address',
+        'tcp_port',
+    }
+
+
+@pytest.mark.asyncio
+async def test_fleet_shares_names_and_validators():
+    first, second = (
+        DeviceBuilder()
+        .eid_path(EID_PATH)
+        .build_fleet(
+            dict(slave_id=str(i), tcp_address=f'10.0.0.{i}', tcp_port='502')
+            for i in range(1, 3)
+        )
+    )
+
+    others = second.get_data_points()
+    for key, dp in first.get_data_points().items():
+        other = others[key]
+        assert not hasattr(dp, '__dict__')
+        assert dp.name() is other.name()
+        assert dp._validator is other._validator
+
+
+def test_name_intern_table_is_bounded():
+    for i in range(data_point_api._names.maxsize + 10):
+        data_point_api.intern_name('fp', f'dp{i}')
+
+    assert len(data_point_api._names) == data_point_api._names.maxsize
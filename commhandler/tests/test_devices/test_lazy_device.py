@@ -0,0 +1,85 @@
+import os
+
+import pytest
+
+from sgr_commhandler.api import LazyMapping
+from sgr_commhandler.device_builder import DeviceBuilder
+
+EID_BASE_PATH = os.path.join(
+    os.path.dirname(os.path.realpath(__file__)), 'eids'
+)
+MODBUS_EID_PATH = os.path.join(
+    EID_BASE_PATH, 'SGr_00_0016_dddd_ABB_B23_ModbusTCP_V0.3.xml'
+)
+REST_EID_PATH = os.path.join(
+    EID_BASE_PATH, 'SGr_01_mmmm_dddd_Shelly_1PM_RestAPILocal_V0.1.xml'
+)
+MODBUS_PROPERTIES = dict(slave_id='1', tcp_address='127.0.0.1', tcp_port='502')
+
+
+def build(path, properties, lazy):
+    return (
+        DeviceBuilder()
+        .eid_path(path)
+        .properties(properties)
+        .lazy(lazy)
+        .build()
+    )
+
+
+@pytest.mark.asyncio
+async def test_lazy_describe_matches_eager():
+    eager = build(MODBUS_EID_PATH, MODBUS_PROPERTIES, lazy=False)
+    lazy = build(MODBUS_EID_PATH, MODBUS_PROPERTIES, lazy=True)
+
+    assert lazy.describe() == eager.describe()
+    for fp in lazy.function_profiles.values():
+        # describing does not build any data point
+        assert fp.get_data_points().materialized() == 0
+
+
+@pytest.mark.asyncio
+async def test_lazy_builds_on_access():
+    eager = build(MODBUS_EID_PATH, MODBUS_PROPERTIES, lazy=False)
+    fp_name, dp_name = next(iter(eager.get_data_points()))
+
+    device = build(MODBUS_EID_PATH, MODBUS_PROPERTIES, lazy=True)
+    profiles = device.function_profiles
+    assert isinstance(profiles, LazyMapping)
+    assert profiles.materialized() == 0
+
+    dp = device.get_data_point((fp_name, dp_name))
+
+    assert dp.name() == (fp_name, dp_name)
+    assert device.get_data_point((fp_name, dp_name)) is dp
+    assert profiles.materialized() == 1
+    assert profiles[fp_name].get_data_points().materialized() == 1
+
+
+@pytest.mark.asyncio
+async def test_lazy_rest_device():
+    device = build(REST_EID_PATH, dict(baseUri='http://127.0.0.1'), lazy=True)
+    eager = build(REST_EID_PATH, dict(baseUri='http://127.0.0.1'), lazy=False)
+
+    assert device.describe() == eager.describe()
+    assert device.get_data_points().keys() == eager.get_data_points().keys()
+
+
+@pytest.mark.asyncio
+async def test_lazy_describe_without_direction_matches_eager():
+    with open(REST_EID_PATH) as file:
+        xml = file.read().replace('<dataDirection>R</dataDirection>', '', 1)
+
+    def build_rest(lazy):
+        return (
+            DeviceBuilder()
+            .eid(xml)
+            .properties(dict(baseUri='http://127.0.0.1'))
+            .lazy(lazy)
+            .build()
+        )
+
+    with pytest.raises(Exception, match='missing data direction'):
+        build_rest(lazy=False).describe()
+    with pytest.raises(Exception, match='missing data direction'):
+        build_rest(lazy=True).describe()
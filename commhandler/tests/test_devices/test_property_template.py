@@ -0,0 +1,48 @@
+import configparser
+import logging
+
+from sgr_commhandler.eid_template import PropertyTemplate, property_values
+
+
+def test_render_single_pass():
+    template = PropertyTemplate('<a>{{host}}:{{port}}</a><b>{{host}}</b>')
+    text, missing = template.render(dict(host='h', port='1'))
+
+    assert text == '<a>h:1</a><b>h</b>'
+    assert missing == set()
+
+
+def test_property_names_are_case_insensitive():
+    config = configparser.ConfigParser()
+    config.read_dict(dict(properties=dict(baseUri='http://127.0.0.1')))
+    text, _ = PropertyTemplate('{{baseUri}}/x').render(property_values(config))
+
+    assert text == 'http://127.0.0.1/x'
+
+
+def test_names_are_not_patterns():
+    text, missing = PropertyTemplate('{{a.b}} {{axb}}').render({'a.b': '1'})
+
+    assert text == '1 {{axb}}'
+    assert missing == {'axb'}
+
+
+def test_missing_and_unknown_are_reported(caplog):
+    from sgr_commhandler.device_builder import DeviceBuilder
+
+    xml = '<x>{{host}} {{value}}</x>'
+    with caplog.at_level(logging.WARNING):
+        text = DeviceBuilder()._replace_variables(xml, _config(hots='x'))
+
+    assert text == xml
+    # runtime placeholders are not properties
+    assert caplog.messages == [
+        'no value for EID properties: host',
+        'unknown EID properties: hots',
+    ]
+
+
+def _config(**properties) -> configparser.ConfigParser:
+    config = configparser.ConfigParser()
+    config.read_dict(dict(properties=properties))
+    return config
@@ -0,0 +1,137 @@
+import asyncio
+import os
+
+import pytest
+
+from sgr_commhandler.device_builder import DeviceBuilder
+from sgr_commhandler.driver.messaging import (
+    InMemoryBroker,
+    MessagingDeviceSimulator,
+)
+
+EID_PATH = os.path.join(
+    os.path.dirname(os.path.realpath(__file__)),
+    '..',
+    'test_devices',
+    'eids',
+    'SGr_XX_HiveMQ_MQTT_Cloud.xml',
+)
+EID_PROPERTIES = dict(
+    host='localhost', port='1883', username='test', password='test'
+)
+FP = 'EVSE_Station1'
+
+
+class Recorder:
+    def __init__(self):
+        self.messages = []
+
+    async def __call__(self, topic, payload):
+        self.messages.append((topic, payload))
+
+
+@pytest.mark.asyncio
+async def test_broker_topic_semantics():
+    broker = InMemoryBroker()
+    recorder = Recorder()
+    subscriber = broker.client()
+    await subscriber.connect(recorder)
+    await subscriber.subscribe('a/+/c')
+    await subscriber.subscribe('a/#')
+    publisher = broker.client()
+    await publisher.connect(Recorder())
+
+    await publisher.publish('a/b/c', '1')
+    await publisher.publish('b/c', '2')
+
+    # delivered once despite overlapping subscriptions
+    assert recorder.messages == [('a/b/c', '1')]
+    assert broker.statistics().published == 2
+    assert broker.statistics().delivered == 1
+
+
+@pytest.mark.asyncio
+async def test_broker_no_local_and_loss():
+    broker = InMemoryBroker()
+    recorder = Recorder()
+    client = broker.client(no_local=True)
+    await client.connect(recorder)
+    await client.subscribe('x')
+    await client.publish('x', 'own')
+    assert recorder.messages == []
+
+    lossy_recorder = Recorder()
+    lossy = broker.client(loss_rate=1.0)
+    await lossy.connect(lossy_recorder)
+    await lossy.subscribe('x')
+    await client.publish('x', 'lost')
+    assert lossy_recorder.messages == []
+    assert broker.statistics().dropped == 1
+
+
+@pytest.mark.asyncio
+async def test_simulated_device_read():
+    broker = InMemoryBroker()
+    builder = DeviceBuilder().eid_path(EID_PATH).properties(EID_PROPERTIES)
+    device = builder.build()
+    device.set_client(broker.client(latency=0.05, no_local=True))
+    simulator = MessagingDeviceSimulator(
+        device.frame,
+        broker.client(no_local=True),
+        values={
+            (FP, 'SafeCurrent'): 12.0,
+            (FP, 'MaxReceiveTimeSec'): 30,
+            (FP, 'ChargingCurrentMin'): 6,
+            (FP, 'ChargingCurrentMax'): 16,
+        },
+    )
+    await simulator.start()
+    await device.connect_async()
+
+    # data points without read command rely on pushed values
+    await simulator.publish_value((FP, 'ChargingCurrentMin'))
+    await simulator.publish_value((FP, 'ChargingCurrentMax'))
+    await asyncio.sleep(0.1)
+
+    start = asyncio.get_running_loop().time()
+    values = await device.get_values_async()
+    elapsed = asyncio.get_running_loop().time() - start
+
+    assert values == {
+        (FP, 'SafeCurrent'): 12.0,
+        (FP, 'MaxReceiveTimeSec'): 30,
+        (FP, 'ChargingCurrentMin'): 6,
+        (FP, 'ChargingCurrentMax'): 16,
+    }
+    assert simulator.requests_answered == 2
+    # both read commands are answered within one round trip
+    assert elapsed < 0.09
+
+    await device.disconnect_async()
+    await simulator.stop()
+
+
+@pytest.mark.asyncio
+async def test_simulated_device_read_without_latency():
+    # responses arrive while the read command is still being published
+    broker = InMemoryBroker()
+    builder = DeviceBuilder().eid_path(EID_PATH).properties(EID_PROPERTIES)
+    device = builder.build()
+    device.set_client(broker.client(no_local=True))
+    simulator = MessagingDeviceSimulator(
+        device.frame,
+        broker.client(no_local=True),
+        values={(FP, 'SafeCurrent'): 12.0, (FP, 'MaxReceiveTimeSec'): 30},
+    )
+    await simulator.start()
+    await device.connect_async()
+
+    safe_current = device.get_data_point((FP, 'SafeCurrent'))
+    max_receive_time = device.get_data_point((FP, 'MaxReceiveTimeSec'))
+    assert await safe_current.get_value_async(max_age=0) == 12.0
+    assert await max_receive_time.get_value_async(max_age=0) == 30
+    assert await safe_current.get_value_async(max_age=0) == 12.0
+    assert simulator.requests_answered == 3
+
+    await device.disconnect_async()
+    await simulator.stop()
@@ -0,0 +1,113 @@
+import os
+
+import pytest
+
+from sgr_commhandler.device_builder import DeviceBuilder
+from sgr_commhandler.driver.messaging.message_dispatcher import (
+    MessageDispatcher,
+    TopicTrie,
+)
+
+EID_PATH = os.path.join(
+    os.path.dirname(os.path.realpath(__file__)),
+    '..',
+    'test_devices',
+    'eids',
+    'SGr_XX_HiveMQ_MQTT_Cloud.xml',
+)
+EID_PROPERTIES = dict(
+    host='localhost', port='1883', username='test', password='test'
+)
+
+
+def test_topic_trie_wildcards():
+    trie = TopicTrie()
+    trie.add('a/b/c', 'exact')
+    trie.add('a/+/c', 'single')
+    trie.add('a/#', 'multi')
+    trie.add('#', 'all')
+    trie.add('b/+', 'other')
+
+    assert set(trie.match('a/b/c')) == {'exact', 'single', 'multi', 'all'}
+    assert set(trie.match('a/x/c')) == {'single', 'multi', 'all'}
+    assert set(trie.match('a')) == {'multi', 'all'}
+    assert set(trie.match('b/x')) == {'other', 'all'}
+    assert trie.match('$SYS/x') == []
+
+
+def test_topic_trie_remove():
+    trie = TopicTrie()
+    trie.add('a/+', 1)
+    trie.add('a/+', 2)
+    assert trie.remove('a/+', 1)
+    assert not trie.remove('a/+', 1)
+    assert trie.match('a/b') == [2]
+    assert trie.remove('a/+', 2)
+    assert trie.match('a/b') == []
+    assert len(trie) == 0
+
+
+def test_topic_trie_invalid_filter():
+    trie = TopicTrie()
+    with pytest.raises(Exception):
+        trie.add('a/#/b', 1)
+    with pytest.raises(Exception):
+        trie.add('a/b+', 1)
+
+
+@pytest.mark.asyncio
+async def test_dispatcher_unregister():
+    received = []
+    dispatcher = MessageDispatcher()
+    route = dispatcher.register('x/+', received.append)
+    assert await dispatcher.dispatch('x/y', '42') == 1
+    dispatcher.unregister(route)
+    assert await dispatcher.dispatch('x/y', '43') == 0
+    assert received == [42]
+    assert dispatcher.topics() == []
+
+
+@pytest.mark.asyncio
+async def test_messaging_device_filters_messages():
+    device = (
+        DeviceBuilder().eid_path(EID_PATH).properties(EID_PROPERTIES).build()
+    )
+    received = {}
+    for name in ('ChargingCurrentMin', 'ChargingCurrentMax'):
+        dp = device.get_data_point(('EVSE_Station1', name))
+        dp.subscribe(lambda value, name=name: received.update({name: value}))
+
+    assert 'stations/1/charging_current' in device.subscribed_topics()
+
+    delivered = await device.handle_message(
+        'stations/1/charging_current', b'{"limit": "min", "current": 6}'
+    )
+    assert delivered == 1
+    assert received == {'ChargingCurrentMin': 6}
+
+    await device.handle_message(
+        'stations/1/charging_current', '{"limit": "max", "current": 16}'
+    )
+    assert received == {'ChargingCurrentMin': 6, 'ChargingCurrentMax': 16}
+
+    # filtered out
+    await device.handle_message(
+        'stations/1/charging_current', '{"limit": "avg", "current": 10}'
+    )
+    assert received == {'ChargingCurrentMin': 6, 'ChargingCurrentMax': 16}
+
+
+@pytest.mark.asyncio
+async def test_messaging_channel_keeps_latest():
+    device = (
+        DeviceBuilder().eid_path(EID_PATH).properties(EID_PROPERTIES).build()
+    )
+    dp = device.get_data_point(('EVSE_Station1', 'ChargingCurrentMin'))
+    channel = dp.subscribe_channel(maxsize=4)
+    for current in (6, 7, 8):
+        await device.handle_message(
+            'stations/1/charging_current',
+            f'{{"limit": "min", "current": {current}}}',
+        )
+    assert channel.get_nowait() == (('EVSE_Station1', 'ChargingCurrentMin'), 8)
+    assert channel.metrics().coalesced == 2
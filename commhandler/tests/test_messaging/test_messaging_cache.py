@@ -0,0 +1,170 @@
+import asyncio
+import os
+
+import pytest
+
+from sgr_commhandler.device_builder import DeviceBuilder
+from sgr_commhandler.driver.messaging import SGrMessagingClient
+
+EID_PATH = os.path.join(
+    os.path.dirname(os.path.realpath(__file__)),
+    '..',
+    'test_devices',
+    'eids',
+    'SGr_XX_HiveMQ_MQTT_Cloud.xml',
+)
+EID_PROPERTIES = dict(
+    host='localhost', port='1883', username='test', password='test'
+)
+
+
+class LoopbackClient(SGrMessagingClient):
+    """
+    Delivers every published message back to the device after a delay.
+    """
+
+    def __init__(self, delay: float = 0.05):
+        self.delay = delay
+        self.published = []
+        self._on_message = None
+
+    async def connect(self, on_message):
+        self._on_message = on_message
+
+    async def disconnect(self):
+        self._on_message = None
+
+    def is_connected(self) -> bool:
+        return self._on_message is not None
+
+    async def subscribe(self, topic: str):
+        pass
+
+    async def publish(self, topic, payload):
+        self.published.append(topic)
+        if topic == 'stations/1/max_receive_time':
+            payload = '30'
+
+        async def deliver():
+            await asyncio.sleep(self.delay)
+            await self._on_message(topic, payload)
+
+        asyncio.create_task(deliver())
+
+
+def build_device():
+    return (
+        DeviceBuilder().eid_path(EID_PATH).properties(EID_PROPERTIES).build()
+    )
+
+
+@pytest.mark.asyncio
+async def test_get_val_uses_last_value_cache():
+    device = build_device()
+    client = LoopbackClient()
+    device.set_client(client)
+    await device.connect_async()
+    dp = device.get_data_point(('EVSE_Station1', 'MaxReceiveTimeSec'))
+
+    assert await dp.get_value_async() == 30
+    assert client.published == ['stations/1/max_receive_time']
+
+    # served from cache
+    assert await dp.get_value_async() == 30
+    assert len(client.published) == 1
+
+    # cache bypassed
+    protocol = dp._protocol
+    assert await protocol.get_val(max_age=0) == 30
+    assert len(client.published) == 2
+
+
+@pytest.mark.asyncio
+async def test_concurrent_reads_share_read_command():
+    device = build_device()
+    client = LoopbackClient(delay=0.1)
+    device.set_client(client)
+    await device.connect_async()
+    dp = device.get_data_point(('EVSE_Station1', 'MaxReceiveTimeSec'))
+
+    start = asyncio.get_running_loop().time()
+    values = await asyncio.gather(*(dp.get_value_async() for _ in range(5)))
+    elapsed = asyncio.get_running_loop().time() - start
+
+    assert values == [30] * 5
+    assert client.published == ['stations/1/max_receive_time']
+    assert elapsed < 0.3
+
+
+@pytest.mark.asyncio
+async def test_subscription_feeds_cache():
+    device = build_device()
+    device.set_client(LoopbackClient())
+    await device.connect_async()
+    await device.handle_message(
+        'stations/1/charging_current', '{"limit": "max", "current": 16}'
+    )
+    dp = device.get_data_point(('EVSE_Station1', 'ChargingCurrentMax'))
+    assert await dp.get_value_async() == 16
+
+
+class DroppingClient(LoopbackClient):
+    """
+    Drops the first published messages, or fails publishing them.
+    """
+
+    def __init__(self, drop: int = 1, fail: bool = False):
+        super().__init__(delay=0)
+        self.drop = drop
+        self.fail = fail
+
+    async def publish(self, topic, payload):
+        if self.drop > 0:
+            self.drop -= 1
+            if self.fail:
+                raise Exception('broker unavailable')
+            self.published.append(topic)
+            return
+        await super().publish(topic, payload)
+
+
+@pytest.mark.asyncio
+async def test_read_after_timeout_publishes_again():
+    device = build_device()
+    device.read_timeout = 0.1
+    client = DroppingClient()
+    device.set_client(client)
+    await device.connect_async()
+    protocol = device.get_data_point(
+        ('EVSE_Station1', 'MaxReceiveTimeSec')
+    )._protocol
+
+    with pytest.raises(Exception, match='no response'):
+        await protocol.get_val(max_age=0)
+    assert await protocol.get_val(max_age=0) == 30
+    assert len(client.published) == 2
+
+
+@pytest.mark.asyncio
+async def test_read_after_failed_publish_publishes_again():
+    device = build_device()
+    client = DroppingClient(fail=True)
+    device.set_client(client)
+    await device.connect_async()
+    protocol = device.get_data_point(
+        ('EVSE_Station1', 'MaxReceiveTimeSec')
+    )._protocol
+
+    with pytest.raises(Exception, match='broker unavailable'):
+        await protocol.get_val(max_age=0)
+    assert await protocol.get_val(max_age=0) == 30
+    assert client.published == ['stations/1/max_receive_time']
+
+
+def test_incomplete_client_cannot_be_created():
+    class PublishOnlyClient(SGrMessagingClient):
+        async def publish(self, topic, payload):
+            pass
+
+    with pytest.raises(TypeError):
+        PublishOnlyClient()
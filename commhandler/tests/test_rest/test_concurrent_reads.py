@@ -0,0 +1,138 @@
+import asyncio
+import os
+
+import pytest
+import pytest_asyncio
+from aiohttp import web
+
+from sgr_commhandler.device_builder import DeviceBuilder
+from sgr_commhandler.driver.rest.restapi_interface_async import (
+    SGrRestInterface,
+)
+from sgr_commhandler.metrics import default_registry
+
+EID_PATH = os.path.join(
+    os.path.dirname(os.path.realpath(__file__)),
+    '..',
+    'test_devices',
+    'eids',
+    'SGr_01_mmmm_dddd_Shelly_1PM_RestAPILocal_V0.1.xml',
+)
+LATENCY = 0.1
+
+
+class SimulatedShelly:
+    def __init__(self):
+        self.requests = 0
+        self.app = web.Application()
+        self.app.router.add_get('/status', self.status)
+        self.app.router.add_get('/relay/0', self.relay)
+
+    async def _respond(self, body):
+        self.requests += 1
+        await asyncio.sleep(LATENCY)
+        return web.json_response(body)
+
+    async def status(self, request):
+        return await self._respond(dict(meters=[dict(power=12.5, total=42)]))
+
+    async def relay(self, request):
+        return await self._respond(dict(ison=True))
+
+
+@pytest_asyncio.fixture
+async def shelly():
+    simulator = SimulatedShelly()
+    runner = web.AppRunner(simulator.app)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    yield simulator, f'http://127.0.0.1:{port}'
+    await runner.cleanup()
+
+
+def build(base_uri: str, **options) -> SGrRestInterface:
+    builder = (
+        DeviceBuilder().eid_path(EID_PATH).properties(dict(baseUri=base_uri))
+    )
+    frame, config = builder._load_frame()
+    return SGrRestInterface(frame, config, **options)
+
+
+@pytest.mark.asyncio
+async def test_reads_are_concurrent(shelly):
+    simulator, base_uri = shelly
+    device = build(base_uri)
+    await device.connect_async()
+
+    start = asyncio.get_running_loop().time()
+    values = await device.get_values_async()
+    elapsed = asyncio.get_running_loop().time() - start
+    await device.disconnect_async()
+
+    assert len(values) == 3
+    # data points reading the same resource share one request
+    assert simulator.requests == 2
+    assert elapsed < 2 * LATENCY
+
+
+@pytest.mark.asyncio
+async def test_cancelled_request_is_sent_again_for_joined_reads(shelly):
+    simulator, base_uri = shelly
+    device = build(base_uri)
+    await device.connect_async()
+    power = device.get_data_point(('ActivePowerAC', 'ActivePowerACtot'))
+    energy = device.get_data_point(('ActiveEnergyAC', 'ActiveEnergyACtot'))
+
+    first = asyncio.create_task(power.get_value_async())
+    await asyncio.sleep(LATENCY / 4)
+    joined = asyncio.create_task(energy.get_value_async())
+    await asyncio.sleep(LATENCY / 4)
+    first.cancel()
+
+    assert await joined is not None
+    assert first.cancelled()
+    await device.disconnect_async()
+    assert simulator.requests == 2
+
+
+@pytest.mark.asyncio
+async def test_request_limit(shelly):
+    simulator, base_uri = shelly
+    device = build(base_uri, max_concurrent_requests=1)
+    await device.connect_async()
+
+    start = asyncio.get_running_loop().time()
+    await device.get_values_async()
+    elapsed = asyncio.get_running_loop().time() - start
+    await device.disconnect_async()
+
+    assert simulator.requests == 2
+    assert elapsed >= 2 * LATENCY
+
+
+@pytest.mark.asyncio
+async def test_transport_metrics(shelly):
+    _, base_uri = shelly
+    device = build(base_uri)
+    default_registry.clear()
+    default_registry.enable()
+    try:
+        await device.connect_async()
+        await device.get_values_async()
+        await device.disconnect_async()
+        snapshot = default_registry.snapshot()
+    finally:
+        default_registry.disable()
+        default_registry.clear()
+
+    transport = device.transport_key()
+    transactions = snapshot['sgr_transport_transactions_total']
+    assert transactions == [dict(labels=dict(transport=transport), value=2)]
+    received = [
+        entry['value']
+        for entry in snapshot['sgr_transport_bytes_total']
+        if entry['labels'] == dict(transport=transport, direction='rx')
+    ]
+    assert received[0] > 0
@@ -1,8 +1,14 @@
 from datetime import datetime
 
-from sgr_specification.v0.generic import EnumEntryProductRecord, EnumMapProduct
+from sgr_specification.v0.generic import (
+    DataTypeProduct,
+    EmptyType,
+    EnumEntryProductRecord,
+    EnumMapProduct,
+)
 
 from sgr_commhandler.api.data_types import DataTypes
+from sgr_commhandler.validators import build_validator
 from sgr_commhandler.validators.validator import (
     BitmapValidator,
     BooleanValidator,
@@ -218,3 +224,55 @@ def test_datetime_validator():
     assert not validator.validate(1)
     assert not validator.validate(0)
     assert not validator.validate(None)
+
+
+def test_int_validator_eid_range():
+    validator = IntValidator(16, signed=False, minimum=10, maximum=20)
+    assert validator.validate(10)
+    assert validator.validate(20)
+    assert validator.validate('15')
+    assert not validator.validate(9)
+    assert not validator.validate(21)
+    assert validator.validate_many([5, 10, 15.0, '20', 25, None]) == [
+        False,
+        True,
+        True,
+        True,
+        False,
+        False,
+    ]
+    assert not validator.trusts(int)
+
+
+def test_float_validator_eid_range():
+    validator = FloatValidator(64, minimum=0, maximum=250)
+    assert validator.validate(0)
+    assert validator.validate(230.5)
+    assert not validator.validate(250.1)
+    assert not validator.validate(float('nan'))
+    assert validator.validate_many([-1.0, 1, 2.5, 'abc']) == [
+        False,
+        True,
+        True,
+        False,
+    ]
+    assert not validator.trusts(float)
+
+    unbounded = FloatValidator(64)
+    assert unbounded.validate(float('nan'))
+    assert unbounded.validate_many([1.0, 2, '3.5', 'abc']) == [
+        True,
+        True,
+        True,
+        False,
+    ]
+    assert unbounded.trusts(float)
+    assert not unbounded.trusts(str)
+
+
+def test_build_validator_shares_per_range():
+    float64 = DataTypeProduct(float64=EmptyType())
+    assert build_validator(float64) is build_validator(float64)
+    assert build_validator(float64, 0, 250) is build_validator(float64, 0, 250)
+    assert build_validator(float64) is not build_validator(float64, 0, 250)
+    assert not build_validator(float64, 0, 250).validate(251)